@@ -0,0 +1,33 @@
+"""class schedule conflict indexes
+
+Revision ID: 3f1a6c2d8b47
+Revises: 7d98e6f5876b
+Create Date: 2026-10-19 17:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a6c2d8b47'
+down_revision: Union[str, Sequence[str], None] = '7d98e6f5876b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_classschedule_day_room_start', 'classschedule', ['day', 'room', 'start_time'])
+    op.create_index('ix_classschedule_day_instructor_start', 'classschedule', ['day', 'instructor', 'start_time'])
+    op.create_index('ix_classschedule_day_batch_start', 'classschedule', ['day', 'batch', 'start_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_classschedule_day_batch_start', table_name='classschedule')
+    op.drop_index('ix_classschedule_day_instructor_start', table_name='classschedule')
+    op.drop_index('ix_classschedule_day_room_start', table_name='classschedule')
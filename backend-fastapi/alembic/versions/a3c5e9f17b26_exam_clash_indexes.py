@@ -0,0 +1,33 @@
+"""exam clash indexes
+
+Revision ID: a3c5e9f17b26
+Revises: f2b8d4c61e07
+Create Date: 2026-10-19 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e9f17b26'
+down_revision: Union[str, Sequence[str], None] = 'f2b8d4c61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_examtimetable_room_schedule', 'examtimetable', ['room', 'exam_schedule'])
+    op.create_index('ix_examtimetable_invigilator_schedule', 'examtimetable', ['invigilator', 'exam_schedule'])
+    op.create_index('ix_examtimetable_semester_schedule', 'examtimetable', ['semester', 'exam_schedule'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_examtimetable_semester_schedule', table_name='examtimetable')
+    op.drop_index('ix_examtimetable_invigilator_schedule', table_name='examtimetable')
+    op.drop_index('ix_examtimetable_room_schedule', table_name='examtimetable')
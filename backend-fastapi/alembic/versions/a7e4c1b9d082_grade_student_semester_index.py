@@ -0,0 +1,29 @@
+"""grade student semester index
+
+Revision ID: a7e4c1b9d082
+Revises: f1d9a4c7e358
+Create Date: 2026-10-20 01:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e4c1b9d082'
+down_revision: Union[str, Sequence[str], None] = 'f1d9a4c7e358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_grade_student_semester', 'grade', ['student_id', 'semester'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_grade_student_semester', table_name='grade')
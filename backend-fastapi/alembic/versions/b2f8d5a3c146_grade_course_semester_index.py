@@ -0,0 +1,29 @@
+"""grade course semester index
+
+Revision ID: b2f8d5a3c146
+Revises: a7e4c1b9d082
+Create Date: 2026-10-20 02:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f8d5a3c146'
+down_revision: Union[str, Sequence[str], None] = 'a7e4c1b9d082'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_grade_course_semester', 'grade', ['course_code', 'semester'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_grade_course_semester', table_name='grade')
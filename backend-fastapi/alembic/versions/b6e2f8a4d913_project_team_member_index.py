@@ -0,0 +1,29 @@
+"""project team member index
+
+Revision ID: b6e2f8a4d913
+Revises: a3c5e9f17b26
+Create Date: 2026-10-19 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f8a4d913'
+down_revision: Union[str, Sequence[str], None] = 'a3c5e9f17b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_projectteammember_project_id'), 'projectteammember', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_projectteammember_project_id'), table_name='projectteammember')
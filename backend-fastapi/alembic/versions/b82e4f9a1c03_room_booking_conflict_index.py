@@ -0,0 +1,29 @@
+"""room booking conflict index
+
+Revision ID: b82e4f9a1c03
+Revises: 3f1a6c2d8b47
+Create Date: 2026-10-19 18:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b82e4f9a1c03'
+down_revision: Union[str, Sequence[str], None] = '3f1a6c2d8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_roombooking_room_date_start', 'roombooking', ['room', 'booking_date', 'start_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_roombooking_room_date_start', table_name='roombooking')
@@ -0,0 +1,29 @@
+"""booking rejection reason
+
+Revision ID: c4d9e2a7f615
+Revises: b82e4f9a1c03
+Create Date: 2026-10-19 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d9e2a7f615'
+down_revision: Union[str, Sequence[str], None] = 'b82e4f9a1c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('booking', sa.Column('rejection_reason', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('booking', 'rejection_reason')
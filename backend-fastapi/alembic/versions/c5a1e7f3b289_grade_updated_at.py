@@ -0,0 +1,30 @@
+"""grade updated_at
+
+Revision ID: c5a1e7f3b289
+Revises: b2f8d5a3c146
+Create Date: 2026-10-20 03:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1e7f3b289'
+down_revision: Union[str, Sequence[str], None] = 'b2f8d5a3c146'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('grade', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE grade SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('grade', 'updated_at')
@@ -0,0 +1,56 @@
+"""project and research paper search
+
+Revision ID: c8f1a3e5b720
+Revises: b6e2f8a4d913
+Create Date: 2026-10-19 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f1a3e5b720'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f8a4d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_researchpaperauthor_paper_id'), 'researchpaperauthor', ['paper_id'], unique=False)
+    # Other databases search through the in-memory indexes in app.utils.research_search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE project ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(topic, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(abstract, '')), 'C')) STORED"
+    )
+    op.execute('CREATE INDEX ix_project_search_vector ON project USING gin (search_vector)')
+    op.execute(
+        "ALTER TABLE researchpaper ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(journal, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(abstract, '')), 'C')) STORED"
+    )
+    op.execute('CREATE INDEX ix_researchpaper_search_vector ON researchpaper USING gin (search_vector)')
+    op.execute(
+        "CREATE INDEX ix_researchpaperauthor_name_search ON researchpaperauthor "
+        "USING gin (to_tsvector('simple', coalesce(author_name, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_researchpaperauthor_name_search')
+        op.execute('DROP INDEX IF EXISTS ix_researchpaper_search_vector')
+        op.execute('ALTER TABLE researchpaper DROP COLUMN IF EXISTS search_vector')
+        op.execute('DROP INDEX IF EXISTS ix_project_search_vector')
+        op.execute('ALTER TABLE project DROP COLUMN IF EXISTS search_vector')
+    op.drop_index(op.f('ix_researchpaperauthor_paper_id'), table_name='researchpaperauthor')
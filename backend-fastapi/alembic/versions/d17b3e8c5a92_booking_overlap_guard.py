@@ -0,0 +1,39 @@
+"""booking overlap guard
+
+Revision ID: d17b3e8c5a92
+Revises: c4d9e2a7f615
+Create Date: 2026-10-19 20:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd17b3e8c5a92'
+down_revision: Union[str, Sequence[str], None] = 'c4d9e2a7f615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_booking_equipment_start', 'booking', ['equipment_id', 'start_time'])
+    if op.get_bind().dialect.name == 'postgresql':
+        # Fails if active bookings already overlap; resolve those before upgrading
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            "ALTER TABLE booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist "
+            "(equipment_id WITH =, tsrange(start_time, end_time) WITH &&) "
+            "WHERE (status IN ('approved', 'pending'))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE booking DROP CONSTRAINT IF EXISTS booking_no_overlap')
+    op.drop_index('ix_booking_equipment_start', table_name='booking')
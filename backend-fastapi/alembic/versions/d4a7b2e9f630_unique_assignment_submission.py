@@ -0,0 +1,56 @@
+"""unique assignment submission per student
+
+Revision ID: d4a7b2e9f630
+Revises: c8f1a3e5b720
+Create Date: 2026-10-19 23:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7b2e9f630'
+down_revision: Union[str, Sequence[str], None] = 'c8f1a3e5b720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the earliest of any duplicate submissions that slipped through the old
+    # read-then-insert check, and resync the counters from what remains
+    op.execute(
+        """
+        DELETE FROM assignmentsubmission
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY assignment_id, student_id ORDER BY submission_time, id
+                ) AS position
+                FROM assignmentsubmission
+                WHERE assignment_id IS NOT NULL AND student_id IS NOT NULL
+            ) ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE assignment SET submission_count = (
+            SELECT COUNT(*) FROM assignmentsubmission
+            WHERE assignmentsubmission.assignment_id = assignment.id
+        )
+        """
+    )
+    op.create_unique_constraint(
+        'uq_assignmentsubmission_assignment_student', 'assignmentsubmission', ['assignment_id', 'student_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_assignmentsubmission_assignment_student', 'assignmentsubmission', type_='unique')
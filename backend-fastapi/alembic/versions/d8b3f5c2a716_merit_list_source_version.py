@@ -0,0 +1,42 @@
+"""merit list source version
+
+Revision ID: d8b3f5c2a716
+Revises: c5a1e7f3b289
+Create Date: 2026-10-20 04:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f5c2a716'
+down_revision: Union[str, Sequence[str], None] = 'c5a1e7f3b289'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _meritlist_columns():
+    # meritlist is created by create_all, so it is absent until the app has started once
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('meritlist'):
+        return None
+    return {column['name'] for column in inspector.get_columns('meritlist')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _meritlist_columns()
+    if columns is not None and 'source_version' not in columns:
+        # Stored rankings have no stamp, so each is rebuilt on its next read
+        op.add_column('meritlist', sa.Column('source_version', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = _meritlist_columns()
+    if columns is not None and 'source_version' in columns:
+        op.drop_column('meritlist', 'source_version')
@@ -0,0 +1,44 @@
+"""lab equipment search
+
+Revision ID: e5a0c7b94d18
+Revises: d17b3e8c5a92
+Create Date: 2026-10-19 20:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c7b94d18'
+down_revision: Union[str, Sequence[str], None] = 'd17b3e8c5a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other databases search through the in-memory index in app.utils.equipment_search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        "ALTER TABLE labequipment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED"
+    )
+    op.execute('CREATE INDEX ix_labequipment_search_vector ON labequipment USING gin (search_vector)')
+    op.execute('CREATE INDEX ix_labequipment_name_trgm ON labequipment USING gin (name gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_labequipment_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_labequipment_search_vector')
+    op.execute('ALTER TABLE labequipment DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,29 @@
+"""assignment submission quota
+
+Revision ID: e8c3f6a1d274
+Revises: d4a7b2e9f630
+Create Date: 2026-10-20 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3f6a1d274'
+down_revision: Union[str, Sequence[str], None] = 'd4a7b2e9f630'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assignment', sa.Column('max_submission_bytes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('assignment', 'max_submission_bytes')
@@ -0,0 +1,29 @@
+"""assignment created_by index
+
+Revision ID: f1d9a4c7e358
+Revises: e8c3f6a1d274
+Create Date: 2026-10-20 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d9a4c7e358'
+down_revision: Union[str, Sequence[str], None] = 'e8c3f6a1d274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_assignment_created_by'), 'assignment', ['created_by'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_assignment_created_by'), table_name='assignment')
@@ -0,0 +1,35 @@
+"""booking expired status
+
+Revision ID: f2b8d4c61e07
+Revises: e5a0c7b94d18
+Create Date: 2026-10-19 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4c61e07'
+down_revision: Union[str, Sequence[str], None] = 'e5a0c7b94d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other databases store the enum as plain text
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE bookingstatus ADD VALUE IF NOT EXISTS 'expired'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value; fold expired bookings back into rejected
+    op.execute("UPDATE booking SET status = 'rejected' WHERE status = 'expired'")
+    op.execute("UPDATE bookingseries SET status = 'rejected' WHERE status = 'expired'")
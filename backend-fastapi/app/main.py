@@ -1,8 +1,13 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.utils.db import create_db_and_tables
+from app.utils.config import settings
+from app.utils.jobs import run_periodically
+from app.utils.fee_sweeper import run_overdue_fee_sweep
+from app.utils.booking_sweeper import run_booking_sweep
 from .routes import (
     files,
     auth,
@@ -22,13 +27,21 @@ from .routes import (
     grades,
     notices,
     projects,
-    results
+    research,
+    results,
+    analytics
 )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    jobs = [
+        asyncio.create_task(run_periodically(run_overdue_fee_sweep, settings.overdue_sweep_interval_seconds)),
+        asyncio.create_task(run_periodically(run_booking_sweep, settings.booking_sweep_interval_seconds)),
+    ]
     yield
+    for job in jobs:
+        job.cancel()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -48,6 +61,7 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(courses.router, prefix="/api")
 app.include_router(programs.router, prefix="/api")
 app.include_router(projects.router, prefix="/api")  # Add this line
+app.include_router(research.router, prefix="/api")
 app.include_router(scheduling.router)
 app.include_router(rooms.router)
 app.include_router(exams.router)
@@ -63,4 +77,5 @@ app.include_router(users.router)
 app.include_router(students.router)
 app.include_router(files.router)
 app.include_router(grades.router, tags=["Grades"])
-app.include_router(results.router)
\ No newline at end of file
+app.include_router(results.router)
+app.include_router(analytics.router)
\ No newline at end of file
@@ -2,18 +2,19 @@
 from .user import User, FacultyProfile, StudentProfile, StaffProfile, UserEducation, UserPublication, UserCreateRequest, UserLoginRequest, UserRoles, StudentTypeEnum
 from .program import Program
 from .course import Course, CourseType, CourseMaterial
-from .assignment import Assignment, AssignmentSubmission
+from .assignment import Assignment, AssignmentSubmission, AssignmentSubmissionFile
 from .class_schedule import ClassSchedule
-from .equipment import LabEquipment, Booking
+from .equipment import LabEquipment, Booking, BookingArchive, BookingSeries
 from .event import Event, EventCategoryEnum
 from .notice import Notice, NoticeCategoryEnum
-from .exam import ExamTimeTable, ExamTypeEnum
-from .fee import Fee, FeePayment, StudentFee, StripePaymentIntent, FeeTypeEnum, FeeStatusEnum, PaymentMethodEnum
-from .grades import Grade
+from .exam import ExamTimeTable, ExamSeat, ExamTypeEnum
+from .fee import Fee, FeePayment, StudentFee, StripePaymentIntent, FeeSweepRun, FeeTypeEnum, FeeStatusEnum, PaymentMethodEnum
+from .grades import Grade, SemesterGPA, MeritList, MeritRank
 from .meeting import Meeting
 from .project import Project, ProjectTeamMember
 from .research import ResearchPaper, ResearchPaperAuthor
-from .room import Room, RoomAvailabilitySlot, RoomBooking
+from .room import Room, RoomAvailabilitySlot, RoomBooking, RoomBookingArchive, RoomBookingSeries
+from .utilization import UtilizationRollup, ResourceType
 
 from enum import Enum
 from typing import Optional
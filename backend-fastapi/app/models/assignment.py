@@ -1,6 +1,7 @@
 
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, SQLModel
 import uuid
 
@@ -18,13 +19,29 @@ class Assignment(SQLModel, table=True):
     weight: Optional[float]
     status: Optional[str]
     submission_count: Optional[int]
-    created_by: Optional[str] = Field(foreign_key="user.id")
+    max_submission_bytes: Optional[int] = None  # total upload size per submission; None uses the default setting
+    created_by: Optional[str] = Field(foreign_key="user.id", index=True)
 
 class AssignmentSubmission(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("assignment_id", "student_id", name="uq_assignmentsubmission_assignment_student"),
+    )
+
     id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     assignment_id: Optional[str] = Field(foreign_key="assignment.id")
     student_id: Optional[str] = Field(foreign_key="user.id")
     submission_time: Optional[datetime]
     marks_obtained: Optional[int]
     feedback: Optional[str]
-    status: Optional[str]
\ No newline at end of file
+    status: Optional[str]
+
+class AssignmentSubmissionFile(SQLModel, table=True):
+    """A file uploaded with a submission, stored under SUBMISSION_FILE_PATH as `stored_name`"""
+    id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    submission_id: str = Field(foreign_key="assignmentsubmission.id", index=True)
+    filename: str
+    stored_name: str
+    content_type: Optional[str] = None
+    size: int
+    sha256: str
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
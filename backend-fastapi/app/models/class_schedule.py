@@ -1,8 +1,16 @@
 from datetime import time
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 class ClassSchedule(SQLModel, table=True):
+    __table_args__ = (
+        # Conflict probes look up overlapping classes per day and room/instructor/batch
+        Index("ix_classschedule_day_room_start", "day", "room", "start_time"),
+        Index("ix_classschedule_day_instructor_start", "day", "instructor", "start_time"),
+        Index("ix_classschedule_day_batch_start", "day", "batch", "start_time"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     course_code: Optional[str] = Field(foreign_key="course.course_code")
     batch: Optional[str]
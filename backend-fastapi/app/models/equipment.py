@@ -1,10 +1,13 @@
-from datetime import datetime, time
-from typing import List, Optional
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
 from enum import Enum
 from uuid import UUID, uuid4
-from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import DDL, JSON, Index, event
+from sqlmodel import SQLModel, Field, Relationship, Column
 from pydantic import BaseModel, validator
 
+from app.utils.recurrence import validate_weekdays
+
 # ======================
 # ENUM DEFINITIONS
 # ======================
@@ -19,6 +22,7 @@ class BookingStatus(str, Enum):
     approved = "approved"
     rejected = "rejected"
     completed = "completed"
+    expired = "expired"  # still pending when its start time passed
 
 class EquipmentCategory(str, Enum):
     computing = "computing"
@@ -44,6 +48,11 @@ class LabEquipment(SQLModel, table=True):
 
 
 class Booking(SQLModel, table=True):
+    __table_args__ = (
+        # Overlap probes scan one equipment's bookings by start time
+        Index("ix_booking_equipment_start", "equipment_id", "start_time"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     equipment_id: str = Field(foreign_key="labequipment.id")
     user_id: str = Field(foreign_key="user.id")
@@ -51,10 +60,77 @@ class Booking(SQLModel, table=True):
     end_time: datetime = Field(index=True)
     purpose: str
     status: BookingStatus = Field(default=BookingStatus.pending)
+    rejection_reason: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     equipment: "LabEquipment" = Relationship(back_populates="bookings")
 
+# On Postgres the database itself rejects overlapping active bookings of an
+# equipment; other databases rely on the row lock taken by the booking routes
+BOOKING_OVERLAP_CONSTRAINT = (
+    "ALTER TABLE booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist "
+    "(equipment_id WITH =, tsrange(start_time, end_time) WITH &&) "
+    "WHERE (status IN ('approved', 'pending'))"
+)
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+event.listen(
+    Booking.__table__,
+    "after_create",
+    DDL(BOOKING_OVERLAP_CONSTRAINT).execute_if(dialect="postgresql")
+)
+
+# Postgres full-text search: a weighted tsvector kept up to date by the database,
+# plus trigrams on the name for misspelt queries
+EQUIPMENT_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE labequipment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX ix_labequipment_search_vector ON labequipment USING gin (search_vector)",
+    "CREATE INDEX ix_labequipment_name_trgm ON labequipment USING gin (name gin_trgm_ops)",
+]
+for statement in EQUIPMENT_SEARCH_DDL:
+    event.listen(LabEquipment.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+class BookingArchive(SQLModel, table=True):
+    """Closed bookings moved out of `booking` by the lifecycle sweeper"""
+    __table_args__ = (
+        Index("ix_bookingarchive_equipment_start", "equipment_id", "start_time"),
+    )
+
+    id: UUID = Field(primary_key=True)
+    equipment_id: str
+    user_id: str = Field(index=True)
+    start_time: datetime
+    end_time: datetime
+    purpose: str
+    status: BookingStatus
+    rejection_reason: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    archived_at: datetime = Field(default_factory=datetime.now)
+
+class BookingSeries(SQLModel, table=True):
+    """A weekly recurring booking, stored once and expanded into occurrences on demand"""
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    equipment_id: str = Field(foreign_key="labequipment.id", index=True)
+    user_id: str = Field(foreign_key="user.id")
+    start_date: date
+    until: date
+    start_time: time
+    end_time: time
+    weekdays: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    interval_weeks: int = Field(default=1)
+    exceptions: List[str] = Field(default_factory=list, sa_column=Column(JSON))  # ISO dates skipped
+    purpose: str
+    status: BookingStatus = Field(default=BookingStatus.pending)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None
 
 
 # ======================
@@ -85,6 +161,50 @@ class BookingCreate(BaseModel):
             raise ValueError("End time must be after start time")
         return v
 
+class BookingSeriesCreate(BaseModel):
+    start_date: date
+    until: date
+    start_time: time
+    end_time: time
+    weekdays: List[str] = []  # defaults to the weekday of start_date
+    interval_weeks: int = 1
+    exceptions: List[date] = []
+    purpose: str
+
+    @validator('end_time')
+    def validate_time_range(cls, v, values):
+        if 'start_time' in values and v <= values['start_time']:
+            raise ValueError("End time must be after start time")
+        return v
+
+    @validator('until')
+    def validate_date_range(cls, v, values):
+        if 'start_date' in values and v < values['start_date']:
+            raise ValueError("Until date must not be before start date")
+        return v
+
+    @validator('weekdays')
+    def check_weekdays(cls, v):
+        return validate_weekdays(v)
+
+    @validator('interval_weeks')
+    def validate_interval(cls, v):
+        if v < 1:
+            raise ValueError("Interval must be at least one week")
+        return v
+
+class BookingSeriesUpdate(BaseModel):
+    purpose: Optional[str] = None
+    status: Optional[BookingStatus] = None
+
+class BookingReviewItem(BaseModel):
+    id: UUID
+    status: BookingStatus  # approved or rejected
+    rejection_reason: Optional[str] = None
+
+class BookingReviewRequest(BaseModel):
+    decisions: List[BookingReviewItem]
+
 class AvailabilityCheckRequest(BaseModel):
     equipment_id: str
     start_time: datetime
@@ -114,6 +234,13 @@ class LabEquipmentApiResponse(BaseModel):
     page: Optional[int] = None
     limit: Optional[int] = None
 
+class EquipmentSearchResponse(BaseModel):
+    data: List[LabEquipmentResponse]
+    total: int
+    page: int
+    limit: int
+    facets: Dict[str, Dict[str, int]]  # "category" and "status" -> value -> count
+
 class BookingResponse(BaseModel):
     id: UUID
     equipment_id: str
@@ -123,6 +250,24 @@ class BookingResponse(BaseModel):
     end_time: datetime
     purpose: str
     status: BookingStatus
+    rejection_reason: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+class BookingSeriesResponse(BaseModel):
+    id: UUID
+    equipment_id: str
+    user_id: str
+    start_date: date
+    until: date
+    start_time: time
+    end_time: time
+    weekdays: List[str]
+    interval_weeks: int
+    exceptions: List[date]
+    purpose: str
+    status: BookingStatus
+    occurrences: List[TimeRange] = []  # ISO datetimes within the requested window
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -130,6 +275,12 @@ class BookingApiResponse(BaseModel):
     data: List[BookingResponse]
     total: int
 
+class BookingReviewResult(BaseModel):
+    id: UUID
+    success: bool
+    status: Optional[BookingStatus] = None
+    message: Optional[str] = None
+
 class AvailabilityResponse(BaseModel):
     is_available: bool
     conflicting_bookings: List[BookingResponse] = []
@@ -182,6 +333,7 @@ def booking_to_response(booking: Booking) -> BookingResponse:
         end_time=booking.end_time,
         purpose=booking.purpose,
         status=booking.status,
+        rejection_reason=booking.rejection_reason,
         created_at=booking.created_at,
         updated_at=booking.updated_at
     )
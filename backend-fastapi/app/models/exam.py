@@ -3,6 +3,7 @@ from datetime import datetime, time
 from enum import Enum
 from typing import Optional
 
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 class ExamTypeEnum(str, Enum):
@@ -13,6 +14,13 @@ class ExamTypeEnum(str, Enum):
     Practical = "Practical"
 
 class ExamTimeTable(SQLModel, table=True):
+    __table_args__ = (
+        # Clash probes look up nearby exams per room, invigilator and semester
+        Index("ix_examtimetable_room_schedule", "room", "exam_schedule"),
+        Index("ix_examtimetable_invigilator_schedule", "invigilator", "exam_schedule"),
+        Index("ix_examtimetable_semester_schedule", "semester", "exam_schedule"),
+    )
+
     id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     course_code: Optional[str] = Field(foreign_key="course.course_code")
     semester: Optional[str] = Field(foreign_key="program.id")
@@ -20,7 +28,7 @@ class ExamTimeTable(SQLModel, table=True):
     exam_schedule: Optional[datetime]
     total_marks: Optional[int]
     weight: Optional[float]
-    duration: Optional[time]
+    duration: Optional[time]  # length of the sitting, e.g. 02:30
     room: Optional[str] = Field(foreign_key="room.room")
     invigilator: Optional[str]
 
@@ -31,4 +39,21 @@ class ExamResult(SQLModel, table=True):
     marks_obtained: Optional[float]
     status: Optional[str]
     feedback: Optional[str]
-    submission_time: Optional[datetime]
\ No newline at end of file
+    submission_time: Optional[datetime]
+
+class ExamSeat(SQLModel, table=True):
+    """One student's seat in an exam's seating plan"""
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", name="uq_examseat_exam_student"),
+        UniqueConstraint("exam_id", "room", "seat_number", name="uq_examseat_exam_room_seat"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    exam_id: str = Field(foreign_key="examtimetable.id", index=True)
+    room: str = Field(foreign_key="room.room")
+    seat_number: int
+    seat_row: int
+    seat_column: int
+    student_id: str = Field(foreign_key="user.id")
+    roll_number: Optional[str] = None
+    batch: str
@@ -80,4 +80,12 @@ class StripePaymentIntent(SQLModel, table=True):
     status: str  # Stripe payment intent status
     client_secret: str
     created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class FeeSweepRun(SQLModel, table=True):
+    """Watermark for the overdue-fee sweeper, one row per swept day; sweeps of a day serialize on its row lock"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    swept_through: date = Field(unique=True)  # fees with a deadline before this date were swept
+    marked_overdue: int = Field(default=0)  # summed over the day's sweeps
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
@@ -1,10 +1,14 @@
-from typing import Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
-from app.models.course import Course, CourseSemester
-from app.models.user import StudentProfile
-
 class Grade(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_grade_student_semester", "student_id", "semester"),
+        Index("ix_grade_course_semester", "course_code", "semester"),
+    )
+
     id: Optional[str] = Field(default=None, primary_key=True)
     student_id: Optional[str] = Field(foreign_key="user.id")
     course_code: Optional[str] = Field(foreign_key="course.course_code")
@@ -13,6 +17,48 @@ class Grade(SQLModel, table=True):
     final_marks: Optional[float]
     total_marks: Optional[float]
     grade: Optional[float]
+    # Stamped on every insert and update, including bulk writes; transcripts are versioned by it
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.now,
+        sa_column_kwargs={"default": datetime.now, "onupdate": datetime.now}
+    )
+
+class SemesterGPA(SQLModel, table=True):
+    """Credit-weighted grade points of one student in one semester, kept in step with their Grade rows"""
+    __table_args__ = (
+        UniqueConstraint("student_id", "semester", name="uq_semestergpa_student_semester"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    student_id: str = Field(foreign_key="user.id")
+    semester: str
+    credits: float
+    quality_points: float  # sum of grade point x course credits
+    gpa: float
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class MeritList(SQLModel, table=True):
+    """A materialized ranking of one scope; its rows are MeritRank, and it is dropped when a member's GPA changes"""
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_value", name="uq_meritlist_scope_value"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scope: str  # batch, program or semester
+    scope_value: str
+    students: int
+    source_version: Optional[str] = None  # scope_version of the SemesterGPA rows it was ranked from
+    computed_at: datetime = Field(default_factory=datetime.now)
+
+class MeritRank(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    merit_list_id: int = Field(foreign_key="meritlist.id", index=True)
+    student_id: str = Field(foreign_key="user.id", index=True)
+    rank: int  # competition ranking: tied students share a rank and the next rank is skipped
+    score: float  # CGPA for batch and program, the semester GPA for semester
+    credits: float
+    percentile: float
+    tied: bool
 
 class GradeCreateRequest(SQLModel):
     student_id: str
@@ -33,11 +79,104 @@ class GradeUpdateRequest(SQLModel):
     grade: Optional[float] = None
 
 class GradeResponse(SQLModel):
-    id: int
-    student: StudentProfile
-    course: Course
-    semester: CourseSemester
+    id: str
+    student_id: Optional[str] = None
+    course_code: Optional[str] = None
+    semester: Optional[str] = None
     incourse_marks: Optional[float] = None
     final_marks: Optional[float] = None
     total_marks: Optional[float] = None
-    grade: Optional[float] = None
\ No newline at end of file
+    grade: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+class GradeBulkRowResult(SQLModel):
+    row: int
+    id: Optional[str] = None
+    action: Optional[str] = None  # "inserted" or "updated" once written
+    errors: List[str] = []
+
+class GradeBulkResponse(SQLModel):
+    written: bool
+    total: int
+    inserted: int
+    updated: int
+    results: List[GradeBulkRowResult]
+
+class SemesterGPAResponse(SQLModel):
+    semester: str
+    credits: float
+    gpa: float
+
+class StudentGPAResponse(SQLModel):
+    student_id: str
+    semesters: List[SemesterGPAResponse]
+    credits: float
+    cgpa: Optional[float] = None
+
+class GPARecomputeResponse(SQLModel):
+    students: int
+    semesters: int
+
+class MeritRankResponse(SQLModel):
+    rank: int
+    student_id: str
+    name: Optional[str] = None
+    roll_number: Optional[str] = None
+    score: float
+    credits: float
+    percentile: float
+    tied: bool
+
+class MeritListResponse(SQLModel):
+    scope: str
+    scope_value: str
+    students: int
+    computed_at: datetime
+    data: List[MeritRankResponse]
+
+class HistogramBin(SQLModel):
+    lower: float
+    upper: float  # exclusive, except for the last bin
+    count: int
+
+class GradeStatisticsResponse(SQLModel):
+    course_code: str
+    semester: str
+    count: int  # rows with total marks
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    std_dev: Optional[float] = None  # population standard deviation
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean_grade_point: Optional[float] = None
+    histogram: List[HistogramBin]
+    letter_grades: Dict[str, int]
+    computed_at: datetime
+
+class TranscriptCourse(SQLModel):
+    course_code: str
+    course_title: Optional[str] = None
+    credits: float
+    total_marks: Optional[float] = None
+    grade_point: Optional[float] = None
+    letter_grade: Optional[str] = None
+
+class TranscriptSemester(SQLModel):
+    semester: str
+    courses: List[TranscriptCourse]
+    credits: float  # graded credits
+    gpa: Optional[float] = None
+    cgpa: Optional[float] = None  # cumulative up to and including this semester
+
+class TranscriptResponse(SQLModel):
+    student_id: str
+    name: Optional[str] = None
+    roll_number: Optional[str] = None
+    major: Optional[str] = None
+    degree: Optional[str] = None
+    admission_date: Optional[date] = None
+    semesters: List[TranscriptSemester]
+    credits: float
+    cgpa: Optional[float] = None
+    version: str
+    generated_at: datetime
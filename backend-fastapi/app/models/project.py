@@ -1,4 +1,5 @@
 from typing import Optional
+from sqlalchemy import DDL, event
 from sqlmodel import Field, SQLModel
 
 class Project(SQLModel, table=True):
@@ -14,5 +15,16 @@ class Project(SQLModel, table=True):
 
 class ProjectTeamMember(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    project_id: Optional[str] = Field(default=None, foreign_key="project.id")
+    project_id: Optional[str] = Field(default=None, foreign_key="project.id", index=True)
     member: Optional[str] = Field(default=None, foreign_key="user.id")
+
+# Postgres full-text search over past projects, kept up to date by the database
+PROJECT_SEARCH_DDL = [
+    "ALTER TABLE project ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(topic, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(abstract, '')), 'C')) STORED",
+    "CREATE INDEX ix_project_search_vector ON project USING gin (search_vector)",
+]
+for statement in PROJECT_SEARCH_DDL:
+    event.listen(Project.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
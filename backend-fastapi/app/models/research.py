@@ -1,5 +1,6 @@
 from datetime import date
 from typing import Optional
+from sqlalchemy import DDL, event
 from sqlmodel import Field, SQLModel
 
 class ResearchPaper(SQLModel, table=True):
@@ -13,5 +14,26 @@ class ResearchPaper(SQLModel, table=True):
 
 class ResearchPaperAuthor(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    paper_id: Optional[str] = Field(default=None, foreign_key="researchpaper.id")
-    author_name: Optional[str] = None
\ No newline at end of file
+    paper_id: Optional[str] = Field(default=None, foreign_key="researchpaper.id", index=True)
+    author_name: Optional[str] = None
+
+# Postgres full-text search: a generated vector over the paper itself and an
+# expression index over author names, which live in their own table
+AUTHOR_NAME_VECTOR = "to_tsvector('simple', coalesce(researchpaperauthor.author_name, ''))"
+RESEARCH_PAPER_SEARCH_DDL = [
+    "ALTER TABLE researchpaper ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(journal, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(abstract, '')), 'C')) STORED",
+    "CREATE INDEX ix_researchpaper_search_vector ON researchpaper USING gin (search_vector)",
+]
+for statement in RESEARCH_PAPER_SEARCH_DDL:
+    event.listen(ResearchPaper.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    ResearchPaperAuthor.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_researchpaperauthor_name_search ON researchpaperauthor "
+        "USING gin (to_tsvector('simple', coalesce(author_name, '')))"
+    ).execute_if(dialect="postgresql")
+)
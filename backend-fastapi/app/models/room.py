@@ -1,7 +1,7 @@
-from datetime import date, time
+from datetime import date, datetime, time
 from typing import List, Optional
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 from app.models.user import User
@@ -21,6 +21,11 @@ class RoomAvailabilitySlot(SQLModel, table=True):
     end_time: Optional[time]
 
 class RoomBooking(SQLModel, table=True):
+    __table_args__ = (
+        # Conflict probes look up overlapping bookings per room and date
+        Index("ix_roombooking_room_date_start", "room", "booking_date", "start_time"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     room: Optional[str] = Field(foreign_key="room.room")
     requested_by: Optional[str] = Field(foreign_key="user.id")
@@ -30,6 +35,49 @@ class RoomBooking(SQLModel, table=True):
     start_time: Optional[time]
     end_time: Optional[time]
     attendees: Optional[int]
-    status: Optional[str] = Field(default="Pending")  # Pending, Approved, Rejected
+    status: Optional[str] = Field(default="Pending")  # Pending, Approved, Rejected, Completed, Expired
+    request_date: Optional[date]
+    rejection_reason: Optional[str] = None
+
+class RoomBookingArchive(SQLModel, table=True):
+    """Closed room bookings moved out of `roombooking` by the lifecycle sweeper"""
+    __table_args__ = (
+        Index("ix_roombookingarchive_room_date", "room", "booking_date"),
+    )
+
+    id: int = Field(primary_key=True)
+    room: Optional[str]
+    requested_by: Optional[str] = Field(default=None, index=True)
+    email: Optional[str]
+    purpose: Optional[str]
+    booking_date: Optional[date]
+    start_time: Optional[time]
+    end_time: Optional[time]
+    attendees: Optional[int]
+    status: Optional[str]
+    request_date: Optional[date]
+    rejection_reason: Optional[str] = None
+    archived_at: datetime = Field(default_factory=datetime.now)
+
+class RoomBookingSeries(SQLModel, table=True):
+    """A weekly recurring room booking, stored once and expanded into occurrences on demand"""
+    __table_args__ = (
+        Index("ix_roombookingseries_room_dates", "room", "start_date", "until"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    room: Optional[str] = Field(foreign_key="room.room")
+    requested_by: Optional[str] = Field(foreign_key="user.id")
+    email: Optional[str]
+    purpose: Optional[str]
+    start_date: date
+    until: date
+    start_time: time
+    end_time: time
+    weekdays: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    interval_weeks: int = Field(default=1)
+    exceptions: List[str] = Field(default_factory=list, sa_column=Column(JSON))  # ISO dates skipped
+    attendees: Optional[int]
+    status: Optional[str] = Field(default="Pending")  # Pending, Approved, Rejected, Completed, Expired
     request_date: Optional[date]
     rejection_reason: Optional[str] = None
@@ -86,6 +86,11 @@ class StudentProfile(SQLModel, table=True):
     cgpa: Optional[float]
     extracurricular_activities: Optional[str]
 
+def student_batch(major: Optional[str], admission_date: Optional[date]) -> str:
+    """Students of one major admitted in the same year form a batch"""
+    year = str(admission_date.year) if admission_date else ""
+    return "-".join(part for part in (major or "", year) if part) or "unassigned"
+
 class StaffProfile(SQLModel, table=True):
     id: Optional[str] = Field(default=None, primary_key=True)
     user_id: Optional[str] = Field(foreign_key="user.id")
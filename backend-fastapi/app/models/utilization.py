@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, UniqueConstraint
+from sqlmodel import Column, Field, SQLModel
+
+class ResourceType(str, Enum):
+    equipment = "equipment"
+    room = "room"
+
+class UtilizationRollup(SQLModel, table=True):
+    """Booked minutes of one equipment or room on one day, kept in step with its approved bookings"""
+    __table_args__ = (
+        UniqueConstraint("resource_type", "resource_id", "day", name="uq_utilizationrollup_resource_day"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    resource_type: ResourceType
+    resource_id: str
+    day: date = Field(index=True)
+    booked_minutes: int = Field(default=0)
+    hourly_minutes: List[int] = Field(default_factory=list, sa_column=Column(JSON))  # 24 buckets
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class WeeklyUsage(BaseModel):
+    week_start: date
+    booked_hours: float
+
+class ResourceUtilization(BaseModel):
+    resource_id: str
+    booked_hours: float
+    idle_ratio: float
+    weeks: List[WeeklyUsage]
+
+class UtilizationResponse(BaseModel):
+    resource_type: ResourceType
+    start_date: date
+    end_date: date
+    available_hours_per_day: float
+    resources: List[ResourceUtilization]
+    heatmap: Dict[str, List[float]]  # weekday -> booked hours in each hour of the day
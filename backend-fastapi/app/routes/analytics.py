@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+
+from app.models.equipment import LabEquipment
+from app.models.room import Room
+from app.models.user import UserRoles
+from app.models.utilization import (
+    ResourceType,
+    ResourceUtilization,
+    UtilizationResponse,
+    UtilizationRollup,
+    WeeklyUsage
+)
+from app.utils.auth import roled_access
+from app.utils.db import get_session
+from app.utils.recurrence import WEEKDAYS
+from app.utils.utilization import rebuild_usage
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+MAX_RANGE_DAYS = 366
+
+@router.get(
+    "/utilization",
+    response_model=UtilizationResponse,
+    dependencies=[Depends(roled_access(UserRoles.admin))]
+)
+async def get_utilization(
+    resource_type: ResourceType,
+    start_date: date,
+    end_date: date,
+    resource_ids: Optional[List[str]] = Query(None),
+    available_hours_per_day: float = Query(8, gt=0, le=24),
+    session: Session = Depends(get_session)
+):
+    """Weekly booked hours, idle ratios and a peak-hour heatmap from the daily rollups"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    days = (end_date - start_date).days + 1
+    if days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_RANGE_DAYS} days")
+
+    # Every resource is reported, including those never booked in the range
+    if resource_ids:
+        ids = list(dict.fromkeys(resource_ids))
+    elif resource_type == ResourceType.equipment:
+        ids = list(session.exec(select(LabEquipment.id)).all())
+    else:
+        ids = list(session.exec(select(Room.room)).all())
+
+    query = select(UtilizationRollup).where(
+        UtilizationRollup.resource_type == resource_type,
+        UtilizationRollup.day >= start_date,
+        UtilizationRollup.day <= end_date
+    )
+    if resource_ids:
+        query = query.where(UtilizationRollup.resource_id.in_(ids))
+
+    first_week = start_date - timedelta(days=start_date.weekday())
+    week_starts = [first_week + timedelta(weeks=i) for i in range((end_date - first_week).days // 7 + 1)]
+    weekly = defaultdict(lambda: defaultdict(int))
+    totals = defaultdict(int)
+    heatmap = {weekday: [0] * 24 for weekday in WEEKDAYS}
+    for rollup in session.exec(query).all():
+        week_start = rollup.day - timedelta(days=rollup.day.weekday())
+        weekly[rollup.resource_id][week_start] += rollup.booked_minutes
+        totals[rollup.resource_id] += rollup.booked_minutes
+        hours = heatmap[WEEKDAYS[rollup.day.weekday()]]
+        for hour, minutes in enumerate(rollup.hourly_minutes or []):
+            hours[hour] += minutes
+
+    available_minutes = days * available_hours_per_day * 60
+    resources = [
+        ResourceUtilization(
+            resource_id=resource_id,
+            booked_hours=round(totals[resource_id] / 60, 2),
+            idle_ratio=round(max(0.0, 1 - totals[resource_id] / available_minutes), 4),
+            weeks=[
+                WeeklyUsage(week_start=week_start, booked_hours=round(weekly[resource_id][week_start] / 60, 2))
+                for week_start in week_starts
+            ]
+        )
+        for resource_id in ids
+    ]
+    resources.sort(key=lambda r: (-r.booked_hours, r.resource_id))
+
+    return UtilizationResponse(
+        resource_type=resource_type,
+        start_date=start_date,
+        end_date=end_date,
+        available_hours_per_day=available_hours_per_day,
+        resources=resources,
+        heatmap={weekday: [round(minutes / 60, 2) for minutes in hours] for weekday, hours in heatmap.items()}
+    )
+
+@router.post("/utilization/rebuild", dependencies=[Depends(roled_access(UserRoles.admin))])
+async def rebuild_utilization(since: Optional[date] = None, session: Session = Depends(get_session)):
+    """Recompute utilization rollups from booking history, by default back to the archive cutoff"""
+    rebuilt = rebuild_usage(session, since)
+    return {"message": "Utilization rollups rebuilt", "days": rebuilt}
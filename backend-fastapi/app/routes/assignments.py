@@ -1,14 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+import csv
+import io
+import re
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status, Body
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 from datetime import datetime
 from typing import Optional, List
 
 from app.utils.db import get_session
 from app.utils.auth import get_current_user
 from app.models.assignment import Assignment
-from app.models.assignment import AssignmentSubmission
+from app.models.assignment import AssignmentSubmission, AssignmentSubmissionFile
 from app.models.user import User
+from app.utils.config import settings
+from app.utils.submission_storage import (
+    StoredFile,
+    SubmissionUploadError,
+    discard_stored_files,
+    store_multipart_files,
+    stream_zip
+)
 
 router = APIRouter(prefix="/api/staff-api/assignments", tags=["assignments"])
 
@@ -21,6 +36,7 @@ class AssignmentCreateRequest(BaseModel):
     deadline: datetime
     description: str = ""
     created_by: str
+    max_submission_bytes: Optional[int] = Field(None, gt=0)
 
 class AssignmentUpdateRequest(BaseModel):
     title: Optional[str] = None
@@ -30,11 +46,58 @@ class AssignmentUpdateRequest(BaseModel):
     semester: Optional[str] = None
     deadline: Optional[datetime] = None
     description: Optional[str] = None
+    max_submission_bytes: Optional[int] = Field(None, gt=0)
 
 class GradeUpdateRequest(BaseModel):
     marks_obtained: int
     feedback: Optional[str] = None
 
+class SubmissionGradeRow(BaseModel):
+    # One of submission_id or student_id picks the submission
+    submission_id: Optional[str] = None
+    student_id: Optional[str] = None
+    marks_obtained: int
+    feedback: Optional[str] = None
+
+class SubmissionGradeResult(BaseModel):
+    row: int
+    submission_id: Optional[str] = None
+    success: bool
+    errors: List[str] = []
+
+class InboxSubmission(BaseModel):
+    submission_id: str
+    assignment_id: str
+    assignment_title: str
+    course_code: Optional[str] = None
+    course_title: Optional[str] = None
+    student_id: Optional[str] = None
+    student_name: Optional[str] = None
+    submission_time: Optional[datetime] = None
+    status: Optional[str] = None
+    marks_obtained: Optional[int] = None
+    feedback: Optional[str] = None
+
+class AssignmentSubmissionCounts(BaseModel):
+    assignment_id: str
+    title: str
+    submitted: int
+    graded: int
+    ungraded: int
+
+class SubmissionInboxResponse(BaseModel):
+    data: List[InboxSubmission]
+    total: int
+    page: int
+    limit: int
+    assignments: List[AssignmentSubmissionCounts]
+
+class BulkGradeResponse(BaseModel):
+    written: bool
+    total: int
+    graded: int
+    results: List[SubmissionGradeResult]
+
 @router.post("", response_model=dict)
 async def create_assignment(
     assignment_data: AssignmentCreateRequest,
@@ -56,7 +119,8 @@ async def create_assignment(
         semester=assignment_data.semester,
         deadline=assignment_data.deadline,
         description=assignment_data.description,
-        created_by=assignment_data.created_by
+        created_by=assignment_data.created_by,
+        max_submission_bytes=assignment_data.max_submission_bytes
     )
     session.add(assignment)
     session.commit()
@@ -105,41 +169,143 @@ async def list_assignments(
     assignments = session.exec(select(Assignment)).all()
     return assignments
 
+def insert_submission(session: Session, submission: AssignmentSubmission) -> bool:
+    """Insert a submission unless the student already submitted this assignment; False if they had"""
+    values = submission.model_dump()
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        result = session.execute(
+            insert(AssignmentSubmission)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=["assignment_id", "student_id"])
+        )
+        return result.rowcount == 1
+    try:
+        with session.begin_nested():
+            session.execute(AssignmentSubmission.__table__.insert().values(**values))
+        return True
+    except IntegrityError:
+        return False
+
 @router.post("/{assignment_id}/submit", response_model=dict)
 async def submit_assignment(
     assignment_id: str,
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
+    """Submit an assignment, optionally with files sent as multipart/form-data.
+
+    Files are streamed to storage chunk by chunk with a SHA-256 of each, and
+    the upload is cut off once it passes the assignment's size quota.
+    """
     assignment = session.get(Assignment, assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    # Check if the student has already submitted
-    existing_submission = session.exec(
-        select(AssignmentSubmission).where(
-            AssignmentSubmission.assignment_id == assignment_id,
-            AssignmentSubmission.student_id == current_user.id
-        )
-    ).first()
-    if existing_submission:
-        raise HTTPException(status_code=400, detail="You have already submitted this assignment.")
-    # Create a new submission record
+    files: List[StoredFile] = []
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/"):
+        # Early exit so a resubmission is not uploaded for nothing; the insert below still decides
+        if session.exec(
+            select(AssignmentSubmission.id).where(
+                AssignmentSubmission.assignment_id == assignment_id,
+                AssignmentSubmission.student_id == current_user.id
+            )
+        ).first():
+            raise HTTPException(status_code=400, detail="You have already submitted this assignment.")
+        limit = assignment.max_submission_bytes or settings.assignment_submission_max_bytes
+        try:
+            files = await store_multipart_files(content_type, request.stream(), limit)
+        except SubmissionUploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
     submission = AssignmentSubmission(
         assignment_id=assignment_id,
         student_id=current_user.id,
         submission_time=datetime.utcnow(),
         status="Submitted"
     )
-    session.add(submission)
-    # Increment submission_count (initialize if None)
-    if assignment.submission_count is None:
-        assignment.submission_count = 1
-    else:
-        assignment.submission_count += 1
-    session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
-    return {"message": "Assignment submitted successfully", "submission_count": assignment.submission_count, "submission_id": submission.id, "status": submission.status}
+    try:
+        # The unique (assignment_id, student_id) constraint decides between concurrent submissions
+        inserted = insert_submission(session, submission)
+        if inserted:
+            if files:
+                session.execute(
+                    insert(AssignmentSubmissionFile),
+                    [{"submission_id": submission.id, **stored.model_dump()} for stored in files]
+                )
+            submission_count = session.execute(
+                update(Assignment)
+                .where(Assignment.id == assignment_id)
+                .values(submission_count=func.coalesce(Assignment.submission_count, 0) + 1)
+                .returning(Assignment.submission_count)
+            ).scalar_one()
+            session.commit()
+    except Exception:
+        session.rollback()
+        discard_stored_files(files)
+        raise
+    if not inserted:
+        session.rollback()
+        discard_stored_files(files)
+        raise HTTPException(status_code=400, detail="You have already submitted this assignment.")
+    return {
+        "message": "Assignment submitted successfully",
+        "submission_count": submission_count,
+        "submission_id": submission.id,
+        "status": submission.status,
+        "files": [{"filename": f.filename, "size": f.size, "sha256": f.sha256} for f in files]
+    }
+
+def _archive_folder(name: Optional[str], student_id: str) -> str:
+    label = re.sub(r"[^\w.-]+", "_", name or "").strip("_")
+    return f"{label}_{student_id}" if label else student_id
+
+@router.get("/{assignment_id}/submissions/download")
+async def download_submissions(
+    assignment_id: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Every submitted file as one zip, one folder per student plus a manifest.csv of sizes and checksums.
+
+    The archive is built while it is sent, so it is never staged in memory or on disk.
+    """
+    if current_user.role not in ("faculty", "admin"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = session.get(Assignment, assignment_id)
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    rows = session.exec(
+        select(AssignmentSubmissionFile, AssignmentSubmission.student_id, User.name)
+        .join(AssignmentSubmission, AssignmentSubmission.id == AssignmentSubmissionFile.submission_id)
+        .join(User, User.id == AssignmentSubmission.student_id, isouter=True)
+        .where(AssignmentSubmission.assignment_id == assignment_id)
+        .order_by(User.name, AssignmentSubmission.student_id, AssignmentSubmissionFile.uploaded_at)
+    ).all()
+
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(["student_id", "student_name", "path", "size", "sha256", "uploaded_at"])
+    entries = []
+    used = set()
+    for file, student_id, student_name in rows:
+        path = f"{_archive_folder(student_name, student_id)}/{file.filename}"
+        if path in used:
+            path = f"{_archive_folder(student_name, student_id)}/{file.id[:8]}_{file.filename}"
+        used.add(path)
+        entries.append((path, file.stored_name, None))
+        writer.writerow([student_id, student_name, path, file.size, file.sha256, file.uploaded_at.isoformat()])
+    entries.append(("manifest.csv", None, manifest.getvalue().encode()))
+
+    filename = _archive_folder(assignment.title, assignment.id) + ".zip"
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/submissions/me", response_model=List[AssignmentSubmission])
 async def get_my_submissions(
@@ -155,18 +321,98 @@ async def get_submissions_for_my_assignments(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    # Get all assignments created by the current user
-    my_assignments = session.exec(
-        select(Assignment.id).where(Assignment.created_by == current_user.name)
-    ).all()
-    if not my_assignments:
-        return []
-    # Get all submissions for those assignments
+    # Submissions for all assignments created by the current user
+    my_assignments = select(Assignment.id).where(Assignment.created_by == current_user.id)
     submissions = session.exec(
         select(AssignmentSubmission).where(AssignmentSubmission.assignment_id.in_(my_assignments))
     ).all()
     return submissions
 
+@router.get("/submissions/inbox", response_model=SubmissionInboxResponse)
+async def get_submission_inbox(
+    assignment_id: Optional[str] = Query(None),
+    submission_status: Optional[str] = Query(None, alias="status"),
+    ungraded: bool = Query(False),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Newest submissions to the current user's assignments, one page at a time
+
+    Each row carries its assignment and student details from a single joined
+    query; `assignments` gives submitted/graded counts for every assignment
+    the user created, whatever the filters.
+    """
+    if current_user.role not in ("faculty", "admin"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    filters = [Assignment.created_by == current_user.id]
+    if assignment_id:
+        filters.append(Assignment.id == assignment_id)
+    if submission_status:
+        filters.append(AssignmentSubmission.status == submission_status)
+    if ungraded:
+        filters.append(AssignmentSubmission.marks_obtained.is_(None))
+
+    base = (
+        select(AssignmentSubmission, Assignment.title, Assignment.course_code, Assignment.course_title, User.name)
+        .join(Assignment, Assignment.id == AssignmentSubmission.assignment_id)
+        .join(User, User.id == AssignmentSubmission.student_id, isouter=True)
+        .where(*filters)
+    )
+    total = session.exec(select(func.count()).select_from(base.subquery())).one()
+    rows = session.exec(
+        base.order_by(AssignmentSubmission.submission_time.desc(), AssignmentSubmission.id)
+        .offset((page - 1) * limit)
+        .limit(limit)
+    ).all()
+
+    counts = session.exec(
+        select(
+            Assignment.id,
+            Assignment.title,
+            func.count(AssignmentSubmission.id),
+            func.count(AssignmentSubmission.marks_obtained)
+        )
+        .join(AssignmentSubmission, AssignmentSubmission.assignment_id == Assignment.id, isouter=True)
+        .where(Assignment.created_by == current_user.id)
+        .group_by(Assignment.id, Assignment.title)
+        .order_by(Assignment.title)
+    ).all()
+
+    return SubmissionInboxResponse(
+        data=[
+            InboxSubmission(
+                submission_id=submission.id,
+                assignment_id=submission.assignment_id,
+                assignment_title=title,
+                course_code=course_code,
+                course_title=course_title,
+                student_id=submission.student_id,
+                student_name=student_name,
+                submission_time=submission.submission_time,
+                status=submission.status,
+                marks_obtained=submission.marks_obtained,
+                feedback=submission.feedback
+            )
+            for submission, title, course_code, course_title, student_name in rows
+        ],
+        total=total,
+        page=page,
+        limit=limit,
+        assignments=[
+            AssignmentSubmissionCounts(
+                assignment_id=counted_id,
+                title=title,
+                submitted=submitted,
+                graded=graded,
+                ungraded=submitted - graded
+            )
+            for counted_id, title, submitted, graded in counts
+        ]
+    )
+
 @router.put("/submissions/{submission_id}/grade", response_model=dict)
 async def upload_marks(
     submission_id: str,
@@ -200,4 +446,141 @@ async def get_submissions_for_assignment(
     submissions = session.exec(
         select(AssignmentSubmission).where(AssignmentSubmission.assignment_id == assignment_id)
     ).all()
-    return submissions 
\ No newline at end of file
+    return submissions
+
+def grade_submission_rows(
+    assignment: Assignment,
+    rows: List[dict],
+    session: Session,
+    skip_invalid: bool = False,
+    dry_run: bool = False
+) -> BulkGradeResponse:
+    """Validate and apply many grades for one assignment in one transaction
+
+    Submissions are resolved with one query and updated with one executemany.
+    Unless `skip_invalid` is set, nothing is written when any row is invalid.
+    """
+    errors = {}
+    parsed = []
+    for row_no, row in enumerate(rows, start=1):
+        try:
+            parsed.append((row_no, SubmissionGradeRow(**row)))
+        except ValidationError as e:
+            errors[row_no] = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+
+    submissions = session.exec(
+        select(AssignmentSubmission.id, AssignmentSubmission.student_id)
+        .where(AssignmentSubmission.assignment_id == assignment.id)
+    ).all()
+    submission_ids = {submission_id for submission_id, _ in submissions}
+    by_student = {student_id: submission_id for submission_id, student_id in submissions}
+
+    updates = []
+    resolved = {}
+    graded_rows = {}
+    for row_no, data in parsed:
+        row_errors = []
+        if data.submission_id:
+            submission_id = data.submission_id if data.submission_id in submission_ids else None
+            if not submission_id:
+                row_errors.append(f"Submission {data.submission_id} does not belong to this assignment")
+            elif data.student_id and by_student.get(data.student_id) != submission_id:
+                row_errors.append(f"Submission {data.submission_id} is not by student {data.student_id}")
+        elif data.student_id:
+            submission_id = by_student.get(data.student_id)
+            if not submission_id:
+                row_errors.append(f"Student {data.student_id} has not submitted this assignment")
+        else:
+            submission_id = None
+            row_errors.append("Either submission_id or student_id is required")
+        if data.marks_obtained < 0:
+            row_errors.append("marks_obtained cannot be negative")
+        elif assignment.total_marks is not None and data.marks_obtained > assignment.total_marks:
+            row_errors.append(f"marks_obtained exceeds the total of {assignment.total_marks}")
+        if submission_id in graded_rows:
+            row_errors.append(f"Same submission as row {graded_rows[submission_id]}")
+        if submission_id:
+            resolved[row_no] = submission_id
+        if row_errors:
+            errors[row_no] = row_errors
+            continue
+
+        graded_rows[submission_id] = row_no
+        values = {"id": submission_id, "marks_obtained": data.marks_obtained}
+        if data.feedback is not None:
+            values["feedback"] = data.feedback
+        updates.append(values)
+
+    written = not dry_run and bool(updates) and (skip_invalid or not errors)
+    if written:
+        try:
+            session.execute(update(AssignmentSubmission), updates)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save grades: {str(e)}"
+            )
+
+    return BulkGradeResponse(
+        written=written,
+        total=len(rows),
+        graded=len(updates) if written else 0,
+        results=[
+            SubmissionGradeResult(
+                row=row_no,
+                submission_id=resolved.get(row_no),
+                success=written and row_no not in errors,
+                errors=errors.get(row_no, [])
+            )
+            for row_no in range(1, len(rows) + 1)
+        ]
+    )
+
+def _grading_assignment(assignment_id: str, session: Session, current_user: User) -> Assignment:
+    if current_user.role not in ("faculty", "admin"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = session.get(Assignment, assignment_id)
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    return assignment
+
+@router.put("/{assignment_id}/grades/bulk", response_model=BulkGradeResponse)
+async def upload_marks_bulk(
+    assignment_id: str,
+    rows: List[dict] = Body(...),
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Grade many submissions of an assignment from a JSON array of
+    {submission_id or student_id, marks_obtained, feedback}"""
+    assignment = _grading_assignment(assignment_id, session, current_user)
+    return grade_submission_rows(assignment, rows, session, skip_invalid, dry_run)
+
+@router.put("/{assignment_id}/grades/bulk/csv", response_model=BulkGradeResponse)
+async def upload_marks_bulk_csv(
+    assignment_id: str,
+    file: UploadFile = File(...),
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Grade many submissions of an assignment from a CSV file
+
+    The header row names the same fields as the JSON rows:
+    submission_id or student_id, marks_obtained, feedback.
+    """
+    assignment = _grading_assignment(assignment_id, session, current_user)
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    try:
+        rows = list(csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig")))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    # Empty cells mean "not given", as a missing key does in JSON
+    rows = [{key: value for key, value in row.items() if key and value not in (None, "")} for row in rows]
+    return grade_submission_rows(assignment, rows, session, skip_invalid, dry_run)
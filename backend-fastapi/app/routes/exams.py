@@ -1,14 +1,26 @@
-from datetime import date, time, datetime
+from collections import defaultdict
+from datetime import date, time, datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, insert
 from sqlmodel import Session, select
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 
-from app.models.exam import ExamTimeTable, ExamTypeEnum
+from app.models.course import CourseSemester
+from app.models.exam import ExamSeat, ExamTimeTable, ExamTypeEnum
+from app.models.room import Room
 from app.utils.db import get_session
 from app.utils.auth import get_current_user
-from app.models.user import User, UserRoles
-from app.models.exam import ExamTimeTable, ExamTypeEnum
+from app.models.user import StudentProfile, User, UserRoles, student_batch
+from app.utils.exam_conflicts import (
+    ExamConflict,
+    describe_exam_conflicts,
+    exam_interval,
+    find_exam_conflicts,
+    find_exam_timetable_clashes,
+    overlapping_exams
+)
+from app.utils.seating import SeatAssignment, SeatingRoom, SeatingStudent, plan_seating, same_batch_neighbours
 
 router = APIRouter(prefix="/api/exams", tags=["exams"])
 
@@ -63,6 +75,83 @@ class ExamUpdateRequest(BaseModel):
     room: Optional[str] = None
     invigilator: Optional[str] = None
 
+class ExamTimetableValidationResponse(BaseModel):
+    valid: bool
+    total_exams: int
+    conflicts: List[ExamConflict]
+
+class SeatingPlanRequest(BaseModel):
+    semester: CourseSemester  # students currently in this semester sit the exam
+    rooms: Optional[List[str]] = None  # defaults to every room free during the exam
+    seats_per_row: int = Field(6, ge=1, le=30)
+
+class RoomSeatMap(BaseModel):
+    room: str
+    capacity: int
+    rows: int
+    columns: int
+    seats: List[SeatAssignment]
+
+class SeatingPlanResponse(BaseModel):
+    exam_id: str
+    total_students: int
+    same_batch_neighbours: int
+    rooms: List[RoomSeatMap]
+
+def set_exam_sitting(exam: ExamTimeTable, exam_date: date, start_time: time, end_time: time):
+    """Store a sitting as its start plus duration, which is what clash detection reads"""
+    if start_time >= end_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    exam.exam_schedule = datetime.combine(exam_date, start_time)
+    length = datetime.combine(exam_date, end_time) - exam.exam_schedule
+    exam.duration = (datetime.min + length).time()
+
+def check_exam_conflicts(session: Session, exam: ExamTimeTable):
+    conflicts = find_exam_conflicts(session, exam)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=describe_exam_conflicts(conflicts)
+        )
+
+def exam_to_response(exam: ExamTimeTable) -> ExamResponse:
+    interval = exam_interval(exam)
+    duration = f"{interval[0].strftime('%H:%M')} - {interval[1].strftime('%H:%M')}" if interval else ""
+    return ExamResponse(
+        id=str(exam.id),
+        course_code=exam.course_code or "",
+        semester=exam.semester or "",
+        exam_type=exam.exam_type,
+        exam_schedule=exam.exam_schedule.strftime("%Y-%m-%d") if exam.exam_schedule else "",
+        duration=duration,
+        room=exam.room or "",
+        invigilator=exam.invigilator or ""
+    )
+
+def seating_plan_response(exam_id: str, seats: List[SeatAssignment], capacities: dict) -> SeatingPlanResponse:
+    by_room = defaultdict(list)
+    for seat in seats:
+        by_room[seat.room].append(seat)
+    rooms = []
+    for room, room_seats in by_room.items():
+        room_seats.sort(key=lambda seat: seat.seat_number)
+        rooms.append(RoomSeatMap(
+            room=room,
+            capacity=capacities.get(room) or 0,
+            rows=max(seat.row for seat in room_seats),
+            columns=max(seat.column for seat in room_seats),
+            seats=room_seats
+        ))
+    return SeatingPlanResponse(
+        exam_id=exam_id,
+        total_students=len(seats),
+        same_batch_neighbours=same_batch_neighbours(seats),
+        rooms=rooms
+    )
+
 # Exam Management Endpoints
 @router.post("/staff-api/create", response_model=dict)
 async def create_exam(
@@ -84,20 +173,19 @@ async def create_exam(
     start_time = datetime.strptime(exam_data.start_time, "%H:%M").time()
     end_time = datetime.strptime(exam_data.end_time, "%H:%M").time()
     
-    # Create exam in database
     exam = ExamTimeTable(
         course_code=exam_data.course_code,
-        course_title=exam_data.course_title,
-        batch=exam_data.batch,
         semester=exam_data.semester,
         exam_type=exam_data.exam_type,
-        exam_date=exam_date,
-        start_time=start_time,
-        end_time=end_time,
         room=exam_data.room,
         invigilator=exam_data.invigilator
     )
+    set_exam_sitting(exam, exam_date, start_time, end_time)
+    
+    # Reject overlapping room, invigilator or semester sittings
+    check_exam_conflicts(session, exam)
     
+    # Create exam in database
     session.add(exam)
     session.commit()
     session.refresh(exam)
@@ -121,23 +209,41 @@ async def get_exams(
     # Get all exams from database
     exams = session.exec(select(ExamTimeTable)).all()
     
-    result = []
-    for exam in exams:
-        # Calculate duration display
-        duration = f"{exam.start_time.strftime('%H:%M')} - {exam.end_time.strftime('%H:%M')}"
-        
-        result.append(ExamResponse(
-            id=str(exam.id),
-            course_code=exam.course_code or "",
-            semester=exam.semester or "",
-            exam_type=exam.exam_type,
-            exam_schedule=exam.exam_date.strftime("%Y-%m-%d") if exam.exam_date else "",
-            duration=duration,
-            room=exam.room or "",
-            invigilator=exam.invigilator or ""
-        ))
+    return [exam_to_response(exam) for exam in exams]
+
+@router.get("/staff-api/validate", response_model=ExamTimetableValidationResponse)
+async def validate_exam_timetable(
+    semester: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Report every room, invigilator and semester clash in the exam timetable (faculty/admin only)"""
+    
+    # Only allow faculty or admin
+    if current_user.role not in [UserRoles.faculty, UserRoles.admin]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only faculty or administrators can validate the exam timetable"
+        )
     
-    return result
+    query = select(ExamTimeTable)
+    if semester:
+        query = query.where(ExamTimeTable.semester == semester)
+    if from_date:
+        query = query.where(ExamTimeTable.exam_schedule >= datetime.combine(from_date, time.min))
+    if to_date:
+        query = query.where(ExamTimeTable.exam_schedule < datetime.combine(to_date + timedelta(days=1), time.min))
+    
+    exams = session.exec(query).all()
+    conflicts = find_exam_timetable_clashes(exams)
+    
+    return ExamTimetableValidationResponse(
+        valid=not conflicts,
+        total_exams=len(exams),
+        conflicts=conflicts
+    )
 
 @router.get("/staff-api/{exam_id}", response_model=ExamResponse)
 async def get_exam_by_id(
@@ -162,19 +268,7 @@ async def get_exam_by_id(
             detail="Exam not found"
         )
     
-    # Calculate duration display
-    duration = f"{exam.start_time.strftime('%H:%M')} - {exam.end_time.strftime('%H:%M')}"
-    
-    return ExamResponse(
-        id=str(exam.id),
-        course_code=exam.course_code or "",
-        semester=exam.semester or "",
-        exam_type=exam.exam_type,
-        exam_schedule=exam.exam_date.strftime("%Y-%m-%d") if exam.exam_date else "",
-        duration=duration,
-        room=exam.room or "",
-        invigilator=exam.invigilator or ""
-    )
+    return exam_to_response(exam)
 
 @router.put("/staff-api/{exam_id}", response_model=dict)
 async def update_exam(
@@ -203,25 +297,36 @@ async def update_exam(
     # Update fields
     if exam_data.course_code is not None:
         exam.course_code = exam_data.course_code
-    if exam_data.course_title is not None:
-        exam.course_title = exam_data.course_title
-    if exam_data.batch is not None:
-        exam.batch = exam_data.batch
     if exam_data.semester is not None:
         exam.semester = exam_data.semester
     if exam_data.exam_type is not None:
         exam.exam_type = exam_data.exam_type
-    if exam_data.date is not None:
-        exam.exam_date = datetime.strptime(exam_data.date, "%Y-%m-%d").date()
-    if exam_data.start_time is not None:
-        exam.start_time = datetime.strptime(exam_data.start_time, "%H:%M").time()
-    if exam_data.end_time is not None:
-        exam.end_time = datetime.strptime(exam_data.end_time, "%H:%M").time()
     if exam_data.room is not None:
         exam.room = exam_data.room
     if exam_data.invigilator is not None:
         exam.invigilator = exam_data.invigilator
     
+    # Date, start and end are stored as the schedule plus duration
+    if exam_data.date is not None or exam_data.start_time is not None or exam_data.end_time is not None:
+        interval = exam_interval(exam)
+        if not interval and None in (exam_data.date, exam_data.start_time, exam_data.end_time):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date, start time and end time are required to schedule this exam"
+            )
+        try:
+            exam_date = datetime.strptime(exam_data.date, "%Y-%m-%d").date() if exam_data.date else interval[0].date()
+            start_time = datetime.strptime(exam_data.start_time, "%H:%M").time() if exam_data.start_time else interval[0].time()
+            end_time = datetime.strptime(exam_data.end_time, "%H:%M").time() if exam_data.end_time else interval[1].time()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date or time format. Use YYYY-MM-DD and HH:MM"
+            )
+        set_exam_sitting(exam, exam_date, start_time, end_time)
+    
+    check_exam_conflicts(session, exam)
+    
     session.add(exam)
     session.commit()
     
@@ -250,54 +355,144 @@ async def delete_exam(
             detail="Exam not found"
         )
     
+    session.execute(delete(ExamSeat).where(ExamSeat.exam_id == exam.id))
     session.delete(exam)
     session.commit()
     
     return {"message": "Exam deleted successfully"}
 
-# Additional endpoints for exam management
-@router.get("/staff-api/by-semester/{semester}", response_model=List[ExamResponse])
-async def get_exams_by_semester(
-    semester: str,
+@router.post("/staff-api/{exam_id}/seating-plan", response_model=SeatingPlanResponse)
+async def generate_seating_plan(
+    exam_id: str,
+    request: SeatingPlanRequest,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get exams filtered by semester (faculty/admin only)"""
+    """Spread an exam's students over rooms with neighbouring seats from different batches (faculty/admin only)
+    
+    Any existing plan of the exam is replaced. Rooms used by other exams at the
+    same time are skipped.
+    """
     
     # Only allow faculty or admin
     if current_user.role not in [UserRoles.faculty, UserRoles.admin]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only faculty or administrators can view exams"
+            detail="Only faculty or administrators can plan exam seating"
         )
     
-    # Get exams filtered by semester from database
-    exams = session.exec(select(ExamTimeTable).where(ExamTimeTable.semester == semester)).all()
+    exam = session.get(ExamTimeTable, exam_id)
+    if not exam:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
     
-    result = []
-    for exam in exams:
-        duration = f"{exam.start_time.strftime('%H:%M')} - {exam.end_time.strftime('%H:%M')}"
-        
-        result.append(ExamResponse(
-            id=str(exam.id),
-            course_code=exam.course_code or "",
-            semester=exam.semester or "",
-            exam_type=exam.exam_type,
-            exam_schedule=exam.exam_date.strftime("%Y-%m-%d") if exam.exam_date else "",
-            duration=duration,
-            room=exam.room or "",
-            invigilator=exam.invigilator or ""
-        ))
+    students = [
+        SeatingStudent(student_id=user_id, roll_number=roll_number, batch=student_batch(major, admission_date))
+        for user_id, roll_number, major, admission_date in session.exec(
+            select(
+                StudentProfile.user_id,
+                StudentProfile.student_id,
+                StudentProfile.major,
+                StudentProfile.admission_date
+            ).where(StudentProfile.current_semester == request.semester, StudentProfile.user_id.is_not(None))
+        ).all()
+    ]
+    if not students:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No students found in semester {request.semester.value}"
+        )
+    
+    # Rooms that host other exams at the same time, directly or through a seating plan
+    others = overlapping_exams(session, exam)
+    busy = {other.room for other in others if other.room}
+    if others:
+        busy.update(session.exec(
+            select(ExamSeat.room).where(ExamSeat.exam_id.in_([other.id for other in others])).distinct()
+        ).all())
+    
+    room_query = select(Room.room, Room.capacity)
+    if request.rooms:
+        room_query = room_query.where(Room.room.in_(request.rooms))
+    rooms = [
+        SeatingRoom(room=room, capacity=capacity)
+        for room, capacity in session.exec(room_query).all()
+        if room not in busy and capacity
+    ]
+    
+    plan = plan_seating(students, rooms, request.seats_per_row)
+    if plan.unseated:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Not enough seats: {len(students)} students but {len(plan.seats)} free seats"
+        )
+    
+    session.execute(delete(ExamSeat).where(ExamSeat.exam_id == exam.id))
+    session.execute(insert(ExamSeat), [
+        {
+            "exam_id": exam.id,
+            "room": seat.room,
+            "seat_number": seat.seat_number,
+            "seat_row": seat.row,
+            "seat_column": seat.column,
+            "student_id": seat.student_id,
+            "roll_number": seat.roll_number,
+            "batch": seat.batch
+        }
+        for seat in plan.seats
+    ])
+    session.commit()
     
-    return result
+    return seating_plan_response(exam.id, plan.seats, {room.room: room.capacity for room in rooms})
 
-@router.get("/staff-api/by-batch/{batch}", response_model=List[ExamResponse])
-async def get_exams_by_batch(
-    batch: str,
+@router.get("/staff-api/{exam_id}/seating-plan", response_model=SeatingPlanResponse)
+async def get_seating_plan(
+    exam_id: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the stored seating plan of an exam (faculty/admin only)"""
+    
+    # Only allow faculty or admin
+    if current_user.role not in [UserRoles.faculty, UserRoles.admin]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only faculty or administrators can view exam seating"
+        )
+    
+    if not session.get(ExamTimeTable, exam_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    seats = [
+        SeatAssignment(
+            room=seat.room,
+            seat_number=seat.seat_number,
+            row=seat.seat_row,
+            column=seat.seat_column,
+            student_id=seat.student_id,
+            roll_number=seat.roll_number,
+            batch=seat.batch
+        )
+        for seat in session.exec(select(ExamSeat).where(ExamSeat.exam_id == exam_id)).all()
+    ]
+    capacities = dict(session.exec(
+        select(Room.room, Room.capacity).where(Room.room.in_({seat.room for seat in seats}))
+    ).all()) if seats else {}
+    return seating_plan_response(exam_id, seats, capacities)
+
+# Additional endpoints for exam management
+@router.get("/staff-api/by-semester/{semester}", response_model=List[ExamResponse])
+async def get_exams_by_semester(
+    semester: str,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get exams filtered by batch (faculty/admin only)"""
+    """Get exams filtered by semester (faculty/admin only)"""
     
     # Only allow faculty or admin
     if current_user.role not in [UserRoles.faculty, UserRoles.admin]:
@@ -306,22 +501,7 @@ async def get_exams_by_batch(
             detail="Only faculty or administrators can view exams"
         )
     
-    # Get exams filtered by batch from database
-    exams = session.exec(select(ExamTimeTable).where(ExamTimeTable.batch == batch)).all()
-    
-    result = []
-    for exam in exams:
-        duration = f"{exam.start_time.strftime('%H:%M')} - {exam.end_time.strftime('%H:%M')}"
-        
-        result.append(ExamResponse(
-            id=str(exam.id),
-            course_code=exam.course_code or "",
-            semester=exam.semester or "",
-            exam_type=exam.exam_type,
-            exam_schedule=exam.exam_date.strftime("%Y-%m-%d") if exam.exam_date else "",
-            duration=duration,
-            room=exam.room or "",
-            invigilator=exam.invigilator or ""
-        ))
+    # Get exams filtered by semester from database
+    exams = session.exec(select(ExamTimeTable).where(ExamTimeTable.semester == semester)).all()
     
-    return result 
\ No newline at end of file
+    return [exam_to_response(exam) for exam in exams]
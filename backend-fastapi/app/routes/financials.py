@@ -11,10 +11,11 @@ from ..utils.db import get_session
 from ..utils.auth import get_current_user, oath2_scheme
 from fastapi.security import OAuth2PasswordBearer
 from ..models.fee import (
-    Fee, FeePayment, StudentFee, StripePaymentIntent,
+    Fee, FeePayment, StudentFee, StripePaymentIntent, FeeSweepRun,
     FeeTypeEnum, FeeStatusEnum, PaymentMethodEnum
 )
 from ..models.user import User, StudentProfile
+from ..utils.fee_sweeper import sweep_overdue_fees, sync_overdue_status
 
 # Configure Stripe
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_...")
@@ -484,8 +485,8 @@ async def get_payment_statistics(
             # Unpaid fee
             total_due += student_fee.amount_due
             
-            # Check if overdue
-            if fee.deadline < date.today():
+            # Overdue status is maintained by the overdue fee sweeper
+            if student_fee.status == FeeStatusEnum.overdue:
                 overdue_fees_count += 1
             else:
                 pending_fees_count += 1
@@ -560,10 +561,15 @@ async def update_fee(
             detail="Fee not found"
         )
     
-    for field, value in fee_data.dict(exclude_unset=True).items():
+    changes = fee_data.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(fee, field, value)
     
     fee.updated_at = datetime.now()
+    if "deadline" in changes:
+        # Keep the stored overdue status in step with the new deadline rather than waiting for the sweeper
+        session.flush()
+        sync_overdue_status(session, [fee.id])
     session.commit()
     session.refresh(fee)
     
@@ -594,6 +600,44 @@ async def delete_fee(
     
     return {"message": "Fee deleted successfully"}
 
+@router.post("/admin/sweep-overdue")
+async def run_overdue_sweep(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Mark pending fees past their deadline as overdue (admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can run the overdue sweep"
+        )
+    
+    run = sweep_overdue_fees(session)
+    return {
+        "swept": True,
+        "swept_through": run.swept_through,
+        "marked_overdue": run.marked_overdue,
+        "message": "Overdue fee sweep completed"
+    }
+
+@router.get("/admin/sweep-runs", response_model=List[FeeSweepRun])
+async def get_sweep_runs(
+    limit: int = 30,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Get the most recent overdue sweep runs with their counts (admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view sweep runs"
+        )
+    
+    runs = session.exec(
+        select(FeeSweepRun).order_by(FeeSweepRun.swept_through.desc()).limit(limit)
+    ).all()
+    return runs
+
 @router.post("/admin/assign-fee/{fee_id}/student/{student_id}")
 async def assign_fee_to_student(
     fee_id: str,
@@ -1,12 +1,39 @@
+import csv
+import io
 import uuid
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, Body, File, HTTPException, Depends, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import ValidationError
+from sqlalchemy import insert, tuple_, update
 from sqlmodel import Session, select
 from typing import Optional, List
 
 from app.models.user import UserRoles
-from app.utils.auth import roled_access
+from app.utils.auth import get_current_user, roled_access
 from app.utils.db import get_session
-from app.models.grades import Grade, GradeCreateRequest, GradeUpdateRequest, GradeResponse
+from app.models.course import Course
+from app.models.grades import (
+    Grade,
+    GradeBulkResponse,
+    GradeBulkRowResult,
+    GPARecomputeResponse,
+    GradeCreateRequest,
+    MeritListResponse,
+    MeritRank,
+    MeritRankResponse,
+    GradeUpdateRequest,
+    GradeResponse,
+    GradeStatisticsResponse,
+    StudentGPAResponse,
+    TranscriptResponse
+)
+from app.models.program import Program
+from app.models.user import StudentProfile, User
+from app.utils.gpa import grade_keys, refresh_gpas, student_gpa
+from app.utils.grade_statistics import grade_statistics
+from app.utils.merit import RANKING_SCOPES, merit_list
+from app.utils.transcript import transcripts
 
 router = APIRouter(
     prefix="/staff-api/grades"
@@ -34,8 +61,251 @@ def get_grades(
     grades = session.exec(query).all()
     return grades
 
+def upsert_grade_rows(
+    rows: List[dict],
+    session: Session,
+    skip_invalid: bool = False,
+    dry_run: bool = False
+) -> GradeBulkResponse:
+    """Validate and upsert many grades in one transaction
+
+    A row updates the grade of the same student, course and semester if there
+    is one, otherwise it is inserted; only the fields given in the row are
+    changed. Unless `skip_invalid` is set, nothing is written when any row is invalid.
+    """
+    errors = {}
+    parsed = []
+    for row_no, row in enumerate(rows, start=1):
+        try:
+            data = GradeCreateRequest(**row)
+        except ValidationError as e:
+            errors[row_no] = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+            continue
+        parsed.append((row_no, data))
+
+    # Resolve every referenced student, course, semester and existing grade with one query each
+    student_ids = {data.student_id for _, data in parsed}
+    course_codes = {data.course_code for _, data in parsed}
+    semesters = {data.semester for _, data in parsed}
+    keys = {(data.student_id, data.course_code, data.semester) for _, data in parsed}
+    known_students = set(session.exec(select(User.id).where(User.id.in_(student_ids))).all())
+    known_courses = set(session.exec(select(Course.course_code).where(Course.course_code.in_(course_codes))).all())
+    known_semesters = set(session.exec(select(Program.id).where(Program.id.in_(semesters))).all())
+    existing = {}
+    if keys:
+        for grade_id, student_id, course_code, semester in session.exec(
+            select(Grade.id, Grade.student_id, Grade.course_code, Grade.semester)
+            .where(tuple_(Grade.student_id, Grade.course_code, Grade.semester).in_(keys))
+        ).all():
+            existing.setdefault((student_id, course_code, semester), grade_id)
+
+    inserts, updates = [], []
+    actions = {}
+    imported_keys = {}
+    for row_no, data in parsed:
+        row_errors = []
+        if data.student_id not in known_students:
+            row_errors.append(f"Student {data.student_id} does not exist")
+        if data.course_code not in known_courses:
+            row_errors.append(f"Course {data.course_code} does not exist")
+        if data.semester not in known_semesters:
+            row_errors.append(f"Semester {data.semester} does not exist")
+        for field in ("incourse_marks", "final_marks", "total_marks", "grade"):
+            value = getattr(data, field)
+            if value is not None and value < 0:
+                row_errors.append(f"{field} cannot be negative")
+        key = (data.student_id, data.course_code, data.semester)
+        if key in imported_keys:
+            row_errors.append(f"Same student, course and semester as row {imported_keys[key]}")
+        if row_errors:
+            errors[row_no] = row_errors
+            continue
+
+        imported_keys[key] = row_no
+        if key in existing:
+            updates.append({"id": existing[key], **data.model_dump(exclude_unset=True)})
+            actions[row_no] = (existing[key], "updated")
+        else:
+            grade_id = uuid.uuid4().hex
+            inserts.append({"id": grade_id, **data.model_dump()})
+            actions[row_no] = (grade_id, "inserted")
+
+    written = not dry_run and bool(inserts or updates) and (skip_invalid or not errors)
+    if written:
+        try:
+            if inserts:
+                session.execute(insert(Grade), inserts)
+            if updates:
+                session.execute(update(Grade), updates)
+            # Updated rows keep their key, so the rows' own keys cover every touched semester
+            refresh_gpas(session, {(student_id, semester) for student_id, _, semester in imported_keys})
+            session.commit()
+            grade_statistics.invalidate(*{(course_code, semester) for _, course_code, semester in imported_keys})
+        except Exception as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save grades: {str(e)}"
+            )
+
+    results = []
+    for row_no in range(1, len(rows) + 1):
+        grade_id, action = actions.get(row_no, (None, None))
+        results.append(GradeBulkRowResult(
+            row=row_no,
+            id=grade_id,
+            action=action if written else None,
+            errors=errors.get(row_no, [])
+        ))
+    return GradeBulkResponse(
+        written=written,
+        total=len(rows),
+        inserted=len(inserts) if written else 0,
+        updated=len(updates) if written else 0,
+        results=results
+    )
+
+@router.post("/bulk", response_model=GradeBulkResponse, dependencies=[Depends(roled_access(UserRoles.faculty))])
+def create_grades_bulk(
+    rows: List[dict] = Body(...),
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session)
+):
+    """Create or update many grades from a JSON array of grade requests"""
+    return upsert_grade_rows(rows, session, skip_invalid, dry_run)
+
+@router.post("/bulk/csv", response_model=GradeBulkResponse, dependencies=[Depends(roled_access(UserRoles.faculty))])
+def create_grades_bulk_csv(
+    file: UploadFile = File(...),
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session)
+):
+    """Create or update many grades from a CSV file
+
+    The header row must name the same fields as a single grade request:
+    student_id, course_code, semester, incourse_marks, final_marks, total_marks, grade.
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    try:
+        rows = list(csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig")))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    # Empty cells leave a field unchanged, as a missing key does in JSON
+    rows = [{key: value for key, value in row.items() if key and value not in (None, "")} for row in rows]
+    return upsert_grade_rows(rows, session, skip_invalid, dry_run)
+
+@router.get("/gpa/{student_id}", response_model=StudentGPAResponse)
+def get_student_gpa(student_id: str, session: Session = Depends(get_session)):
+    """Semester GPAs and CGPA of a student, as kept up to date by grade writes"""
+    return student_gpa(session, student_id)
+
+@router.post("/gpa/recompute", response_model=GPARecomputeResponse, dependencies=[Depends(roled_access(UserRoles.admin))])
+def recompute_gpas(session: Session = Depends(get_session)):
+    """Rebuild every semester GPA and CGPA from the grades in one pass"""
+    students, semesters = refresh_gpas(session)
+    session.commit()
+    return GPARecomputeResponse(students=students, semesters=semesters)
+
+@router.get("/statistics", response_model=GradeStatisticsResponse)
+def get_grade_statistics(
+    course_code: str = Query(...),
+    semester: str = Query(...),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Mean, median, standard deviation, min and max of total marks, a histogram in
+    10-mark bins and the letter-grade distribution of a course in a semester (faculty/admin only)
+
+    Computed with database aggregates where available and cached until a grade
+    of the course and semester is written.
+    """
+    if current_user.role not in (UserRoles.faculty, UserRoles.admin):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return grade_statistics.get(session, course_code, semester)
+
+@router.get("/merit-list", response_model=MeritListResponse)
+def get_merit_list(
+    scope: str = Query(..., description="batch, program or semester"),
+    value: str = Query(..., description="e.g. CSE-2022 for a batch, CSE for a program, 1st for a semester"),
+    min_percentile: Optional[float] = Query(None, ge=0, le=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    refresh: bool = Query(False),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Ranks, percentiles and ties of a batch or program by CGPA, or of a semester by GPA (faculty/admin only)
+
+    Rankings are stored when first requested and dropped when a member's
+    grades change, so repeated reads and cut-off queries are plain lookups.
+    """
+    if current_user.role not in (UserRoles.faculty, UserRoles.admin):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if scope not in RANKING_SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(RANKING_SCOPES)}")
+
+    merit = merit_list(session, scope, value, refresh)
+    query = (
+        select(MeritRank, User.name, StudentProfile.student_id)
+        .join(User, User.id == MeritRank.student_id, isouter=True)
+        .join(StudentProfile, StudentProfile.user_id == MeritRank.student_id, isouter=True)
+        .where(MeritRank.merit_list_id == merit.id)
+    )
+    if min_percentile is not None:
+        query = query.where(MeritRank.percentile >= min_percentile)
+    rows = session.exec(query.order_by(MeritRank.rank, MeritRank.id).offset(skip).limit(limit)).all()
+    return MeritListResponse(
+        scope=merit.scope,
+        scope_value=merit.scope_value,
+        students=merit.students,
+        computed_at=merit.computed_at,
+        data=[
+            MeritRankResponse(
+                rank=rank.rank,
+                student_id=rank.student_id,
+                name=name,
+                roll_number=roll_number,
+                score=rank.score,
+                credits=rank.credits,
+                percentile=rank.percentile,
+                tied=rank.tied
+            )
+            for rank, name, roll_number in rows
+        ]
+    )
+
+@router.get("/transcript/{student_id}", response_model=TranscriptResponse)
+def get_transcript(
+    student_id: str,
+    request: Request,
+    output: str = Query("json", alias="format", pattern="^(json|html)$"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """A student's transcript with per-semester GPA and CGPA, as JSON or print-ready HTML
+
+    Students may read their own; faculty and admins anyone's. The transcript
+    is rebuilt only when the student's grade rows change, and its version is
+    sent as the ETag so clients can revalidate with If-None-Match.
+    """
+    if current_user.role not in (UserRoles.faculty, UserRoles.admin) and current_user.id != student_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    transcript = transcripts.get(session, student_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    etag = f'"{transcript.version}-{output}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if output == "html":
+        return HTMLResponse(transcripts.html(session, student_id), headers={"ETag": etag})
+    return JSONResponse(jsonable_encoder(transcript), headers={"ETag": etag})
+
 @router.get("/{id}", response_model=GradeResponse)
-def get_grade(id: int, session: Session = Depends(get_session)):
+def get_grade(id: str, session: Session = Depends(get_session)):
     grade = session.get(Grade, id)
     if not grade:
         raise HTTPException(status_code=404, detail="Grade not found")
@@ -48,31 +318,41 @@ def create_grade(grade_data: GradeCreateRequest, session: Session = Depends(get_
         **grade_data.model_dump()
     )
     session.add(grade)
+    refresh_gpas(session, grade_keys(grade))
     session.commit()
+    grade_statistics.invalidate((grade.course_code, grade.semester))
     session.refresh(grade)
     return grade
 
 @router.put("/{id}", response_model=GradeResponse, dependencies=[Depends(roled_access(UserRoles.faculty))])
-def update_grade(id: int, grade_data: GradeUpdateRequest, session: Session = Depends(get_session)):
+def update_grade(id: str, grade_data: GradeUpdateRequest, session: Session = Depends(get_session)):
     grade = session.get(Grade, id)
     if not grade:
         raise HTTPException(status_code=404, detail="Grade not found")
     
+    # A grade moved to another student, course or semester also changes the one it left
+    touched = grade_keys(grade)
+    left = (grade.course_code, grade.semester)
     update_data = grade_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(grade, field, value)
     
     session.add(grade)
+    refresh_gpas(session, touched | grade_keys(grade))
     session.commit()
+    grade_statistics.invalidate(left, (grade.course_code, grade.semester))
     session.refresh(grade)
     return grade
 
 @router.delete("/{id}")
-def delete_grade(id: int, session: Session = Depends(get_session)):
+def delete_grade(id: str, session: Session = Depends(get_session)):
     grade = session.get(Grade, id)
     if not grade:
         raise HTTPException(status_code=404, detail="Grade not found")
     
+    touched = grade_keys(grade)
     session.delete(grade)
+    refresh_gpas(session, touched)
     session.commit()
+    grade_statistics.invalidate((grade.course_code, grade.semester))
     return {"message": "Grade deleted successfully"}
\ No newline at end of file
@@ -1,17 +1,21 @@
-from typing import List, Optional, Annotated
+import heapq
+from contextlib import ExitStack
+from typing import Any, List, Optional, Annotated, Tuple
 from datetime import datetime, time, date, timedelta
 from fastapi import APIRouter, HTTPException, Query, Depends, Body
-from sqlmodel import select, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
 from uuid import UUID, uuid4
 
 from app.utils.db import SessionDependency
 from app.utils.auth import get_current_user
-from app.models.user import User
+from app.models.user import User, UserRoles
 from app.models.equipment import (
     LabEquipmentUpdate,
     LabEquipmentCreate,
     LabEquipment,
     Booking,
+    BookingSeries,
     EquipmentStatus,
     EquipmentCategory,
     BookingStatus,
@@ -24,11 +28,27 @@ from app.models.equipment import (
     AvailabilityResponse,
     EquipmentAvailabilityResponse,
     TimeRange,
-    BookingUpdate
+    BookingUpdate,
+    BookingSeriesCreate,
+    BookingSeriesUpdate,
+    BookingSeriesResponse,
+    BookingReviewRequest,
+    BookingReviewResult,
+    EquipmentSearchResponse
 )
+from app.utils.equipment_search import equipment_index, search_equipment
+from app.utils.intervals import IntervalIndex
+from app.utils.locks import locked_row
+from app.utils.recurrence import series_dates
+from app.utils.utilization import booking_days, refresh_equipment_usage, series_days
 
 router = APIRouter(prefix="/staff-api/lab-equipments", tags=["lab-equipments"])
 
+# Office hours (9AM to 5PM) used by the availability views
+OFFICE_OPENS = time(hour=9)
+OFFICE_CLOSES = time(hour=17)
+MAX_CALENDAR_DAYS = 62
+
 # Helper functions
 def equipment_to_response(equipment: LabEquipment) -> LabEquipmentResponse:
     return LabEquipmentResponse(
@@ -52,16 +72,173 @@ def booking_to_response(booking: Booking) -> BookingResponse:
         end_time=booking.end_time,
         purpose=booking.purpose,
         status=booking.status,
+        rejection_reason=booking.rejection_reason,
         created_at=booking.created_at,
         updated_at=booking.updated_at
     )
 
+def series_to_response(
+    series: BookingSeries,
+    window_start: Optional[date] = None,
+    window_end: Optional[date] = None
+) -> BookingSeriesResponse:
+    return BookingSeriesResponse(
+        id=series.id,
+        equipment_id=series.equipment_id,
+        user_id=series.user_id,
+        start_date=series.start_date,
+        until=series.until,
+        start_time=series.start_time,
+        end_time=series.end_time,
+        weekdays=series.weekdays or [series.start_date.strftime("%A")],
+        interval_weeks=series.interval_weeks,
+        exceptions=[date.fromisoformat(d) for d in series.exceptions or []],
+        purpose=series.purpose,
+        status=series.status,
+        occurrences=[
+            TimeRange(start=start.isoformat(), end=end.isoformat())
+            for start, end in series_occurrences(series, window_start, window_end)
+        ],
+        created_at=series.created_at,
+        updated_at=series.updated_at
+    )
+
+def series_occurrences(
+    series: BookingSeries,
+    window_start: Optional[date] = None,
+    window_end: Optional[date] = None
+) -> List[Tuple[datetime, datetime]]:
+    return [
+        (datetime.combine(d, series.start_time), datetime.combine(d, series.end_time))
+        for d in series_dates(series, window_start, window_end)
+    ]
+
+def check_series_access(series: BookingSeries, user: User):
+    """Only the user who booked a series, or an admin, may change it"""
+    if user.role != UserRoles.admin and series.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to change this booking series")
+
+def to_seconds(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+def overlapping_slots(intervals: List[Tuple[datetime, datetime, Any]], slots: List[Tuple[datetime, datetime]]) -> List[Any]:
+    """Items whose interval overlaps any of the slots, each listed once"""
+    index = IntervalIndex()
+    for start, end, item in intervals:
+        index.add(None, to_seconds(start), to_seconds(end), item)
+    
+    found = {}
+    for start, end in slots:
+        for item in index.overlapping(None, to_seconds(start), to_seconds(end)):
+            found.setdefault(id(item), item)
+    return list(found.values())
+
+def find_series_conflicts(
+    session: SessionDependency,
+    equipment_id: str,
+    slots: List[Tuple[datetime, datetime]],
+    exclude_series_id: Optional[UUID] = None
+) -> List[BookingSeries]:
+    """Pending or approved booking series with an occurrence overlapping any of the slots"""
+    if not slots:
+        return []
+    first = min(start for start, _ in slots)
+    last = max(end for _, end in slots)
+    
+    query = select(BookingSeries).where(
+        BookingSeries.equipment_id == equipment_id,
+        BookingSeries.status.in_([BookingStatus.approved, BookingStatus.pending]),
+        BookingSeries.start_date <= last.date(),
+        BookingSeries.until >= first.date()
+    )
+    if exclude_series_id:
+        query = query.where(BookingSeries.id != exclude_series_id)
+    
+    # Expand each series only inside the window spanned by the slots
+    occurrences = [
+        (start, end, series)
+        for series in session.exec(query).all()
+        for start, end in series_occurrences(series, first.date(), last.date())
+    ]
+    return overlapping_slots(occurrences, slots)
+
+def find_slot_conflicts(
+    session: SessionDependency,
+    equipment_id: str,
+    slots: List[Tuple[datetime, datetime]]
+) -> List[Booking]:
+    """Pending or approved bookings overlapping any of the slots, from a single range query"""
+    if not slots:
+        return []
+    first = min(start for start, _ in slots)
+    last = max(end for _, end in slots)
+    
+    bookings = session.exec(
+        select(Booking).where(
+            Booking.equipment_id == equipment_id,
+            Booking.status.in_([BookingStatus.approved, BookingStatus.pending]),
+            Booking.start_time < last,
+            Booking.end_time > first
+        ).order_by(Booking.start_time)
+    ).all()
+    return overlapping_slots([(b.start_time, b.end_time, b) for b in bookings], slots)
+
+def office_day_availability(
+    equipment: LabEquipment,
+    day: date,
+    busy: List[Tuple[datetime, datetime]]
+) -> EquipmentAvailabilityResponse:
+    """Free and booked office-hour ranges of one day, from busy intervals sorted by start"""
+    office_start = datetime.combine(day, OFFICE_OPENS)
+    office_end = datetime.combine(day, OFFICE_CLOSES)
+    
+    available_ranges = []
+    booked_ranges = []
+    current_start = office_start
+    for start, end in busy:
+        start, end = max(start, office_start), min(end, office_end)
+        if start >= end:
+            continue
+        booked_ranges.append(TimeRange(start=start.time().isoformat(), end=end.time().isoformat()))
+        # If there's time between current_start and booking start, it's available
+        if current_start < start:
+            available_ranges.append(TimeRange(
+                start=current_start.time().isoformat(),
+                end=start.time().isoformat()
+            ))
+        current_start = max(current_start, end)
+    
+    # Add remaining time after last booking until office close
+    if current_start < office_end:
+        available_ranges.append(TimeRange(
+            start=current_start.time().isoformat(),
+            end=office_end.time().isoformat()
+        ))
+    
+    return EquipmentAvailabilityResponse(
+        date=day.isoformat(),
+        equipment_id=equipment.id,
+        equipment_status=equipment.status,
+        available_ranges=available_ranges,
+        booked_ranges=booked_ranges
+    )
+
+def commit_bookings(session: SessionDependency):
+    """Commit booking writes, reporting a Postgres overlap-constraint violation as a conflict"""
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        if "booking_no_overlap" in str(e.orig):
+            raise HTTPException(status_code=400, detail="Equipment is already booked for the selected time slot")
+        raise
+
 async def check_equipment_availability(
     session: SessionDependency,
     equipment_id: str,
     start_time: datetime,
     end_time: datetime,
-    exclude_booking_id: Optional[str] = None
+    exclude_booking_id: Optional[UUID] = None
 ) -> AvailabilityResponse:
     equipment = session.get(LabEquipment, equipment_id)
     if not equipment:
@@ -76,14 +253,12 @@ async def check_equipment_availability(
             message="Equipment is under maintenance"
         )
     
+    # Half-open overlap, a range scan on (equipment_id, start_time)
     query = select(Booking).where(
         Booking.equipment_id == equipment_id,
-        Booking.status.in_([BookingStatus.approved, BookingStatus.pending]),
-        or_(
-            and_(Booking.start_time <= start_time, Booking.end_time > start_time),
-            and_(Booking.start_time < end_time, Booking.end_time >= end_time),
-            and_(Booking.start_time >= start_time, Booking.end_time <= end_time)
-        )
+        Booking.start_time < end_time,
+        Booking.end_time > start_time,
+        Booking.status.in_([BookingStatus.approved, BookingStatus.pending])
     )
     
     if exclude_booking_id:
@@ -98,6 +273,12 @@ async def check_equipment_availability(
             message="Equipment is already booked for the selected time slot"
         )
     
+    if find_series_conflicts(session, equipment_id, [(start_time, end_time)]):
+        return AvailabilityResponse(
+            is_available=False,
+            message="Equipment is booked by a recurring booking for the selected time slot"
+        )
+    
     return AvailabilityResponse(is_available=True)
 
 # Equipment CRUD Endpoints
@@ -110,6 +291,16 @@ async def get_lab_equipments(
     searchQuery: Optional[str] = Query(None)
 ):
     """Get all lab equipments with filtering"""
+    if searchQuery:
+        # Ranked by relevance through the search index instead of substring scans
+        equipments, total, _ = search_equipment(session, searchQuery, category, status, location)
+        return LabEquipmentApiResponse(
+            data=[equipment_to_response(e) for e in equipments],
+            total=total,
+            page=None,
+            limit=None
+        )
+    
     query = select(LabEquipment)
     
     if status:
@@ -118,15 +309,6 @@ async def get_lab_equipments(
         query = query.where(LabEquipment.category == category)
     if location:
         query = query.where(LabEquipment.location.contains(location))
-    if searchQuery:
-        query = query.where(
-            or_(
-                LabEquipment.name.contains(searchQuery),
-                LabEquipment.description.contains(searchQuery),
-                LabEquipment.location.contains(searchQuery)
-            )
-        )
-    
     equipments = session.exec(query.order_by(LabEquipment.created_at.desc())).all()
     
     return LabEquipmentApiResponse(
@@ -136,6 +318,28 @@ async def get_lab_equipments(
         limit=None
     )
 
+@router.get("/search", response_model=EquipmentSearchResponse)
+async def search_lab_equipments(
+    session: SessionDependency,
+    q: str = Query(..., min_length=1),
+    category: Optional[EquipmentCategory] = Query(None),
+    status: Optional[EquipmentStatus] = Query(None),
+    location: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search lab equipments as you type, with category and status facet counts"""
+    equipments, total, facets = search_equipment(
+        session, q, category, status, location, limit=limit, offset=(page - 1) * limit
+    )
+    return EquipmentSearchResponse(
+        data=[equipment_to_response(e) for e in equipments],
+        total=total,
+        page=page,
+        limit=limit,
+        facets=facets
+    )
+
 @router.get("/{equipment_id}", response_model=LabEquipmentResponse)
 async def get_lab_equipment(equipment_id: str, session: SessionDependency):
     """Get a specific lab equipment"""
@@ -162,6 +366,7 @@ async def create_lab_equipment(
     session.add(new_equipment)
     session.commit()
     session.refresh(new_equipment)
+    equipment_index.update(new_equipment)
     return equipment_to_response(new_equipment)
 
 @router.put("/{equipment_id}", response_model=LabEquipmentResponse)
@@ -183,6 +388,7 @@ async def update_lab_equipment(
     session.add(equipment)
     session.commit()
     session.refresh(equipment)
+    equipment_index.update(equipment)
     return equipment_to_response(equipment)
 
 # Booking Endpoints
@@ -235,23 +441,25 @@ async def create_booking(
     # current_user: User = (get_current_user)
 ):
     """Create a new booking for lab equipment"""
-    availability = await check_equipment_availability(
-        session, equipment_id, booking.start_time, booking.end_time)
-    
-    if not availability.is_available:
-        raise HTTPException(status_code=400, detail=availability.message)
-    
-    new_booking = Booking(
-        equipment_id=equipment_id,
-        user_id=current_user.id,
-        start_time=booking.start_time,
-        end_time=booking.end_time,
-        purpose=booking.purpose,
-        status=BookingStatus.pending
-    )
-    
-    session.add(new_booking)
-    session.commit()
+    # Check and insert under the equipment lock so concurrent requests cannot both pass the check
+    with locked_row(session, LabEquipment, equipment_id):
+        availability = await check_equipment_availability(
+            session, equipment_id, booking.start_time, booking.end_time)
+        
+        if not availability.is_available:
+            raise HTTPException(status_code=400, detail=availability.message)
+        
+        new_booking = Booking(
+            equipment_id=equipment_id,
+            user_id=current_user.id,
+            start_time=booking.start_time,
+            end_time=booking.end_time,
+            purpose=booking.purpose,
+            status=BookingStatus.pending
+        )
+        
+        session.add(new_booking)
+        commit_bookings(session)
     session.refresh(new_booking)
     
     # Ensure equipment relationship is loaded
@@ -261,6 +469,150 @@ async def create_booking(
     return booking_to_response(new_booking)
 
 
+@router.post("/{equipment_id}/booking-series", response_model=BookingSeriesResponse)
+async def create_booking_series(
+    equipment_id: str,
+    series: BookingSeriesCreate,
+    session: SessionDependency,
+    current_user: User = Depends(get_current_user)
+):
+    """Create a weekly recurring booking for lab equipment"""
+    equipment = session.get(LabEquipment, equipment_id)
+    if not equipment:
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    if equipment.status == EquipmentStatus.maintenance:
+        raise HTTPException(status_code=400, detail="Equipment is under maintenance")
+    
+    new_series = BookingSeries(
+        equipment_id=equipment_id,
+        user_id=current_user.id,
+        start_date=series.start_date,
+        until=series.until,
+        start_time=series.start_time,
+        end_time=series.end_time,
+        weekdays=series.weekdays,
+        interval_weeks=series.interval_weeks,
+        exceptions=sorted({d.isoformat() for d in series.exceptions}),
+        purpose=series.purpose,
+        status=BookingStatus.pending
+    )
+    slots = series_occurrences(new_series)
+    if not slots:
+        raise HTTPException(status_code=400, detail="Booking series has no occurrences")
+    
+    # Validate every occurrence at once: one range query for bookings, one for other series
+    with locked_row(session, LabEquipment, equipment_id):
+        conflicting_bookings = find_slot_conflicts(session, equipment_id, slots)
+        conflicting_series = find_series_conflicts(session, equipment_id, slots)
+        if conflicting_bookings or conflicting_series:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Equipment is already booked during this series: {len(conflicting_bookings)} booking(s) "
+                       f"and {len(conflicting_series)} recurring booking(s) overlap its occurrences"
+            )
+        
+        session.add(new_series)
+        session.commit()
+    session.refresh(new_series)
+    return series_to_response(new_series)
+
+@router.get("/{equipment_id}/booking-series", response_model=List[BookingSeriesResponse])
+async def get_equipment_booking_series(
+    equipment_id: str,
+    session: SessionDependency,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Get recurring bookings for a specific equipment, expanded within the optional date window"""
+    query = select(BookingSeries).where(BookingSeries.equipment_id == equipment_id)
+    if start_date:
+        query = query.where(BookingSeries.until >= start_date)
+    if end_date:
+        query = query.where(BookingSeries.start_date <= end_date)
+    
+    series_list = session.exec(query.order_by(BookingSeries.start_date)).all()
+    return [series_to_response(series, start_date, end_date) for series in series_list]
+
+@router.patch("/booking-series/{series_id}", response_model=BookingSeriesResponse)
+async def update_booking_series(
+    series_id: UUID,
+    series_update: BookingSeriesUpdate,
+    session: SessionDependency,
+    current_user: User = Depends(get_current_user)
+):
+    """Update a recurring booking's purpose or status
+    
+    The owner may change the purpose; only admins may change the status, and an
+    approval is checked for conflicts under the equipment lock like a new series.
+    """
+    series = session.get(BookingSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    check_series_access(series, current_user)
+    
+    update_data = series_update.model_dump(exclude_unset=True)
+    if "status" in update_data and current_user.role != UserRoles.admin:
+        raise HTTPException(status_code=403, detail="Only admins can change the status of a booking series")
+    
+    with locked_row(session, LabEquipment, series.equipment_id) as equipment:
+        if update_data.get("status") == BookingStatus.approved and series.status != BookingStatus.approved:
+            if equipment and equipment.status == EquipmentStatus.maintenance:
+                raise HTTPException(status_code=400, detail="Equipment is under maintenance")
+            slots = series_occurrences(series)
+            # As in the bulk review, only approved bookings block an approval
+            conflicting_bookings = [
+                booking for booking in find_slot_conflicts(session, series.equipment_id, slots)
+                if booking.status == BookingStatus.approved
+            ]
+            conflicting_series = [
+                other for other in find_series_conflicts(session, series.equipment_id, slots, exclude_series_id=series.id)
+                if other.status == BookingStatus.approved
+            ]
+            if conflicting_bookings or conflicting_series:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cannot approve, equipment is already booked during this series: "
+                           f"{len(conflicting_bookings)} booking(s) and {len(conflicting_series)} "
+                           f"approved recurring booking(s) overlap its occurrences"
+                )
+        
+        for field, value in update_data.items():
+            setattr(series, field, value)
+        
+        series.updated_at = datetime.utcnow()
+        session.add(series)
+        session.commit()
+    session.refresh(series)
+    if "status" in update_data:
+        refresh_equipment_usage(session, series_days(series.equipment_id, series))
+    return series_to_response(series)
+
+@router.delete("/booking-series/{series_id}/occurrences/{occurrence_date}", response_model=BookingSeriesResponse)
+async def cancel_booking_occurrence(
+    series_id: UUID,
+    occurrence_date: date,
+    session: SessionDependency,
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a single occurrence of a recurring booking by adding it to the exceptions"""
+    series = session.get(BookingSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    check_series_access(series, current_user)
+    
+    if not series_dates(series, occurrence_date, occurrence_date):
+        raise HTTPException(status_code=404, detail="Booking series has no occurrence on that date")
+    
+    # Assign a new list so the JSON column is flagged as changed
+    series.exceptions = sorted([*(series.exceptions or []), occurrence_date.isoformat()])
+    series.updated_at = datetime.utcnow()
+    session.add(series)
+    session.commit()
+    session.refresh(series)
+    refresh_equipment_usage(session, [(series.equipment_id, occurrence_date)])
+    return series_to_response(series)
+
 @router.get("/all/booking", response_model=BookingApiResponse)
 async def get_all_equipment_bookings(
     session: SessionDependency,
@@ -311,9 +663,121 @@ async def get_equipment_bookings(
     )
 
 
+@router.post("/bookings/review", response_model=List[BookingReviewResult])
+async def review_bookings(
+    review: BookingReviewRequest,
+    session: SessionDependency,
+    current_user: User = Depends(get_current_user)
+):
+    """Approve or reject many bookings in one transaction (admin only)"""
+    if current_user.role != UserRoles.admin:
+        raise HTTPException(status_code=403, detail="Only admins can review bookings")
+    ids = [decision.id for decision in review.decisions]
+    bookings = {b.id: b for b in session.exec(select(Booking).where(Booking.id.in_(ids))).all()}
+    now = datetime.utcnow()
+    
+    results: List[Optional[BookingReviewResult]] = [None] * len(ids)
+    approvals = []  # positions of the approvals, in request order
+    seen = set()
+    for position, decision in enumerate(review.decisions):
+        booking = bookings.get(decision.id)
+        if decision.id in seen:
+            results[position] = BookingReviewResult(id=decision.id, success=False, message="Duplicate booking id")
+        elif not booking:
+            results[position] = BookingReviewResult(id=decision.id, success=False, message="Booking not found")
+        elif decision.status == BookingStatus.rejected:
+            booking.status = BookingStatus.rejected
+            booking.rejection_reason = decision.rejection_reason
+            booking.updated_at = now
+            session.add(booking)
+            results[position] = BookingReviewResult(id=decision.id, success=True, status=booking.status)
+        elif decision.status == BookingStatus.approved:
+            approvals.append(position)
+        else:
+            results[position] = BookingReviewResult(
+                id=decision.id, success=False, message="Status must be 'approved' or 'rejected'"
+            )
+        seen.add(decision.id)
+    
+    approving = [bookings[ids[position]] for position in approvals]
+    equipment_ids = sorted({b.equipment_id for b in approving})
+    with ExitStack() as stack:
+        # Lock equipments in a fixed order so concurrent reviews cannot deadlock
+        for equipment_id in equipment_ids:
+            stack.enter_context(locked_row(session, LabEquipment, equipment_id))
+        
+        if approvals:
+            first = min(b.start_time for b in approving)
+            last = max(b.end_time for b in approving)
+            
+            under_maintenance = set(session.exec(
+                select(LabEquipment.id).where(
+                    LabEquipment.id.in_(equipment_ids),
+                    LabEquipment.status == EquipmentStatus.maintenance
+                )
+            ).all())
+            
+            # Everything already approved for these equipments in the window, keyed by equipment
+            index = IntervalIndex()
+            approved = session.exec(
+                select(Booking).where(
+                    Booking.equipment_id.in_(equipment_ids),
+                    Booking.status == BookingStatus.approved,
+                    Booking.start_time < last,
+                    Booking.end_time > first,
+                    Booking.id.not_in(ids)
+                )
+            ).all()
+            for b in approved:
+                index.add(b.equipment_id, to_seconds(b.start_time), to_seconds(b.end_time),
+                          f"approved booking {b.start_time.isoformat()}-{b.end_time.time().isoformat()}")
+            series_list = session.exec(
+                select(BookingSeries).where(
+                    BookingSeries.equipment_id.in_(equipment_ids),
+                    BookingSeries.status == BookingStatus.approved,
+                    BookingSeries.start_date <= last.date(),
+                    BookingSeries.until >= first.date()
+                )
+            ).all()
+            for series in series_list:
+                for start, end in series_occurrences(series, first.date(), last.date()):
+                    index.add(series.equipment_id, to_seconds(start), to_seconds(end),
+                              f"recurring booking {start.isoformat()}-{end.time().isoformat()}")
+            
+            # Approve in request order; each approval blocks the ones after it
+            for position, booking in zip(approvals, approving):
+                if booking.equipment_id in under_maintenance:
+                    results[position] = BookingReviewResult(
+                        id=booking.id, success=False, status=booking.status, message="Equipment is under maintenance"
+                    )
+                    continue
+                start, end = to_seconds(booking.start_time), to_seconds(booking.end_time)
+                conflicts = index.overlapping(booking.equipment_id, start, end)
+                if conflicts:
+                    results[position] = BookingReviewResult(
+                        id=booking.id,
+                        success=False,
+                        status=booking.status,
+                        message="Equipment is already booked: " + "; ".join(conflicts)
+                    )
+                    continue
+                index.add(booking.equipment_id, start, end, f"booking {booking.id} approved in this review")
+                booking.status = BookingStatus.approved
+                booking.rejection_reason = None
+                booking.updated_at = now
+                session.add(booking)
+                results[position] = BookingReviewResult(id=booking.id, success=True, status=booking.status)
+        
+        commit_bookings(session)
+    
+    refresh_equipment_usage(session, [
+        pair for b in bookings.values() for pair in booking_days(b.equipment_id, b.start_time, b.end_time)
+    ])
+    return results
+
 @router.patch("/bookings/{booking_id}", response_model=BookingResponse)
 async def update_booking(
-    booking_id: str,
+    booking_id: UUID,
     booking_update: BookingUpdate,
     session: SessionDependency,
     # current_user: User = Depends(get_current_user)
@@ -324,35 +788,121 @@ async def update_booking(
         raise HTTPException(status_code=404, detail="Booking not found")
     
     update_data = booking_update.model_dump(exclude_unset=True)
-    
-    if "start_time" in update_data or "end_time" in update_data:
-        start_time = update_data.get("start_time", booking.start_time)
-        end_time = update_data.get("end_time", booking.end_time)
+    touched = booking_days(booking.equipment_id, booking.start_time, booking.end_time)
+    
+    with locked_row(session, LabEquipment, booking.equipment_id):
+        if "start_time" in update_data or "end_time" in update_data:
+            start_time = update_data.get("start_time", booking.start_time)
+            end_time = update_data.get("end_time", booking.end_time)
+            
+            availability = await check_equipment_availability(
+                session, 
+                booking.equipment_id, 
+                start_time, 
+                end_time,
+                exclude_booking_id=booking_id
+            )
+            
+            if not availability.is_available:
+                raise HTTPException(status_code=400, detail=availability.message)
         
-        availability = await check_equipment_availability(
-            session, 
-            booking.equipment_id, 
-            start_time, 
-            end_time,
-            exclude_booking_id=booking_id
-        )
+        for field, value in update_data.items():
+            setattr(booking, field, value)
         
-        if not availability.is_available:
-            raise HTTPException(status_code=400, detail=availability.message)
-    
-    for field, value in update_data.items():
-        setattr(booking, field, value)
-    
-    booking.updated_at = datetime.utcnow()
-    session.add(booking)
-    session.commit()
+        booking.updated_at = datetime.utcnow()
+        session.add(booking)
+        commit_bookings(session)
     session.refresh(booking)
+    refresh_equipment_usage(session, touched + booking_days(booking.equipment_id, booking.start_time, booking.end_time))
     
     return booking_to_response(booking)
 
 
 
 
+@router.get("/availability/calendar", response_model=List[EquipmentAvailabilityResponse])
+async def get_availability_calendar(
+    session: SessionDependency,
+    start_date: date,
+    end_date: date,
+    equipment_ids: Optional[List[str]] = Query(None),
+    category: Optional[EquipmentCategory] = Query(None),
+    location: Optional[str] = Query(None)
+):
+    """Get available time ranges for many equipments over a date range"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    if len(days) > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days")
+    
+    query = select(LabEquipment)
+    if equipment_ids:
+        query = query.where(LabEquipment.id.in_(equipment_ids))
+    if category:
+        query = query.where(LabEquipment.category == category)
+    if location:
+        query = query.where(LabEquipment.location.contains(location))
+    equipments = session.exec(query.order_by(LabEquipment.name)).all()
+    if not equipments:
+        return []
+    ids = [e.id for e in equipments]
+    
+    window_start = datetime.combine(start_date, OFFICE_OPENS)
+    window_end = datetime.combine(end_date, OFFICE_CLOSES)
+    
+    # One range query for every booking of every equipment, already in sweep order
+    busy_by_equipment = {equipment_id: [] for equipment_id in ids}
+    rows = session.exec(
+        select(Booking.equipment_id, Booking.start_time, Booking.end_time).where(
+            Booking.equipment_id.in_(ids),
+            Booking.status.in_([BookingStatus.approved, BookingStatus.pending]),
+            Booking.start_time < window_end,
+            Booking.end_time > window_start
+        ).order_by(Booking.equipment_id, Booking.start_time)
+    ).all()
+    for equipment_id, start, end in rows:
+        busy_by_equipment[equipment_id].append((start, end))
+    
+    series_list = session.exec(
+        select(BookingSeries).where(
+            BookingSeries.equipment_id.in_(ids),
+            BookingSeries.status.in_([BookingStatus.approved, BookingStatus.pending]),
+            BookingSeries.start_date <= end_date,
+            BookingSeries.until >= start_date
+        )
+    ).all()
+    occurrences_by_equipment = {}
+    for series in series_list:
+        occurrences_by_equipment.setdefault(series.equipment_id, []).extend(
+            series_occurrences(series, start_date, end_date)
+        )
+    
+    result = []
+    for equipment in equipments:
+        busy = busy_by_equipment[equipment.id]
+        occurrences = occurrences_by_equipment.get(equipment.id)
+        if occurrences:
+            busy = list(heapq.merge(busy, sorted(occurrences)))
+        
+        # Sweep the days once; intervals may span several days, so the cursor only
+        # skips intervals that ended before the current day opened
+        cursor = 0
+        for day in days:
+            office_start = datetime.combine(day, OFFICE_OPENS)
+            office_end = datetime.combine(day, OFFICE_CLOSES)
+            while cursor < len(busy) and busy[cursor][1] <= office_start:
+                cursor += 1
+            day_busy = []
+            i = cursor
+            while i < len(busy) and busy[i][0] < office_end:
+                if busy[i][1] > office_start:
+                    day_busy.append(busy[i])
+                i += 1
+            result.append(office_day_availability(equipment, day, day_busy))
+    
+    return result
+
 @router.get("/{equipment_id}/availability", response_model=EquipmentAvailabilityResponse)
 async def get_equipment_availability(
     equipment_id: str,
@@ -364,61 +914,34 @@ async def get_equipment_availability(
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
     
-    # Office hours (9AM to 5PM)
-    office_start = datetime.combine(date, time(hour=9))
-    office_end = datetime.combine(date, time(hour=17))
+    office_start = datetime.combine(date, OFFICE_OPENS)
+    office_end = datetime.combine(date, OFFICE_CLOSES)
     
     # Get all bookings for this equipment on the selected date
     bookings = session.exec(
         select(Booking).where(
             Booking.equipment_id == equipment_id,
-            Booking.start_time >= office_start,
-            Booking.end_time <= office_end,
+            Booking.start_time < office_end,
+            Booking.end_time > office_start,
             Booking.status.in_([BookingStatus.approved, BookingStatus.pending])
         ).order_by(Booking.start_time)
     ).all()
+    busy = [(b.start_time, b.end_time) for b in bookings]
+    
+    # Add occurrences of recurring bookings on the selected date
+    series_list = session.exec(
+        select(BookingSeries).where(
+            BookingSeries.equipment_id == equipment_id,
+            BookingSeries.start_date <= date,
+            BookingSeries.until >= date,
+            BookingSeries.status.in_([BookingStatus.approved, BookingStatus.pending])
+        )
+    ).all()
+    for series in series_list:
+        busy += series_occurrences(series, date, date)
+    busy.sort()
     
-    # Initialize availability ranges
-    available_ranges = []
-    current_start = office_start
-    
-    for booking in bookings:
-        # If there's time between current_start and booking start, it's available
-        if current_start < booking.start_time:
-            available_ranges.append(TimeRange(
-                start=current_start.time().isoformat(),
-                end=booking.start_time.time().isoformat()
-            ))
-        # Move current_start to the end of this booking
-        current_start = max(current_start, booking.end_time)
-    
-    # Add remaining time after last booking until office close
-    if current_start < office_end:
-        available_ranges.append(TimeRange(
-            start=current_start.time().isoformat(),
-            end=office_end.time().isoformat()
-        ))
-    
-    # If no bookings, the whole day is available
-    if not bookings:
-        available_ranges.append(TimeRange(
-            start=office_start.time().isoformat(),
-            end=office_end.time().isoformat()
-        ))
-    
-    # Convert bookings to time ranges for response
-    booked_ranges = [TimeRange(
-        start=b.start_time.time().isoformat(),
-        end=b.end_time.time().isoformat()
-    ) for b in bookings]
-    
-    return EquipmentAvailabilityResponse(
-        date=date.isoformat(),
-        equipment_id=equipment_id,
-        equipment_status=equipment.status,
-        available_ranges=available_ranges,
-        booked_ranges=booked_ranges
-    )
+    return office_day_availability(equipment, date, busy)
 
 # Utility Endpoints
 @router.get("/statuses/list")
@@ -1,13 +1,15 @@
-from typing import Annotated, List, Optional
+from collections import defaultdict
+from typing import Annotated, Dict, List, Optional
 from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import select
+from sqlmodel import func, select
 from pydantic import BaseModel
 
 from app.models.user import User
 from app.models.project import Project, ProjectTeamMember
 from app.utils.auth import get_current_user
 from app.utils.db import SessionDependency
+from app.utils.research_search import project_index, search_projects
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -52,49 +54,64 @@ class ProjectsApiResponse(BaseModel):
     page: Optional[int] = None
     limit: Optional[int] = None
 
+class ProjectSearchResponse(BaseModel):
+    data: List[ProjectResponse]
+    total: int
+    page: int
+    limit: int
+    facets: Dict[str, Dict[str, int]]  # "year", "topic", "status" and "supervisor" -> value -> count
+
+def projects_to_responses(projects: List[Project], session: SessionDependency) -> List[ProjectResponse]:
+    """Convert backend Project models to frontend ProjectResponses.
+
+    Team members of all projects are loaded in one IN query and every referenced
+    user (members and supervisors) in another, so the query count does not grow
+    with the page size.
+    """
+    project_ids = [project.id for project in projects]
+    members_by_project = defaultdict(list)
+    if project_ids:
+        for project_id, member in session.exec(
+            select(ProjectTeamMember.project_id, ProjectTeamMember.member)
+            .where(ProjectTeamMember.project_id.in_(project_ids))
+            .order_by(ProjectTeamMember.id)
+        ).all():
+            members_by_project[project_id].append(member)
+    
+    user_ids = {project.supervisor for project in projects if project.supervisor}
+    for members in members_by_project.values():
+        user_ids.update(member for member in members if member)
+    names = dict(session.exec(select(User.id, User.name).where(User.id.in_(user_ids))).all()) if user_ids else {}
+    
+    responses = []
+    for project in projects:
+        # Extract demo URL from description if present (temporary solution)
+        demo_url = None
+        description = project.description
+        if description and "demoUrl:" in description:
+            parts = description.split("demoUrl:")
+            if len(parts) > 1:
+                demo_url = parts[1].strip()
+                description = parts[0].strip()
+        
+        responses.append(ProjectResponse(
+            id=project.id,
+            title=project.title or "",
+            description=description,
+            supervisor=project.supervisor,
+            supervisorName=names.get(project.supervisor),
+            year=project.year or 0,
+            topic=project.topic or "",
+            status=project.status or "",
+            abstract=project.abstract or "",
+            team=[names[member] for member in members_by_project[project.id] if member in names],
+            demoUrl=demo_url
+        ))
+    return responses
+
 def project_to_response(project: Project, session: SessionDependency) -> ProjectResponse:
     """Convert backend Project model to frontend ProjectResponse"""
-    # Get team members
-    team_members = session.exec(
-        select(ProjectTeamMember).where(ProjectTeamMember.project_id == project.id)
-    ).all()
-    
-    # Get team member names
-    team_names = []
-    for member in team_members:
-        user = session.exec(select(User).where(User.id == member.member)).first()
-        if user:
-            team_names.append(user.name)
-    
-    # Get supervisor name
-    supervisor_name = None
-    if project.supervisor:
-        supervisor = session.exec(select(User).where(User.id == project.supervisor)).first()
-        if supervisor:
-            supervisor_name = supervisor.name
-    
-    # Extract demo URL from description if present (temporary solution)
-    demo_url = None
-    description = project.description
-    if description and "demoUrl:" in description:
-        parts = description.split("demoUrl:")
-        if len(parts) > 1:
-            demo_url = parts[1].strip()
-            description = parts[0].strip()
-    
-    return ProjectResponse(
-        id=project.id,
-        title=project.title or "",
-        description=description,
-        supervisor=project.supervisor,
-        supervisorName=supervisor_name,
-        year=project.year or 0,
-        topic=project.topic or "",
-        status=project.status or "",
-        abstract=project.abstract or "",
-        team=team_names,
-        demoUrl=demo_url
-    )
+    return projects_to_responses([project], session)[0]
 
 @router.get("/", response_model=ProjectsApiResponse)
 async def get_projects(
@@ -107,15 +124,21 @@ async def get_projects(
     supervisor: Optional[str] = Query(None)
 ):
     """Get all projects with filtering"""
-    query = select(Project)
-    
-    # Apply filters
     if searchQuery:
-        query = query.where(
-            Project.title.contains(searchQuery) |
-            Project.abstract.contains(searchQuery)
+        # Ranked by relevance through the search index instead of substring scans
+        projects, total, _ = search_projects(
+            session, searchQuery, year=year, topic=topic, supervisor=supervisor, limit=limit, offset=skip
+        )
+        return ProjectsApiResponse(
+            data=projects_to_responses(projects, session),
+            total=total,
+            page=skip // limit + 1 if limit > 0 else 1,
+            limit=limit
         )
     
+    query = select(Project)
+    
+    # Apply filters
     if year:
         query = query.where(Project.year == year)
     
@@ -126,18 +149,41 @@ async def get_projects(
         query = query.where(Project.supervisor == supervisor)
     
     # Get total count
-    total = len(session.exec(query).all())
+    total = session.exec(select(func.count()).select_from(query.subquery())).one()
     
     # Apply pagination
     projects = session.exec(query.offset(skip).limit(limit)).all()
     
     return ProjectsApiResponse(
-        data=[project_to_response(project, session) for project in projects],
+        data=projects_to_responses(projects, session),
         total=total,
         page=skip // limit + 1 if limit > 0 else 1,
         limit=limit
     )
 
+@router.get("/search", response_model=ProjectSearchResponse)
+async def search_projects_endpoint(
+    session: SessionDependency,
+    q: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    topic: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    supervisor: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search past projects by title, topic and abstract, with year, topic, status and supervisor facet counts"""
+    projects, total, facets = search_projects(
+        session, q, year, topic, status, supervisor, limit=limit, offset=(page - 1) * limit
+    )
+    return ProjectSearchResponse(
+        data=projects_to_responses(projects, session),
+        total=total,
+        page=page,
+        limit=limit,
+        facets=facets
+    )
+
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(project_id: str, session: SessionDependency):
     """Get a specific project by ID"""
@@ -187,6 +233,7 @@ async def create_project(
     
     session.commit()
     session.refresh(project)
+    project_index.update(project)
     
     return project_to_response(project, session)
 
@@ -238,6 +285,7 @@ async def update_project(
     session.add(project)
     session.commit()
     session.refresh(project)
+    project_index.update(project)
     
     return project_to_response(project, session)
 
@@ -266,6 +314,7 @@ async def delete_project(
     # Delete project
     session.delete(project)
     session.commit()
+    project_index.discard(project_id)
     
     return {"message": "Project deleted successfully"}
 
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Query
+from sqlmodel import select
+from pydantic import BaseModel
+
+from app.models.research import ResearchPaper, ResearchPaperAuthor
+from app.utils.db import SessionDependency
+from app.utils.research_search import search_research_papers
+
+router = APIRouter(prefix="/research-papers", tags=["research"])
+
+# Response models
+class ResearchPaperResponse(BaseModel):
+    id: str
+    title: Optional[str] = None
+    abstract: Optional[str] = None
+    publication_date: Optional[date] = None
+    journal: Optional[str] = None
+    doi: Optional[str] = None
+    status: Optional[str] = None
+    authors: List[str] = []
+
+class ResearchPaperSearchResponse(BaseModel):
+    data: List[ResearchPaperResponse]
+    total: int
+    page: int
+    limit: int
+    facets: Dict[str, Dict[str, int]]  # "year", "status" and "journal" -> value -> count
+
+def papers_to_responses(papers: List[ResearchPaper], session: SessionDependency) -> List[ResearchPaperResponse]:
+    """Convert ResearchPapers to responses, loading the authors of all of them in one query"""
+    authors = defaultdict(list)
+    if papers:
+        for paper_id, author_name in session.exec(
+            select(ResearchPaperAuthor.paper_id, ResearchPaperAuthor.author_name)
+            .where(ResearchPaperAuthor.paper_id.in_([paper.id for paper in papers]))
+            .order_by(ResearchPaperAuthor.id)
+        ).all():
+            if author_name:
+                authors[paper_id].append(author_name)
+    return [
+        ResearchPaperResponse(**paper.model_dump(), authors=authors[paper.id])
+        for paper in papers
+    ]
+
+@router.get("/search", response_model=ResearchPaperSearchResponse)
+async def search_papers(
+    session: SessionDependency,
+    q: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    journal: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search research papers by title, abstract, journal and author, with year, status and journal facet counts"""
+    papers, total, facets = search_research_papers(
+        session, q, year, status, journal, limit=limit, offset=(page - 1) * limit
+    )
+    return ResearchPaperSearchResponse(
+        data=papers_to_responses(papers, session),
+        total=total,
+        page=page,
+        limit=limit,
+        facets=facets
+    )
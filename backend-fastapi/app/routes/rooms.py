@@ -1,13 +1,21 @@
+from contextlib import ExitStack
 from datetime import date, time, datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlmodel import Session, select, and_, or_
 from pydantic import BaseModel
 
 from app.utils.db import get_session
 from app.utils.auth import get_current_user
-from app.models.room import Room, RoomAvailabilitySlot, RoomBooking
+from app.models.room import Room, RoomAvailabilitySlot, RoomBooking, RoomBookingArchive, RoomBookingSeries
+from app.models.class_schedule import ClassSchedule
 from app.models.user import User, UserRoles
+from app.utils.intervals import IntervalIndex, time_to_minutes
+from app.utils.locks import locked_row
+from app.utils.occupancy import room_occupancy
+from app.utils.recurrence import series_dates, validate_weekdays
+from app.utils.utilization import delete_room_usage, refresh_room_usage, rename_room_usage
 
 # Mock admin user for development
 def get_mock_admin_user():
@@ -46,6 +54,68 @@ def find_room_by_id(session: Session, room_id: int) -> Optional[Room]:
             return room
     return None
 
+# Helper function to find what a booking would clash with
+def find_booking_conflicts(
+    session: Session,
+    room: str,
+    booking_dates: List[date],
+    start_time: time,
+    end_time: time,
+    exclude_booking_id: Optional[int] = None,
+    exclude_series_id: Optional[int] = None
+) -> List[str]:
+    """Describe approved bookings, approved booking series and classes overlapping the slot on any of the dates"""
+    dates = sorted(set(booking_dates))
+    if not dates:
+        return []
+    
+    bookings_query = select(RoomBooking).where(
+        RoomBooking.room == room,
+        RoomBooking.booking_date.in_(dates),
+        RoomBooking.status == "Approved",
+        RoomBooking.start_time < end_time,
+        RoomBooking.end_time > start_time
+    )
+    if exclude_booking_id is not None:
+        bookings_query = bookings_query.where(RoomBooking.id != exclude_booking_id)
+    
+    series_query = select(RoomBookingSeries).where(
+        RoomBookingSeries.room == room,
+        RoomBookingSeries.start_date <= dates[-1],
+        RoomBookingSeries.until >= dates[0],
+        RoomBookingSeries.status == "Approved",
+        RoomBookingSeries.start_time < end_time,
+        RoomBookingSeries.end_time > start_time
+    )
+    if exclude_series_id is not None:
+        series_query = series_query.where(RoomBookingSeries.id != exclude_series_id)
+    
+    classes_query = select(ClassSchedule).where(
+        ClassSchedule.day.in_({d.strftime("%A") for d in dates}),
+        ClassSchedule.room == room,
+        ClassSchedule.start_time < end_time,
+        ClassSchedule.end_time > start_time
+    )
+    
+    conflicts = [
+        f"approved booking {b.booking_date} {b.start_time.strftime('%H:%M')}-{b.end_time.strftime('%H:%M')} ({b.purpose or 'no purpose'})"
+        for b in session.exec(bookings_query.order_by(RoomBooking.booking_date)).all()
+    ]
+    wanted = set(dates)
+    for series in session.exec(series_query).all():
+        # Only the part of the series inside the requested dates is expanded
+        clashes = [d for d in series_dates(series, dates[0], dates[-1]) if d in wanted]
+        if clashes:
+            conflicts.append(
+                f"recurring booking {series.start_time.strftime('%H:%M')}-{series.end_time.strftime('%H:%M')} "
+                f"({series.purpose or 'no purpose'}) on {len(clashes)} date(s) from {clashes[0]}"
+            )
+    conflicts += [
+        f"class {c.course_code} {c.day} {c.start_time.strftime('%H:%M')}-{c.end_time.strftime('%H:%M')}"
+        for c in session.exec(classes_query).all()
+    ]
+    return conflicts
+
 router = APIRouter(prefix="/api/scheduling", tags=["rooms"])
 
 # Pydantic models for API responses
@@ -70,6 +140,31 @@ class RoomBookingResponse(BaseModel):
     requestDate: str
     rejectionReason: Optional[str] = None
 
+class RoomBookingSeriesResponse(BaseModel):
+    id: int
+    room: str
+    requestedBy: str
+    email: str
+    purpose: str
+    startDate: str
+    until: str
+    startTime: str
+    endTime: str
+    weekdays: List[str]
+    intervalWeeks: int
+    exceptions: List[str]
+    attendees: int
+    status: str
+    requestDate: str
+    rejectionReason: Optional[str] = None
+    occurrences: List[str]  # dates within the requested window
+
+class FreeRoomResponse(BaseModel):
+    id: int
+    room: str
+    capacity: int
+    facilities: List[str]
+
 class BookingFormData(BaseModel):
     room: str
     requestedBy: str
@@ -80,10 +175,38 @@ class BookingFormData(BaseModel):
     endTime: str
     attendees: int
 
+class BookingSeriesFormData(BaseModel):
+    room: str
+    requestedBy: str
+    email: str
+    purpose: str
+    startDate: str
+    until: str
+    startTime: str
+    endTime: str
+    weekdays: List[str] = []  # defaults to the weekday of startDate
+    intervalWeeks: int = 1
+    exceptions: List[str] = []  # dates to skip
+    attendees: int
+
 class ApprovalRequest(BaseModel):
     action: str  # "approve" or "reject"
     rejectionReason: Optional[str] = None
 
+class BookingReviewItem(BaseModel):
+    id: int
+    action: str  # "approve" or "reject"
+    rejectionReason: Optional[str] = None
+
+class BookingReviewRequest(BaseModel):
+    decisions: List[BookingReviewItem]
+
+class BookingReviewResult(BaseModel):
+    id: int
+    success: bool
+    status: Optional[str] = None
+    message: Optional[str] = None
+
 class RoomCreateRequest(BaseModel):
     room: str
     capacity: int
@@ -135,6 +258,36 @@ async def get_room_availability(session: Session = Depends(get_session)):
     
     return result
 
+@router.get("/rooms/free", response_model=List[FreeRoomResponse])
+async def get_free_rooms(
+    date: date,
+    start_time: str,
+    end_time: str,
+    min_capacity: int = 0,
+    session: Session = Depends(get_session)
+):
+    """Get rooms with enough capacity that are open and unoccupied for the whole time range"""
+    
+    try:
+        start = datetime.strptime(start_time, "%H:%M").time()
+        end = datetime.strptime(end_time, "%H:%M").time()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM format")
+    
+    if start >= end:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    
+    free = room_occupancy.free_rooms(session, date, start, end, min_capacity)
+    return [
+        FreeRoomResponse(
+            id=generate_room_id(room),
+            room=room,
+            capacity=capacity,
+            facilities=facilities
+        )
+        for room, capacity, facilities in free
+    ]
+
 # Room Booking Endpoints
 @router.post("/bookings", response_model=dict)
 async def create_booking(
@@ -148,23 +301,38 @@ async def create_booking(
     start_time = datetime.strptime(booking_data.startTime, "%H:%M").time()
     end_time = datetime.strptime(booking_data.endTime, "%H:%M").time()
     
-    # Create booking in database
-    booking = RoomBooking(
-        room=booking_data.room,
-        requested_by=booking_data.requestedBy,
-        email=booking_data.email,
-        purpose=booking_data.purpose,
-        booking_date=booking_date,
-        start_time=start_time,
-        end_time=end_time,
-        attendees=booking_data.attendees,
-        status="Pending",
-        request_date=date.today()
-    )
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
     
-    session.add(booking)
-    session.commit()
-    session.refresh(booking)
+    # Lock the room so concurrent requests for it are checked one at a time
+    with locked_row(session, Room, booking_data.room) as room:
+        if not room:
+            raise HTTPException(status_code=404, detail="Room not found")
+        
+        conflicts = find_booking_conflicts(session, room.room, [booking_date], start_time, end_time)
+        if conflicts:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Room {room.room} is not available: " + "; ".join(conflicts)
+            )
+        
+        # Create booking in database
+        booking = RoomBooking(
+            room=booking_data.room,
+            requested_by=booking_data.requestedBy,
+            email=booking_data.email,
+            purpose=booking_data.purpose,
+            booking_date=booking_date,
+            start_time=start_time,
+            end_time=end_time,
+            attendees=booking_data.attendees,
+            status="Pending",
+            request_date=date.today()
+        )
+        
+        session.add(booking)
+        session.commit()
+        session.refresh(booking)
     
     return {"message": "Booking request submitted successfully", "booking_id": booking.id}
 
@@ -215,19 +383,354 @@ async def approve_booking(
         raise HTTPException(status_code=404, detail="Booking not found")
     
     if approval_data.action == "approve":
-        booking.status = "Approved"
-        booking.rejection_reason = None
+        # Lock the room and re-check against bookings approved in the meantime
+        with locked_row(session, Room, booking.room) as room:
+            conflicts = find_booking_conflicts(
+                session, booking.room, [booking.booking_date], booking.start_time, booking.end_time,
+                exclude_booking_id=booking.id
+            )
+            if conflicts:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Cannot approve, room {booking.room} is not available: " + "; ".join(conflicts)
+                )
+            booking.status = "Approved"
+            booking.rejection_reason = None
+            session.add(booking)
+            session.commit()
     elif approval_data.action == "reject":
         booking.status = "Rejected"
         booking.rejection_reason = approval_data.rejectionReason
+        session.add(booking)
+        session.commit()
     else:
         raise HTTPException(status_code=400, detail="Invalid action. Must be 'approve' or 'reject'")
     
-    session.add(booking)
-    session.commit()
+    room_occupancy.invalidate_bookings(booking.booking_date)
+    refresh_room_usage(session, [(booking.room, booking.booking_date)])
     
     return {"message": f"Booking {approval_data.action}d successfully"}
 
+def load_booking_index(
+    session: Session,
+    dates_by_room: Dict[str, Set[date]],
+    exclude_booking_ids: List[int]
+) -> IntervalIndex:
+    """Index everything already occupying the rooms on the dates, keyed by (room, date), in minutes"""
+    index = IntervalIndex()
+    rooms = list(dates_by_room)
+    all_dates = sorted(set().union(*dates_by_room.values()))
+    
+    bookings = session.exec(
+        select(RoomBooking).where(
+            RoomBooking.room.in_(rooms),
+            RoomBooking.booking_date.in_(all_dates),
+            RoomBooking.status == "Approved",
+            RoomBooking.id.not_in(exclude_booking_ids)
+        )
+    ).all()
+    for b in bookings:
+        index.add((b.room, b.booking_date), time_to_minutes(b.start_time), time_to_minutes(b.end_time),
+                  f"approved booking {b.start_time.strftime('%H:%M')}-{b.end_time.strftime('%H:%M')} ({b.purpose or 'no purpose'})")
+    
+    series_list = session.exec(
+        select(RoomBookingSeries).where(
+            RoomBookingSeries.room.in_(rooms),
+            RoomBookingSeries.start_date <= all_dates[-1],
+            RoomBookingSeries.until >= all_dates[0],
+            RoomBookingSeries.status == "Approved"
+        )
+    ).all()
+    for series in series_list:
+        for d in series_dates(series, all_dates[0], all_dates[-1]):
+            if d in dates_by_room[series.room]:
+                index.add((series.room, d), time_to_minutes(series.start_time), time_to_minutes(series.end_time),
+                          f"recurring booking {series.start_time.strftime('%H:%M')}-{series.end_time.strftime('%H:%M')} ({series.purpose or 'no purpose'})")
+    
+    classes = session.exec(
+        select(ClassSchedule).where(
+            ClassSchedule.room.in_(rooms),
+            ClassSchedule.day.in_({d.strftime("%A") for d in all_dates})
+        )
+    ).all()
+    for c in classes:
+        if not (c.start_time and c.end_time):
+            continue
+        for d in dates_by_room[c.room]:
+            if d.strftime("%A") == c.day:
+                index.add((c.room, d), time_to_minutes(c.start_time), time_to_minutes(c.end_time),
+                          f"class {c.course_code} {c.start_time.strftime('%H:%M')}-{c.end_time.strftime('%H:%M')}")
+    return index
+
+@router.post("/bookings/review", response_model=List[BookingReviewResult])
+async def review_bookings(
+    review_data: BookingReviewRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Approve or reject many room booking requests in one transaction"""
+    
+    ids = [decision.id for decision in review_data.decisions]
+    bookings = {b.id: b for b in session.exec(select(RoomBooking).where(RoomBooking.id.in_(ids))).all()}
+    
+    results: List[Optional[BookingReviewResult]] = [None] * len(ids)
+    approvals = []  # positions of the approvals, in request order
+    seen = set()
+    for position, decision in enumerate(review_data.decisions):
+        booking = bookings.get(decision.id)
+        if decision.id in seen:
+            results[position] = BookingReviewResult(id=decision.id, success=False, message="Duplicate booking id")
+        elif not booking:
+            results[position] = BookingReviewResult(id=decision.id, success=False, message="Booking not found")
+        elif decision.action == "approve" and not (
+            booking.room and booking.booking_date and booking.start_time and booking.end_time
+        ):
+            results[position] = BookingReviewResult(
+                id=decision.id, success=False, status=booking.status, message="Booking has no room, date or time"
+            )
+        elif decision.action == "reject":
+            booking.status = "Rejected"
+            booking.rejection_reason = decision.rejectionReason
+            session.add(booking)
+            results[position] = BookingReviewResult(id=decision.id, success=True, status="Rejected")
+        elif decision.action == "approve":
+            approvals.append(position)
+        else:
+            results[position] = BookingReviewResult(
+                id=decision.id, success=False, message="Invalid action. Must be 'approve' or 'reject'"
+            )
+        seen.add(decision.id)
+    
+    dates_by_room: Dict[str, Set[date]] = {}
+    for position in approvals:
+        booking = bookings[ids[position]]
+        dates_by_room.setdefault(booking.room, set()).add(booking.booking_date)
+    
+    with ExitStack() as stack:
+        # Lock rooms in a fixed order so concurrent reviews cannot deadlock
+        for room in sorted(dates_by_room):
+            stack.enter_context(locked_row(session, Room, room))
+        
+        if approvals:
+            index = load_booking_index(session, dates_by_room, ids)
+            # Approve in request order; each approval blocks the ones after it
+            for position in approvals:
+                booking = bookings[ids[position]]
+                key = (booking.room, booking.booking_date)
+                start, end = time_to_minutes(booking.start_time), time_to_minutes(booking.end_time)
+                conflicts = index.overlapping(key, start, end)
+                if conflicts:
+                    results[position] = BookingReviewResult(
+                        id=booking.id,
+                        success=False,
+                        status=booking.status,
+                        message=f"Room {booking.room} is not available: " + "; ".join(conflicts)
+                    )
+                    continue
+                index.add(key, start, end, f"booking #{booking.id} approved in this review")
+                booking.status = "Approved"
+                booking.rejection_reason = None
+                session.add(booking)
+                results[position] = BookingReviewResult(id=booking.id, success=True, status="Approved")
+        
+        session.commit()
+    
+    for booking in bookings.values():
+        room_occupancy.invalidate_bookings(booking.booking_date)
+    refresh_room_usage(session, [(booking.room, booking.booking_date) for booking in bookings.values()])
+    
+    return results
+
+# Recurring Room Booking Endpoints
+def series_to_response(
+    series: RoomBookingSeries,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None
+) -> RoomBookingSeriesResponse:
+    return RoomBookingSeriesResponse(
+        id=series.id,
+        room=series.room or "",
+        requestedBy=series.requested_by or "",
+        email=series.email or "",
+        purpose=series.purpose or "",
+        startDate=series.start_date.strftime("%Y-%m-%d"),
+        until=series.until.strftime("%Y-%m-%d"),
+        startTime=series.start_time.strftime("%H:%M"),
+        endTime=series.end_time.strftime("%H:%M"),
+        weekdays=series.weekdays or [series.start_date.strftime("%A")],
+        intervalWeeks=series.interval_weeks,
+        exceptions=series.exceptions or [],
+        attendees=series.attendees or 0,
+        status=series.status or "Pending",
+        requestDate=series.request_date.strftime("%Y-%m-%d") if series.request_date else "",
+        rejectionReason=series.rejection_reason,
+        occurrences=[d.strftime("%Y-%m-%d") for d in series_dates(series, from_date, to_date)]
+    )
+
+@router.post("/booking-series", response_model=dict)
+async def create_booking_series(
+    series_data: BookingSeriesFormData,
+    session: Session = Depends(get_session)
+):
+    """Create a weekly recurring room booking request"""
+    
+    try:
+        start_date = datetime.strptime(series_data.startDate, "%Y-%m-%d").date()
+        until = datetime.strptime(series_data.until, "%Y-%m-%d").date()
+        start_time = datetime.strptime(series_data.startTime, "%H:%M").time()
+        end_time = datetime.strptime(series_data.endTime, "%H:%M").time()
+        exceptions = [datetime.strptime(d, "%Y-%m-%d").date() for d in series_data.exceptions]
+        weekdays = validate_weekdays(series_data.weekdays)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid booking series: {e}")
+    
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    if until < start_date:
+        raise HTTPException(status_code=400, detail="Until date must not be before start date")
+    if series_data.intervalWeeks < 1:
+        raise HTTPException(status_code=400, detail="Interval must be at least one week")
+    
+    series = RoomBookingSeries(
+        room=series_data.room,
+        requested_by=series_data.requestedBy,
+        email=series_data.email,
+        purpose=series_data.purpose,
+        start_date=start_date,
+        until=until,
+        start_time=start_time,
+        end_time=end_time,
+        weekdays=weekdays,
+        interval_weeks=series_data.intervalWeeks,
+        exceptions=sorted({d.isoformat() for d in exceptions}),
+        attendees=series_data.attendees,
+        status="Pending",
+        request_date=date.today()
+    )
+    occurrences = series_dates(series)
+    if not occurrences:
+        raise HTTPException(status_code=400, detail="Booking series has no occurrences")
+    
+    # One lock and one conflict query batch for every occurrence of the series
+    with locked_row(session, Room, series_data.room) as room:
+        if not room:
+            raise HTTPException(status_code=404, detail="Room not found")
+        
+        conflicts = find_booking_conflicts(session, room.room, occurrences, start_time, end_time)
+        if conflicts:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Room {room.room} is not available: " + "; ".join(conflicts)
+            )
+        
+        session.add(series)
+        session.commit()
+        session.refresh(series)
+    
+    return {
+        "message": "Booking series request submitted successfully",
+        "series_id": series.id,
+        "occurrences": len(occurrences)
+    }
+
+@router.get("/booking-series", response_model=List[RoomBookingSeriesResponse])
+async def get_booking_series(
+    status: Optional[str] = None,
+    room: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    session: Session = Depends(get_session)
+):
+    """Get recurring room bookings with their occurrences inside the optional date window"""
+    
+    query = select(RoomBookingSeries)
+    if status:
+        query = query.where(RoomBookingSeries.status == status)
+    if room:
+        query = query.where(RoomBookingSeries.room == room)
+    if from_date:
+        query = query.where(RoomBookingSeries.until >= from_date)
+    if to_date:
+        query = query.where(RoomBookingSeries.start_date <= to_date)
+    
+    series_list = session.exec(query.order_by(RoomBookingSeries.start_date)).all()
+    return [series_to_response(series, from_date, to_date) for series in series_list]
+
+@router.put("/booking-series/{series_id}/approve", response_model=dict)
+async def approve_booking_series(
+    series_id: int,
+    approval_data: ApprovalRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Approve or reject every occurrence of a recurring room booking"""
+    
+    series = session.get(RoomBookingSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    
+    occurrences = series_dates(series)
+    if approval_data.action == "approve":
+        # Lock the room and re-check against bookings approved in the meantime
+        with locked_row(session, Room, series.room) as room:
+            conflicts = find_booking_conflicts(
+                session, series.room, occurrences, series.start_time, series.end_time,
+                exclude_series_id=series.id
+            )
+            if conflicts:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Cannot approve, room {series.room} is not available: " + "; ".join(conflicts)
+                )
+            series.status = "Approved"
+            series.rejection_reason = None
+            session.add(series)
+            session.commit()
+    elif approval_data.action == "reject":
+        series.status = "Rejected"
+        series.rejection_reason = approval_data.rejectionReason
+        session.add(series)
+        session.commit()
+    else:
+        raise HTTPException(status_code=400, detail="Invalid action. Must be 'approve' or 'reject'")
+    
+    for occurrence in occurrences:
+        room_occupancy.invalidate_bookings(occurrence)
+    refresh_room_usage(session, [(series.room, occurrence) for occurrence in occurrences])
+    
+    return {"message": f"Booking series {approval_data.action}d successfully"}
+
+@router.delete("/booking-series/{series_id}/occurrences/{occurrence_date}", response_model=dict)
+async def cancel_booking_occurrence(
+    series_id: int,
+    occurrence_date: date,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Cancel a single occurrence of a recurring room booking (admin or the requester)"""
+    
+    series = session.get(RoomBookingSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    
+    if current_user.role != UserRoles.admin and current_user.email != series.email:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins or the requester can cancel occurrences of this booking series"
+        )
+    
+    if not series_dates(series, occurrence_date, occurrence_date):
+        raise HTTPException(status_code=404, detail="Booking series has no occurrence on that date")
+    
+    # Assign a new list so the JSON column is flagged as changed
+    series.exceptions = sorted([*(series.exceptions or []), occurrence_date.isoformat()])
+    session.add(series)
+    session.commit()
+    room_occupancy.invalidate_bookings(occurrence_date)
+    refresh_room_usage(session, [(series.room, occurrence_date)])
+    
+    return {"message": f"Occurrence on {occurrence_date} cancelled successfully"}
+
 # Admin Room CRUD Endpoints
 @router.get("/admin/rooms", response_model=List[RoomAvailabilityResponse])
 async def get_admin_rooms(
@@ -312,6 +815,7 @@ async def create_room(
                 continue  # Skip invalid slots
     
     session.commit()
+    room_occupancy.invalidate(room.room)
     
     return {"message": f"Room {room_data.room} created successfully", "room_id": generate_room_id(room.room)}
 
@@ -423,8 +927,22 @@ async def update_room(
             booking.room = room.room
             session.add(booking)
         
+        # Update recurring bookings
+        series_list = session.exec(select(RoomBookingSeries).where(RoomBookingSeries.room == old_room_name)).all()
+        for series in series_list:
+            series.room = room.room
+            session.add(series)
+        
+        # Keep archived bookings attached to the room's history
+        session.execute(
+            update(RoomBookingArchive).where(RoomBookingArchive.room == old_room_name).values(room=room.room)
+        )
+        
         session.commit()
     
+    room_occupancy.invalidate(old_room_name, room.room)
+    if room.room != old_room_name:
+        rename_room_usage(session, old_room_name, room.room)
     return {"message": f"Room updated successfully", "room_id": generate_room_id(room.room)}
 
 @router.delete("/admin/rooms/{room_id}", response_model=dict)
@@ -458,6 +976,9 @@ async def delete_room(
             bookings = session.exec(select(RoomBooking).where(RoomBooking.room == room_name)).all()
             for booking in bookings:
                 session.delete(booking)
+            series_list = session.exec(select(RoomBookingSeries).where(RoomBookingSeries.room == room_name)).all()
+            for series in series_list:
+                session.delete(series)
             session.commit()
         except Exception as e:
             print(f"Error deleting bookings: {e}")
@@ -465,7 +986,6 @@ async def delete_room(
         
         # Delete associated class schedules from database
         try:
-            from app.models.class_schedule import ClassSchedule
             schedules = session.exec(select(ClassSchedule).where(ClassSchedule.room == room_name)).all()
             for schedule in schedules:
                 session.delete(schedule)
@@ -483,6 +1003,8 @@ async def delete_room(
             session.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to delete room: {str(e)}")
         
+        room_occupancy.invalidate()
+        delete_room_usage(session, room_name)
         return {"message": f"Room {room_name} deleted successfully"}
         
     except HTTPException:
@@ -574,4 +1096,5 @@ async def create_sample_rooms(session: Session = Depends(get_session)):
         
         session.commit()
     
+    room_occupancy.invalidate()
     return {"message": "Sample room data created successfully"} 
\ No newline at end of file
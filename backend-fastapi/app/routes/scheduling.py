@@ -1,14 +1,30 @@
+import csv
+import io
+import math
+from collections import defaultdict
 from datetime import date, time, datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy import insert, update
+from sqlmodel import Session, select, delete
+from pydantic import BaseModel, Field, ValidationError
 
 from app.utils.db import get_session
 from app.utils.auth import get_current_user
 from app.models.class_schedule import ClassSchedule
 from app.models.course import Course
+from app.models.room import Room, RoomAvailabilitySlot
 from app.models.user import User, UserRoles
+from app.utils.intervals import time_to_minutes
+from app.utils.occupancy import room_occupancy
+from app.utils.timetable_solver import BusyInterval, CourseOffering, RoomSpec, TimetableSolver
+from app.utils.schedule_conflicts import (
+    ScheduleConflict,
+    ScheduleConflictIndex,
+    find_schedule_conflicts,
+    find_timetable_clashes,
+    describe_conflicts
+)
 
 # Mock admin user for development
 def get_mock_admin_user():
@@ -66,6 +82,63 @@ class ClassScheduleUpdateRequest(BaseModel):
     end_time: Optional[str] = None
     instructor: Optional[str] = None
 
+class TimetableValidationResponse(BaseModel):
+    valid: bool
+    totalSchedules: int
+    conflicts: List[ScheduleConflict]
+
+class ScheduleImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ScheduleImportResponse(BaseModel):
+    written: bool
+    total: int
+    inserted: int
+    updated: int
+    coursesCreated: int
+    errors: List[ScheduleImportRowError]
+
+MAX_TIME_BUDGET_SECONDS = 30.0  # each generate request holds a worker thread for up to this long
+
+class TimetableBatchRequest(BaseModel):
+    batch: str
+    semester: str
+    courseCodes: List[str]
+    size: int = 0  # number of students, rooms must fit the batch
+
+class TimetableGenerateRequest(BaseModel):
+    batches: List[TimetableBatchRequest]
+    days: List[str] = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+    dayStart: str = "08:00"
+    dayEnd: str = "17:00"
+    slotMinutes: int = 60
+    timeBudgetSeconds: float = Field(5.0, gt=0, le=MAX_TIME_BUDGET_SECONDS)
+    pinnedScheduleIds: List[int] = []  # existing classes of these batches to keep as they are
+    dryRun: bool = False
+
+class GeneratedSlot(BaseModel):
+    courseCode: str
+    batch: str
+    semester: str
+    room: str
+    day: str
+    startTime: str
+    endTime: str
+    instructor: Optional[str] = None
+
+class UnplacedOffering(BaseModel):
+    courseCode: str
+    batch: str
+    sessions: int
+
+class TimetableGenerateResponse(BaseModel):
+    written: bool
+    message: str
+    solveSeconds: float
+    schedules: List[GeneratedSlot]
+    unplaced: List[UnplacedOffering]
+
 # Class Schedule Endpoints
 @router.get("/schedules", response_model=List[ClassScheduleResponse])
 async def get_class_schedules(
@@ -163,22 +236,31 @@ async def create_class_schedule(
             detail="Start time must be before end time"
         )
     
+    schedule = ClassSchedule(
+        course_code=schedule_data.course_code,
+        batch=schedule_data.batch,
+        semester=schedule_data.semester,
+        room=schedule_data.room,
+        day=schedule_data.day,
+        start_time=start_time,
+        end_time=end_time,
+        instructor=schedule_data.instructor
+    )
+    
+    # Reject overlapping room, instructor or batch bookings
+    conflicts = find_schedule_conflicts(session, schedule)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=describe_conflicts(conflicts)
+        )
+    
     # Create schedule in database
     try:
-        schedule = ClassSchedule(
-            course_code=schedule_data.course_code,
-            batch=schedule_data.batch,
-            semester=schedule_data.semester,
-            room=schedule_data.room,
-            day=schedule_data.day,
-            start_time=start_time,
-            end_time=end_time,
-            instructor=schedule_data.instructor
-        )
-        
         session.add(schedule)
         session.commit()
         session.refresh(schedule)
+        room_occupancy.invalidate(schedule.room)
         
         return {"message": "Class schedule created successfully", "schedule_id": schedule.id}
     
@@ -189,6 +271,191 @@ async def create_class_schedule(
             detail=f"Failed to create schedule: {str(e)}"
         )
 
+def import_schedule_rows(
+    rows: List[dict],
+    session: Session,
+    create_missing_courses: bool = False,
+    skip_invalid: bool = False,
+    dry_run: bool = False
+) -> ScheduleImportResponse:
+    """Validate and upsert many class schedules in one transaction
+    
+    A row replaces the existing class of the same batch starting at the same
+    day and time, otherwise it is inserted. Unless `skip_invalid` is set,
+    nothing is written when any row is invalid.
+    """
+    errors = {}
+    parsed = []
+    for row_no, row in enumerate(rows, start=1):
+        try:
+            data = ClassScheduleCreateRequest(**row)
+        except ValidationError as e:
+            errors[row_no] = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+            continue
+        try:
+            start_time = datetime.strptime(data.start_time, "%H:%M").time()
+            end_time = datetime.strptime(data.end_time, "%H:%M").time()
+        except ValueError:
+            errors[row_no] = ["Invalid time format. Use HH:MM format"]
+            continue
+        if start_time >= end_time:
+            errors[row_no] = ["Start time must be before end time"]
+            continue
+        parsed.append((row_no, ClassSchedule(
+            course_code=data.course_code,
+            batch=data.batch,
+            semester=data.semester,
+            room=data.room,
+            day=data.day,
+            start_time=start_time,
+            end_time=end_time,
+            instructor=data.instructor or None
+        )))
+    
+    # Resolve every referenced course, room and instructor with one query each
+    course_codes = {schedule.course_code for _, schedule in parsed}
+    room_names = {schedule.room for _, schedule in parsed}
+    instructor_ids = {schedule.instructor for _, schedule in parsed if schedule.instructor}
+    known_courses = set(session.exec(select(Course.course_code).where(Course.course_code.in_(course_codes))).all())
+    known_rooms = set(session.exec(select(Room.room).where(Room.room.in_(room_names))).all())
+    known_users = set(session.exec(select(User.id).where(User.id.in_(instructor_ids))).all())
+    
+    # Existing classes on the imported days, keyed by their (batch, day, start) slot
+    days = {schedule.day for _, schedule in parsed}
+    existing = session.exec(select(ClassSchedule).where(ClassSchedule.day.in_(days))).all()
+    existing_by_slot = {(s.batch, s.day, s.start_time): s for s in existing}
+    index = ScheduleConflictIndex(existing)
+    
+    inserts, updates = [], []
+    touched_rooms = set()
+    new_courses = set()
+    imported_slots = {}
+    for row_no, schedule in parsed:
+        row_errors = []
+        if schedule.course_code not in known_courses and not create_missing_courses:
+            row_errors.append(f"Course {schedule.course_code} does not exist")
+        if schedule.room not in known_rooms:
+            row_errors.append(f"Room {schedule.room} does not exist")
+        if schedule.instructor and schedule.instructor not in known_users:
+            row_errors.append(f"Instructor {schedule.instructor} does not exist")
+        slot = (schedule.batch, schedule.day, schedule.start_time)
+        if slot in imported_slots:
+            row_errors.append(f"Same batch, day and start time as row {imported_slots[slot]}")
+        if row_errors:
+            errors[row_no] = row_errors
+            continue
+        
+        target = existing_by_slot.get(slot)
+        if target:
+            index.remove(target)
+        conflicts = index.find_conflicts(schedule)
+        if conflicts:
+            errors[row_no] = [describe_conflicts(conflicts)]
+            if target:
+                index.add(target)
+            continue
+        
+        index.add(schedule)
+        imported_slots[slot] = row_no
+        if schedule.course_code not in known_courses:
+            new_courses.add(schedule.course_code)
+        values = schedule.model_dump(exclude={"id"})
+        touched_rooms.add(schedule.room)
+        if target:
+            touched_rooms.add(target.room)
+            updates.append({"id": target.id, **values})
+        else:
+            inserts.append(values)
+    
+    written = not dry_run and bool(inserts or updates) and (skip_invalid or not errors)
+    if written:
+        try:
+            if new_courses:
+                session.execute(insert(Course), [
+                    {
+                        "course_code": code,
+                        "course_title": f"Course {code}",
+                        "course_credits": 3,
+                        "course_description": f"Course {code} - Auto-created"
+                    }
+                    for code in sorted(new_courses)
+                ])
+            if inserts:
+                session.execute(insert(ClassSchedule), inserts)
+            if updates:
+                session.execute(update(ClassSchedule), updates)
+            session.commit()
+            room_occupancy.invalidate(*touched_rooms)
+        except Exception as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to import schedules: {str(e)}"
+            )
+    
+    return ScheduleImportResponse(
+        written=written,
+        total=len(rows),
+        inserted=len(inserts) if written else 0,
+        updated=len(updates) if written else 0,
+        coursesCreated=len(new_courses) if written else 0,
+        errors=[ScheduleImportRowError(row=row, errors=errs) for row, errs in sorted(errors.items())]
+    )
+
+@router.post("/admin/schedules/bulk", response_model=ScheduleImportResponse)
+async def import_class_schedules(
+    rows: List[dict] = Body(...),
+    create_missing_courses: bool = False,
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Create or update many class schedules from a JSON array (admin only)"""
+    
+    # Check if user is admin
+    if current_user.role != UserRoles.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can import schedules"
+        )
+    
+    return import_schedule_rows(rows, session, create_missing_courses, skip_invalid, dry_run)
+
+@router.post("/admin/schedules/bulk/csv", response_model=ScheduleImportResponse)
+async def import_class_schedules_csv(
+    file: UploadFile = File(...),
+    create_missing_courses: bool = False,
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Create or update many class schedules from a CSV file (admin only)
+    
+    The header row must name the same fields as a single schedule request:
+    course_code, batch, semester, room, day, start_time, end_time, instructor.
+    """
+    
+    # Check if user is admin
+    if current_user.role != UserRoles.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can import schedules"
+        )
+    
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    
+    try:
+        rows = list(csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig")))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    
+    # Cells beyond the header land under a None key; they belong to no field
+    rows = [{key: value for key, value in row.items() if key} for row in rows]
+    return import_schedule_rows(rows, session, create_missing_courses, skip_invalid, dry_run)
+
 @router.get("/admin/schedules", response_model=List[ClassScheduleResponse])
 async def get_admin_schedules(
     session: Session = Depends(get_session),
@@ -303,6 +570,8 @@ async def update_class_schedule(
             detail="Schedule not found"
         )
     
+    old_room = schedule.room
+    
     # Update fields
     if schedule_data.course_code is not None:
         schedule.course_code = schedule_data.course_code
@@ -321,8 +590,25 @@ async def update_class_schedule(
     if schedule_data.instructor is not None:
         schedule.instructor = schedule_data.instructor
     
+    # Validate time range
+    if schedule.start_time and schedule.end_time and schedule.start_time >= schedule.end_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    
+    # Reject overlapping room, instructor or batch bookings
+    with session.no_autoflush:
+        conflicts = find_schedule_conflicts(session, schedule)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=describe_conflicts(conflicts)
+        )
+    
     session.add(schedule)
     session.commit()
+    room_occupancy.invalidate(old_room, schedule.room)
     
     return {"message": "Class schedule updated successfully"}
 
@@ -351,9 +637,204 @@ async def delete_class_schedule(
     
     session.delete(schedule)
     session.commit()
+    room_occupancy.invalidate(schedule.room)
     
     return {"message": "Class schedule deleted successfully"}
 
+@router.get("/admin/timetable/validate", response_model=TimetableValidationResponse)
+async def validate_timetable(
+    semester: Optional[str] = None,
+    batch: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Report every room, instructor and batch clash in the timetable (admin only)"""
+    
+    # Check if user is admin
+    if current_user.role != UserRoles.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can validate the timetable"
+        )
+    
+    query = select(ClassSchedule)
+    if semester:
+        query = query.where(ClassSchedule.semester == semester)
+    if batch:
+        query = query.where(ClassSchedule.batch == batch)
+    
+    schedules = session.exec(query).all()
+    conflicts = find_timetable_clashes(schedules)
+    
+    return TimetableValidationResponse(
+        valid=not conflicts,
+        totalSchedules=len(schedules),
+        conflicts=conflicts
+    )
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+@router.post("/admin/timetable/generate", response_model=TimetableGenerateResponse)
+def generate_timetable(
+    request: TimetableGenerateRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user_or_mock)
+):
+    """Generate a conflict-free weekly timetable for the given batches (admin only)
+    
+    Each course gets one weekly session per credit. Existing classes of the listed
+    courses of each batch are replaced in a single transaction, unless pinned; every
+    other class is kept fixed. A plain def, so the CPU-bound search runs in the
+    threadpool instead of blocking the event loop.
+    """
+    
+    # Check if user is admin
+    if current_user.role != UserRoles.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can generate timetables"
+        )
+    
+    try:
+        day_start = time_to_minutes(datetime.strptime(request.dayStart, "%H:%M").time())
+        day_end = time_to_minutes(datetime.strptime(request.dayEnd, "%H:%M").time())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid time format. Use HH:MM format"
+        )
+    if day_start >= day_end or request.slotMinutes <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Teaching day must be non-empty and slots must be positive"
+        )
+    
+    course_codes = {code for batch in request.batches for code in batch.courseCodes}
+    courses = {
+        course.course_code: course
+        for course in session.exec(select(Course).where(Course.course_code.in_(course_codes))).all()
+    }
+    missing_courses = sorted(course_codes - courses.keys())
+    if missing_courses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown courses: {', '.join(missing_courses)}"
+        )
+    
+    # Rooms and their availability windows
+    windows = defaultdict(lambda: defaultdict(list))
+    for slot in session.exec(select(RoomAvailabilitySlot)).all():
+        if slot.room and slot.day and slot.start_time and slot.end_time:
+            windows[slot.room][slot.day].append((time_to_minutes(slot.start_time), time_to_minutes(slot.end_time)))
+    rooms = [
+        RoomSpec(room=room.room, capacity=room.capacity or 0, windows=dict(windows.get(room.room, {})))
+        for room in session.exec(select(Room)).all()
+    ]
+    
+    # Existing classes are fixed unless they are of a course listed for their batch and not pinned
+    requested_courses = defaultdict(set)
+    for batch in request.batches:
+        requested_courses[batch.batch].update(batch.courseCodes)
+    pinned_ids = set(request.pinnedScheduleIds)
+    pinned, replaced_ids = [], []
+    pinned_sessions = defaultdict(int)
+    for schedule in session.exec(select(ClassSchedule)).all():
+        if schedule.course_code in requested_courses.get(schedule.batch, ()):
+            if schedule.id not in pinned_ids:
+                replaced_ids.append(schedule.id)
+                continue
+            pinned_sessions[(schedule.course_code, schedule.batch)] += 1
+        if schedule.day and schedule.start_time and schedule.end_time:
+            pinned.append(BusyInterval(
+                day=schedule.day,
+                start=time_to_minutes(schedule.start_time),
+                end=time_to_minutes(schedule.end_time),
+                room=schedule.room,
+                instructor=schedule.instructor,
+                batch=schedule.batch
+            ))
+    
+    offerings = []
+    for batch in request.batches:
+        for code in batch.courseCodes:
+            course = courses[code]
+            sessions = math.ceil(course.course_credits or 3) - pinned_sessions[(code, batch.batch)]
+            offerings.append(CourseOffering(
+                course_code=code,
+                batch=batch.batch,
+                semester=batch.semester,
+                instructor=course.instructor,
+                sessions=max(0, sessions),
+                size=batch.size
+            ))
+    
+    solver = TimetableSolver(
+        offerings, rooms, request.days,
+        day_start=day_start,
+        day_end=day_end,
+        slot_minutes=request.slotMinutes,
+        pinned=pinned
+    )
+    solution = solver.solve(request.timeBudgetSeconds)
+    
+    schedules = [
+        GeneratedSlot(
+            courseCode=p.course_code,
+            batch=p.batch,
+            semester=p.semester or "",
+            room=p.room,
+            day=p.day,
+            startTime=_format_minutes(p.start),
+            endTime=_format_minutes(p.end),
+            instructor=p.instructor
+        )
+        for p in solution.placements
+    ]
+    unplaced = [
+        UnplacedOffering(courseCode=o.course_code, batch=o.batch, sessions=o.sessions)
+        for o in solution.unplaced
+    ]
+    
+    if unplaced:
+        message = "No complete timetable found within the time budget; nothing was saved"
+    elif request.dryRun:
+        message = "Timetable generated (dry run, nothing was saved)"
+    else:
+        try:
+            if replaced_ids:
+                session.exec(delete(ClassSchedule).where(ClassSchedule.id.in_(replaced_ids)))
+            session.add_all([
+                ClassSchedule(
+                    course_code=p.course_code,
+                    batch=p.batch,
+                    semester=p.semester,
+                    room=p.room,
+                    day=p.day,
+                    start_time=time(p.start // 60, p.start % 60),
+                    end_time=time(p.end // 60, p.end % 60),
+                    instructor=p.instructor
+                )
+                for p in solution.placements
+            ])
+            session.commit()
+            room_occupancy.invalidate()
+        except Exception as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save timetable: {str(e)}"
+            )
+        message = f"Timetable generated with {len(schedules)} classes"
+    
+    return TimetableGenerateResponse(
+        written=not unplaced and not request.dryRun,
+        message=message,
+        solveSeconds=solution.elapsed_seconds,
+        schedules=schedules,
+        unplaced=unplaced
+    )
+
 # Helper endpoints
 @router.get("/schedules/rooms", response_model=List[str])
 async def get_schedule_rooms(session: Session = Depends(get_session)):
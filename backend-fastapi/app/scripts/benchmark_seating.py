@@ -0,0 +1,48 @@
+"""Benchmark the exam seating planner on a synthetic semester.
+
+Run from backend-fastapi/:
+    python -m app.scripts.benchmark_seating
+"""
+import argparse
+import random
+import time
+
+from app.utils.seating import SeatingRoom, SeatingStudent, plan_seating, same_batch_neighbours
+
+def build_semester(students: int, rooms: int, batches: int, seed: int):
+    rng = random.Random(seed)
+    # Batches of uneven size, like majors of different popularity
+    weights = [rng.uniform(0.5, 2.0) for _ in range(batches)]
+    seating_students = [
+        SeatingStudent(
+            student_id=f"s{i}",
+            roll_number=f"{i:05d}",
+            batch=f"B{rng.choices(range(batches), weights)[0]}"
+        )
+        for i in range(students)
+    ]
+    seating_rooms = [SeatingRoom(room=f"R{i}", capacity=rng.choice([40, 60, 80, 120])) for i in range(rooms)]
+    return seating_students, seating_rooms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=30)
+    parser.add_argument("--batches", type=int, default=6)
+    parser.add_argument("--seats-per-row", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    students, rooms = build_semester(args.students, args.rooms, args.batches, args.seed)
+    started = time.perf_counter()
+    plan = plan_seating(students, rooms, args.seats_per_row)
+    elapsed = time.perf_counter() - started
+
+    used = len({seat.room for seat in plan.seats})
+    print(f"{args.students} students, {args.batches} batches, {args.rooms} rooms ({sum(r.capacity for r in rooms)} seats)")
+    print(f"seated {len(plan.seats)} in {used} rooms, {len(plan.unseated)} unseated")
+    print(f"same-batch neighbours {same_batch_neighbours(plan.seats)}")
+    print(f"plan time {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
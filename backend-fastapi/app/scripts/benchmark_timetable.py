@@ -0,0 +1,57 @@
+"""Benchmark the timetable solver on a synthetic department.
+
+Run from backend-fastapi/:
+    python -m app.scripts.benchmark_timetable
+"""
+import argparse
+import random
+
+from app.utils.timetable_solver import CourseOffering, RoomSpec, TimetableSolver
+
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+
+def build_department(courses: int, rooms: int, instructors: int, batches: int, seed: int):
+    rng = random.Random(seed)
+    offerings = [
+        CourseOffering(
+            course_code=f"CSE{i:03d}",
+            batch=f"B{i % batches}",
+            instructor=f"inst{rng.randrange(instructors)}",
+            sessions=rng.choice([2, 3, 3, 3, 4]),
+            size=rng.choice([30, 40, 60, 80])
+        )
+        for i in range(courses)
+    ]
+    room_specs = []
+    for i in range(rooms):
+        # A third of the rooms are only open in the mornings
+        windows = {day: [(8 * 60, 13 * 60)] for day in DAYS} if i % 3 == 0 else {}
+        room_specs.append(RoomSpec(room=f"R{i}", capacity=rng.choice([40, 60, 80, 120]), windows=windows))
+    return offerings, room_specs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--rooms", type=int, default=60)
+    parser.add_argument("--instructors", type=int, default=60)
+    parser.add_argument("--batches", type=int, default=25)
+    parser.add_argument("--budget", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    offerings, rooms = build_department(args.courses, args.rooms, args.instructors, args.batches, args.seed)
+    solver = TimetableSolver(
+        offerings, rooms, DAYS,
+        day_start=8 * 60, day_end=17 * 60, slot_minutes=60,
+        seed=args.seed
+    )
+    solution = solver.solve(args.budget)
+
+    total = sum(o.sessions for o in offerings)
+    missing = sum(o.sessions for o in solution.unplaced)
+    print(f"{args.courses} courses, {args.rooms} rooms, {total} sessions")
+    print(f"placed {len(solution.placements)}/{total} sessions, {missing} unplaced")
+    print(f"solve time {solution.elapsed_seconds:.3f}s (budget {args.budget}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from calendar import monthrange
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+from sqlalchemy import and_, delete, insert, literal, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.equipment import Booking, BookingArchive, BookingSeries, BookingStatus
+from app.models.room import RoomBooking, RoomBookingArchive, RoomBookingSeries
+from app.utils.config import settings
+from app.utils.db import engine
+from app.utils.occupancy import room_occupancy
+
+CLOSED_BOOKING_STATUSES = [BookingStatus.completed, BookingStatus.rejected, BookingStatus.expired]
+CLOSED_ROOM_STATUSES = ["Completed", "Rejected", "Expired"]
+EXPIRED_REASON = "Expired before review"
+
+def months_before(day: date, months: int) -> date:
+    """The same day `months` calendar months earlier, clamped to the month's length"""
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    month += 1
+    return date(year, month, min(day.day, monthrange(year, month)[1]))
+
+def archive_cutoff(today: Optional[date] = None) -> date:
+    """Closed bookings that ended before this date belong in the archive tables"""
+    return months_before(today or date.today(), settings.booking_archive_months)
+
+def _set_status(session: Session, model, condition, **values) -> int:
+    result = session.execute(
+        update(model).where(*condition).values(**values).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def close_past_bookings(session: Session, now: datetime) -> Dict[str, int]:
+    """Complete approved bookings that have ended and expire pending ones that have started"""
+    today, clock = now.date(), now.time()
+    room_ended = or_(
+        RoomBooking.booking_date < today,
+        and_(RoomBooking.booking_date == today, RoomBooking.end_time <= clock)
+    )
+    room_started = or_(
+        RoomBooking.booking_date < today,
+        and_(RoomBooking.booking_date == today, RoomBooking.start_time <= clock)
+    )
+
+    counts = {
+        "equipment_completed": _set_status(
+            session, Booking,
+            [Booking.status == BookingStatus.approved, Booking.end_time <= now],
+            status=BookingStatus.completed, updated_at=now
+        ),
+        "equipment_expired": _set_status(
+            session, Booking,
+            [Booking.status == BookingStatus.pending, Booking.start_time <= now],
+            status=BookingStatus.expired, rejection_reason=EXPIRED_REASON, updated_at=now
+        ),
+        "room_completed": _set_status(
+            session, RoomBooking,
+            [RoomBooking.status == "Approved", room_ended],
+            status="Completed"
+        ),
+        "room_expired": _set_status(
+            session, RoomBooking,
+            [RoomBooking.status == "Pending", room_started],
+            status="Expired", rejection_reason=EXPIRED_REASON
+        ),
+    }
+
+    # A series is only over once its last occurrence has passed
+    counts["equipment_series_completed"] = _set_status(
+        session, BookingSeries,
+        [BookingSeries.status == BookingStatus.approved, BookingSeries.until < today],
+        status=BookingStatus.completed, updated_at=now
+    )
+    counts["equipment_series_expired"] = _set_status(
+        session, BookingSeries,
+        [BookingSeries.status == BookingStatus.pending, BookingSeries.until < today],
+        status=BookingStatus.expired, updated_at=now
+    )
+    counts["room_series_completed"] = _set_status(
+        session, RoomBookingSeries,
+        [RoomBookingSeries.status == "Approved", RoomBookingSeries.until < today],
+        status="Completed"
+    )
+    counts["room_series_expired"] = _set_status(
+        session, RoomBookingSeries,
+        [RoomBookingSeries.status == "Pending", RoomBookingSeries.until < today],
+        status="Expired", rejection_reason=EXPIRED_REASON
+    )
+    session.commit()
+
+    if counts["room_completed"]:
+        room_occupancy.invalidate_bookings(today)
+    return counts
+
+def _archive(session: Session, model, archive_model, condition, archived_at: datetime) -> int:
+    """Copy matching rows into the archive table, then delete exactly the rows that were copied"""
+    columns = [column.name for column in model.__table__.columns]
+    session.execute(
+        insert(archive_model).from_select(
+            columns + ["archived_at"],
+            select(*[model.__table__.c[name] for name in columns], literal(archived_at)).where(*condition)
+        )
+    )
+    copied = select(archive_model.id).where(archive_model.archived_at == archived_at)
+    result = session.execute(
+        delete(model).where(model.id.in_(copied)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def archive_closed_bookings(session: Session, today: date) -> Optional[Dict[str, int]]:
+    """Move closed bookings older than the archive cutoff out of the live tables.
+
+    Both moves run in one transaction. When another worker archives the same rows
+    first, the copy hits the archive primary key and this run returns None.
+    """
+    cutoff = archive_cutoff(today)
+    archived_at = datetime.now()
+    try:
+        counts = {
+            "equipment_archived": _archive(
+                session, Booking, BookingArchive,
+                [Booking.status.in_(CLOSED_BOOKING_STATUSES), Booking.end_time < datetime.combine(cutoff, time.min)],
+                archived_at
+            ),
+            "room_archived": _archive(
+                session, RoomBooking, RoomBookingArchive,
+                [RoomBooking.status.in_(CLOSED_ROOM_STATUSES), RoomBooking.booking_date < cutoff],
+                archived_at
+            ),
+        }
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+    return counts
+
+def sweep_bookings(session: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Close past bookings, then archive the old closed ones; returns the rows touched per step.
+
+    Utilization rollups need no refresh: completed bookings count as used just like
+    approved ones, expired requests never did, and archiving leaves rollups alone.
+    """
+    now = now or datetime.now()
+    counts = close_past_bookings(session, now)
+    counts.update(archive_closed_bookings(session, now.date()) or {})
+    return counts
+
+def run_booking_sweep():
+    """Entry point for the periodic job, using its own session"""
+    with Session(engine) as session:
+        counts = sweep_bookings(session)
+        changed = {step: count for step, count in counts.items() if count}
+        if changed:
+            print(f"Booking sweep: {changed}")
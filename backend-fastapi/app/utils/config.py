@@ -5,8 +5,12 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    overdue_sweep_interval_seconds: int = 3600
+    booking_sweep_interval_seconds: int = 900
+    booking_archive_months: int = 6
+    assignment_submission_max_bytes: int = 25 * 1024 * 1024
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
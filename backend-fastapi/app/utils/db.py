@@ -7,17 +7,18 @@ from app.utils.config import settings
 from app.models.user import User, FacultyProfile, StudentProfile, StaffProfile, UserEducation, UserPublication
 from app.models.program import Program
 from app.models.course import Course, CourseMaterial
-from app.models.assignment import Assignment, AssignmentSubmission
+from app.models.assignment import Assignment, AssignmentSubmission, AssignmentSubmissionFile
 from app.models.class_schedule import ClassSchedule
-from app.models.equipment import LabEquipment, Booking
+from app.models.equipment import LabEquipment, Booking, BookingArchive, BookingSeries
 from app.models.event import Event, EventCategoryEnum
-from app.models.exam import ExamTimeTable
-from app.models.fee import Fee, FeePayment, StudentFee, StripePaymentIntent
-from app.models.grades import Grade
+from app.models.exam import ExamTimeTable, ExamSeat
+from app.models.fee import Fee, FeePayment, StudentFee, StripePaymentIntent, FeeSweepRun
+from app.models.grades import Grade, SemesterGPA, MeritList, MeritRank
 from app.models.meeting import Meeting
 from app.models.project import Project, ProjectTeamMember
 from app.models.research import ResearchPaper, ResearchPaperAuthor
-from app.models.room import Room, RoomAvailabilitySlot, RoomBooking
+from app.models.room import Room, RoomAvailabilitySlot, RoomBooking, RoomBookingArchive, RoomBookingSeries
+from app.models.utilization import UtilizationRollup
 from app.models.all_models import AcademicResource, Announcement, Notice, ContactDepartment, ContactInfo, Award
 
 db_url = settings.database_url
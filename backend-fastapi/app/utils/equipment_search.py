@@ -0,0 +1,103 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_
+from sqlmodel import Session, select
+
+from app.models.equipment import EquipmentCategory, EquipmentStatus, LabEquipment
+from app.utils.text_search import InvertedIndex, facet_value, prefix_tsquery, tokenize
+
+# Field weights, mirroring the A/B/C weights of the Postgres search_vector column
+FIELD_WEIGHTS = {"name": 3.0, "location": 2.0, "description": 1.0}
+
+class EquipmentSearchIndex(InvertedIndex):
+    """In-memory inverted index over the equipment catalogue; facets are (category, status, location)"""
+
+    @staticmethod
+    def document(equipment: LabEquipment):
+        return (
+            equipment.id,
+            [(getattr(equipment, field), weight) for field, weight in FIELD_WEIGHTS.items()],
+            (facet_value(equipment.category), facet_value(equipment.status), equipment.location or "")
+        )
+
+    def load(self, session: Session):
+        for equipment in session.exec(select(LabEquipment)).all():
+            yield self.document(equipment)
+
+    def update(self, equipment: LabEquipment):
+        """Re-index one equipment after it was created or changed"""
+        self.put(*self.document(equipment))
+
+equipment_index = EquipmentSearchIndex()
+
+def search_equipment(
+    session: Session,
+    text: str,
+    category: Optional[EquipmentCategory] = None,
+    status: Optional[EquipmentStatus] = None,
+    location: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> Tuple[List[LabEquipment], int, Dict[str, Dict[str, int]]]:
+    """Ranked equipments matching `text` as type-ahead prefixes.
+
+    Returns the requested page, the total after all filters, and category and
+    status facet counts over the text and location matches.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_postgres(session, text, category, status, location, limit, offset)
+
+    facets = {"category": defaultdict(int), "status": defaultdict(int)}
+    ranked = []
+    for equipment_id, _, (equipment_category, equipment_status, equipment_location) in equipment_index.search(session, text):
+        if location and location.lower() not in equipment_location.lower():
+            continue
+        facets["category"][equipment_category] += 1
+        facets["status"][equipment_status] += 1
+        if category and equipment_category != category.value:
+            continue
+        if status and equipment_status != status.value:
+            continue
+        ranked.append(equipment_id)
+
+    page = ranked[offset:offset + limit if limit is not None else None]
+    equipments = {e.id: e for e in session.exec(select(LabEquipment).where(LabEquipment.id.in_(page))).all()} if page else {}
+    return [equipments[i] for i in page if i in equipments], len(ranked), {k: dict(v) for k, v in facets.items()}
+
+def _search_postgres(session, text, category, status, location, limit, offset):
+    terms = tokenize(text)
+    if not terms:
+        return [], 0, {"category": {}, "status": {}}
+
+    # Generated, GIN-indexed column added by the migration and the create_all hook
+    vector = literal_column("labequipment.search_vector")
+    query = prefix_tsquery(terms)
+    matched = or_(vector.op("@@")(query), LabEquipment.name.op("%")(text))
+    rank = func.ts_rank(vector, query) + func.similarity(LabEquipment.name, text)
+
+    filters = [matched]
+    if location:
+        filters.append(LabEquipment.location.contains(location))
+
+    # Facets and the filtered total from one grouped query
+    facets = {"category": defaultdict(int), "status": defaultdict(int)}
+    total = 0
+    for equipment_category, equipment_status, count in session.exec(
+        select(LabEquipment.category, LabEquipment.status, func.count())
+        .where(*filters)
+        .group_by(LabEquipment.category, LabEquipment.status)
+    ).all():
+        facets["category"][facet_value(equipment_category)] += count
+        facets["status"][facet_value(equipment_status)] += count
+        if (not category or equipment_category == category) and (not status or equipment_status == status):
+            total += count
+
+    if category:
+        filters.append(LabEquipment.category == category)
+    if status:
+        filters.append(LabEquipment.status == status)
+    page_query = select(LabEquipment).where(*filters).order_by(rank.desc(), LabEquipment.name).offset(offset)
+    if limit is not None:
+        page_query = page_query.limit(limit)
+    return session.exec(page_query).all(), total, {k: dict(v) for k, v in facets.items()}
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlmodel import Session, select, or_
+
+from app.models.exam import ExamTimeTable
+from app.utils.intervals import IntervalIndex, find_overlaps
+
+# An exam clashes with another if their sittings overlap and they share any of these
+EXAM_CONFLICT_DIMENSIONS = ("room", "invigilator", "semester")
+
+# `duration` is a time of day, so no exam runs for a full day or longer
+MAX_EXAM_DURATION = timedelta(days=1)
+
+class ExamConflict(BaseModel):
+    dimension: str  # room, invigilator or semester
+    value: str
+    exam_id: Optional[str] = None
+    course_code: Optional[str] = None
+    start: str
+    end: str
+    conflicting_exam_id: Optional[str] = None
+    conflicting_course_code: Optional[str] = None
+    conflicting_start: str
+    conflicting_end: str
+
+def exam_interval(exam: ExamTimeTable) -> Optional[Tuple[datetime, datetime]]:
+    """The [start, end) sitting of an exam, from its schedule and duration"""
+    if not exam.exam_schedule or not exam.duration:
+        return None
+    length = timedelta(hours=exam.duration.hour, minutes=exam.duration.minute, seconds=exam.duration.second)
+    if not length:
+        return None
+    return exam.exam_schedule, exam.exam_schedule + length
+
+def _format(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M")
+
+def _conflict(dimension: str, exam: ExamTimeTable, other: ExamTimeTable) -> ExamConflict:
+    start, end = exam_interval(exam)
+    other_start, other_end = exam_interval(other)
+    return ExamConflict(
+        dimension=dimension,
+        value=getattr(exam, dimension),
+        exam_id=exam.id,
+        course_code=exam.course_code,
+        start=_format(start),
+        end=_format(end),
+        conflicting_exam_id=other.id,
+        conflicting_course_code=other.course_code,
+        conflicting_start=_format(other_start),
+        conflicting_end=_format(other_end)
+    )
+
+def _minutes(value: datetime, origin: datetime) -> int:
+    return int((value - origin).total_seconds() // 60)
+
+class ExamConflictIndex:
+    """In-memory per-(room|invigilator|semester) interval index of exam sittings.
+
+    Intervals are stored as minutes from `origin`, so any fixed instant works as
+    long as every exam in the index uses the same one.
+    """
+
+    def __init__(self, exams: Iterable[ExamTimeTable] = (), origin: datetime = datetime(2000, 1, 1)):
+        self.origin = origin
+        self._index = IntervalIndex()
+        for exam in exams:
+            self.add(exam)
+
+    def _entries(self, exam: ExamTimeTable):
+        interval = exam_interval(exam)
+        if not interval:
+            return
+        start, end = _minutes(interval[0], self.origin), _minutes(interval[1], self.origin)
+        for dimension in EXAM_CONFLICT_DIMENSIONS:
+            value = getattr(exam, dimension)
+            if value:
+                yield dimension, (dimension, value), start, end
+
+    def add(self, exam: ExamTimeTable):
+        for _, key, start, end in self._entries(exam):
+            self._index.add(key, start, end, exam)
+
+    def remove(self, exam: ExamTimeTable):
+        for _, key, start, end in self._entries(exam):
+            self._index.remove(key, start, end, exam)
+
+    def find_conflicts(self, exam: ExamTimeTable) -> List[ExamConflict]:
+        return [
+            _conflict(dimension, exam, other)
+            for dimension, key, start, end in self._entries(exam)
+            for other in self._index.overlapping(key, start, end)
+            if other is not exam and other.id != exam.id
+        ]
+
+def find_exam_conflicts(session: Session, exam: ExamTimeTable) -> List[ExamConflict]:
+    """Find existing exams that overlap `exam` in room, invigilator or semester.
+
+    One range probe over the (<dimension>, exam_schedule) indexes loads the
+    candidates, which are checked against the exam's exact sitting; `exam`
+    itself is excluded when it already has an id.
+    """
+    interval = exam_interval(exam)
+    dimensions = [d for d in EXAM_CONFLICT_DIMENSIONS if getattr(exam, d)]
+    if not interval or not dimensions:
+        return []
+
+    start, end = interval
+    query = select(ExamTimeTable).where(
+        ExamTimeTable.exam_schedule > start - MAX_EXAM_DURATION,
+        ExamTimeTable.exam_schedule < end,
+        or_(*[getattr(ExamTimeTable, d) == getattr(exam, d) for d in dimensions])
+    )
+    if exam.id is not None:
+        query = query.where(ExamTimeTable.id != exam.id)
+
+    index = ExamConflictIndex(session.exec(query).all(), origin=start - MAX_EXAM_DURATION)
+    return index.find_conflicts(exam)
+
+def overlapping_exams(session: Session, exam: ExamTimeTable) -> List[ExamTimeTable]:
+    """Other exams whose sittings overlap `exam`, whatever they share"""
+    interval = exam_interval(exam)
+    if not interval:
+        return []
+    start, end = interval
+    candidates = session.exec(
+        select(ExamTimeTable).where(
+            ExamTimeTable.exam_schedule > start - MAX_EXAM_DURATION,
+            ExamTimeTable.exam_schedule < end,
+            ExamTimeTable.id != exam.id
+        )
+    ).all()
+    return [
+        other for other in candidates
+        if (other_interval := exam_interval(other)) and other_interval[0] < end and other_interval[1] > start
+    ]
+
+def find_exam_timetable_clashes(exams: Iterable[ExamTimeTable]) -> List[ExamConflict]:
+    """Find every clash in an exam timetable with one sweep-line pass"""
+    entries = []
+    for exam in exams:
+        interval = exam_interval(exam)
+        if not interval:
+            continue
+        for dimension in EXAM_CONFLICT_DIMENSIONS:
+            value = getattr(exam, dimension)
+            if value:
+                entries.append(((dimension, value), interval[0], interval[1], exam))
+    return [
+        _conflict(dimension, later, earlier)
+        for (dimension, _), earlier, later in find_overlaps(entries)
+    ]
+
+def describe_exam_conflicts(conflicts: List[ExamConflict]) -> str:
+    """Human readable summary used as the HTTP error detail"""
+    parts = []
+    for c in conflicts:
+        other = c.conflicting_course_code or f"exam {c.conflicting_exam_id}"
+        parts.append(
+            f"{c.dimension} {c.value} already has an exam "
+            f"from {c.conflicting_start} to {c.conflicting_end} ({other})"
+        )
+    return "Exam conflict: " + "; ".join(parts)
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.fee import Fee, StudentFee, FeeStatusEnum, FeeSweepRun
+from app.utils.db import engine
+from app.utils.locks import locked_row
+
+def _watermark_id(session: Session, today: date) -> int:
+    """Id of today's watermark row, inserting it if this is the first sweep of the day"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        session.execute(
+            insert(FeeSweepRun)
+            .values(swept_through=today, marked_overdue=0, started_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=["swept_through"])
+        )
+    else:
+        try:
+            with session.begin_nested():
+                session.add(FeeSweepRun(swept_through=today))
+        except IntegrityError:
+            pass
+    session.commit()
+    return session.exec(select(FeeSweepRun.id).where(FeeSweepRun.swept_through == today)).one()
+
+def sync_overdue_status(
+    session: Session,
+    fee_ids: Optional[Iterable[str]] = None,
+    today: Optional[date] = None
+) -> Tuple[int, int]:
+    """Bring the pending/overdue status of student fees in line with their fee deadlines.
+
+    Pending fees past their deadline become overdue and overdue fees whose
+    deadline moved back into the future return to pending. Limited to
+    `fee_ids` when given. Does not commit; returns (marked overdue, cleared).
+    """
+    today = today or date.today()
+    counts = []
+    for from_status, to_status, deadline_filter in (
+        (FeeStatusEnum.pending, FeeStatusEnum.overdue, Fee.deadline < today),
+        (FeeStatusEnum.overdue, FeeStatusEnum.pending, Fee.deadline >= today),
+    ):
+        fees = select(Fee.id).where(deadline_filter)
+        if fee_ids is not None:
+            fees = fees.where(Fee.id.in_(fee_ids))
+        result = session.execute(
+            update(StudentFee)
+            .where(StudentFee.status == from_status, StudentFee.fee_id.in_(fees))
+            .values(status=to_status, updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        counts.append(result.rowcount)
+    return counts[0], counts[1]
+
+def sweep_overdue_fees(session: Session, today: Optional[date] = None) -> FeeSweepRun:
+    """Flip pending student fees past their deadline to overdue, and back if a deadline moved later.
+
+    Each day has one watermark row. A sweep holds its row lock while it
+    updates, so concurrent workers sweep one after another rather than twice
+    at once, and a day can be swept again to pick up deadlines that passed
+    since its last sweep. `marked_overdue` totals the day's sweeps.
+    """
+    today = today or date.today()
+    run_id = _watermark_id(session, today)
+    with locked_row(session, FeeSweepRun, run_id) as run:
+        marked, _ = sync_overdue_status(session, today=today)
+        run.marked_overdue += marked
+        run.finished_at = datetime.now()
+        session.commit()
+    session.refresh(run)
+    return run
+
+def run_overdue_fee_sweep():
+    """Entry point for the periodic job, using its own session"""
+    with Session(engine) as session:
+        run = sweep_overdue_fees(session)
+        print(f"Overdue fee sweep through {run.swept_through}: {run.marked_overdue} fees marked overdue today")
@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, func, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models.course import Course, CourseSemester
+from app.models.grades import Grade, SemesterGPA, SemesterGPAResponse, StudentGPAResponse
+from app.models.user import StudentProfile
+from app.utils.locks import lock_rows
+from app.utils.merit import invalidate_merit_lists
+
+# UGC uniform grading: (lowest total marks, grade point, letter grade), best first
+GRADE_SCALE: List[Tuple[float, float, str]] = [
+    (80, 4.00, "A+"),
+    (75, 3.75, "A"),
+    (70, 3.50, "A-"),
+    (65, 3.25, "B+"),
+    (60, 3.00, "B"),
+    (55, 2.75, "B-"),
+    (50, 2.50, "C+"),
+    (45, 2.25, "C"),
+    (40, 2.00, "D"),
+    (0, 0.00, "F"),
+]
+
+SEMESTER_ORDER = {semester.value: position for position, semester in enumerate(CourseSemester)}
+
+GPAKey = Tuple[str, str]  # (student id, semester)
+
+def marks_to_point(total_marks: Optional[float]) -> Optional[float]:
+    if total_marks is None:
+        return None
+    return next(point for lowest, point, _ in GRADE_SCALE if total_marks >= lowest)
+
+def point_to_letter(point: Optional[float]) -> Optional[str]:
+    if point is None:
+        return None
+    return next((letter for _, scale_point, letter in GRADE_SCALE if point >= scale_point), "F")
+
+def grade_point(grade: Grade) -> Optional[float]:
+    """The grade point of a Grade row: its `grade` if set, otherwise from its total marks"""
+    return grade.grade if grade.grade is not None else marks_to_point(grade.total_marks)
+
+def grade_point_column():
+    """SQL expression of `grade_point` over the Grade table; NULL for ungraded rows"""
+    from_marks = case(
+        *[(Grade.total_marks >= lowest, point) for lowest, point, _ in GRADE_SCALE],
+        else_=None
+    )
+    return func.coalesce(Grade.grade, from_marks)
+
+def semester_sort_key(semester: str):
+    return (SEMESTER_ORDER.get(semester, len(SEMESTER_ORDER)), semester)
+
+def weighted_gpa(quality_points: float, credits: float) -> Optional[float]:
+    return round(quality_points / credits, 2) if credits else None
+
+def _upsert_semester_gpas(session: Session, rows: List[dict]):
+    """Insert SemesterGPA rows, overwriting the figures of (student, semester) rows that already exist"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(SemesterGPA)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["student_id", "semester"],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("credits", "quality_points", "gpa", "updated_at")
+                }
+            ),
+            rows
+        )
+        return
+    session.execute(
+        delete(SemesterGPA).where(
+            tuple_(SemesterGPA.student_id, SemesterGPA.semester).in_(
+                [(row["student_id"], row["semester"]) for row in rows]
+            )
+        )
+    )
+    session.execute(SemesterGPA.__table__.insert(), rows)
+
+def refresh_gpas(session: Session, keys: Optional[Iterable[GPAKey]] = None) -> Tuple[int, int]:
+    """Recompute the SemesterGPA rows of (student, semester) `keys`, then the CGPA of those students.
+
+    With no keys every student is recomputed; either way it is one grouped
+    query over Grade x Course for the semesters, one over SemesterGPA for the
+    CGPAs and executemany writes. Ungraded rows and courses without credits
+    do not count, and merit lists the change can affect are dropped. Does not
+    commit, so grade writes and their GPAs land in the caller's transaction.
+
+    The students' profiles are locked first, so concurrent grade writes for
+    the same student refresh one after another and each aggregate sees the
+    grades the other committed. Returns (students, semesters) written.
+    """
+    keys = set(keys) if keys is not None else None
+    if keys is not None and not keys:
+        return 0, 0
+    students: Optional[Set[str]] = {student_id for student_id, _ in keys} if keys is not None else None
+    lock_rows(session, StudentProfile, StudentProfile.user_id, students)
+
+    point = grade_point_column()
+    credits = func.coalesce(Course.course_credits, 0)
+    query = (
+        select(Grade.student_id, Grade.semester, func.sum(credits), func.sum(point * credits))
+        .join(Course, Course.course_code == Grade.course_code)
+        .where(point.is_not(None), Grade.student_id.is_not(None), Grade.semester.is_not(None))
+        .group_by(Grade.student_id, Grade.semester)
+    )
+    if keys is not None:
+        query = query.where(tuple_(Grade.student_id, Grade.semester).in_(keys))
+
+    now = datetime.now()
+    rows = [
+        {
+            "student_id": student_id,
+            "semester": semester,
+            "credits": semester_credits,
+            "quality_points": quality_points,
+            "gpa": weighted_gpa(quality_points, semester_credits),
+            "updated_at": now
+        }
+        for student_id, semester, semester_credits, quality_points in session.exec(query).all()
+        if semester_credits
+    ]
+
+    # Semesters left without graded credits lose their row; the rest are upserted
+    if keys is None:
+        session.execute(delete(SemesterGPA))
+    else:
+        emptied = keys - {(row["student_id"], row["semester"]) for row in rows}
+        if emptied:
+            session.execute(
+                delete(SemesterGPA).where(tuple_(SemesterGPA.student_id, SemesterGPA.semester).in_(emptied))
+            )
+    if rows:
+        _upsert_semester_gpas(session, rows)
+
+    totals = select(
+        SemesterGPA.student_id, func.sum(SemesterGPA.credits), func.sum(SemesterGPA.quality_points)
+    ).group_by(SemesterGPA.student_id)
+    profiles = select(StudentProfile.id, StudentProfile.user_id)
+    if students is not None:
+        totals = totals.where(SemesterGPA.student_id.in_(students))
+        profiles = profiles.where(StudentProfile.user_id.in_(students))
+    cgpas = {
+        student_id: weighted_gpa(quality_points, total_credits)
+        for student_id, total_credits, quality_points in session.exec(totals).all()
+    }
+    updates = [
+        {"id": profile_id, "cgpa": cgpas.get(user_id)}
+        for profile_id, user_id in session.exec(profiles).all()
+    ]
+    if updates:
+        session.execute(update(StudentProfile), updates)
+    invalidate_merit_lists(session, keys)
+    return len(students if students is not None else cgpas), len(rows)
+
+def grade_keys(*grades: Optional[Grade]) -> Set[GPAKey]:
+    """The (student, semester) keys touched by writing these grades, skipping incomplete ones"""
+    return {
+        (grade.student_id, grade.semester)
+        for grade in grades
+        if grade is not None and grade.student_id and grade.semester
+    }
+
+def student_gpa(session: Session, student_id: str) -> StudentGPAResponse:
+    semesters = sorted(
+        session.exec(select(SemesterGPA).where(SemesterGPA.student_id == student_id)).all(),
+        key=lambda row: semester_sort_key(row.semester)
+    )
+    total_credits = sum(row.credits for row in semesters)
+    return StudentGPAResponse(
+        student_id=student_id,
+        semesters=[SemesterGPAResponse(semester=row.semester, credits=row.credits, gpa=row.gpa) for row in semesters],
+        credits=total_credits,
+        cgpa=weighted_gpa(sum(row.quality_points for row in semesters), total_credits)
+    )
@@ -0,0 +1,164 @@
+import statistics
+import threading
+import time as clock
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.grades import Grade, GradeStatisticsResponse, HistogramBin
+from app.utils.gpa import GRADE_SCALE, grade_point_column, point_to_letter
+
+BIN_WIDTH = 10
+MAX_MARKS = 100
+BINS = MAX_MARKS // BIN_WIDTH
+
+CourseKey = Tuple[str, str]  # (course code, semester)
+
+def _bin(total_marks: float) -> int:
+    # Marks of 100 (or above) fall in the last bin
+    return min(max(int(total_marks // BIN_WIDTH), 0), BINS - 1)
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+def _finish(
+    course_code: str,
+    semester: str,
+    summary: Dict[str, Optional[float]],
+    bins: Dict[int, int],
+    points: Dict[float, int]
+) -> GradeStatisticsResponse:
+    letters = {letter: 0 for _, _, letter in GRADE_SCALE}
+    graded = 0
+    weighted = 0.0
+    for point, count in points.items():
+        letters[point_to_letter(point)] += count
+        graded += count
+        weighted += point * count
+    return GradeStatisticsResponse(
+        course_code=course_code,
+        semester=semester,
+        count=int(summary["count"] or 0),
+        mean=_round(summary["mean"]),
+        median=_round(summary["median"]),
+        std_dev=_round(summary["std_dev"]),
+        min=summary["min"],
+        max=summary["max"],
+        mean_grade_point=_round(weighted / graded) if graded else None,
+        histogram=[
+            HistogramBin(lower=i * BIN_WIDTH, upper=(i + 1) * BIN_WIDTH, count=bins.get(i, 0))
+            for i in range(BINS)
+        ],
+        letter_grades=letters,
+        computed_at=datetime.now()
+    )
+
+def _compute_postgres(session: Session, course_code: str, semester: str) -> GradeStatisticsResponse:
+    """Summary statistics from one aggregate query, histogram and letters from one GROUP BY"""
+    filters = [Grade.course_code == course_code, Grade.semester == semester]
+    count, mean, median, std_dev, lowest, highest = session.exec(
+        select(
+            func.count(Grade.total_marks),
+            func.avg(Grade.total_marks),
+            func.percentile_cont(0.5).within_group(Grade.total_marks),
+            func.stddev_pop(Grade.total_marks),
+            func.min(Grade.total_marks),
+            func.max(Grade.total_marks)
+        ).where(*filters)
+    ).one()
+
+    # Grouped through a subquery so GROUP BY names columns rather than repeating bound expressions
+    graded = select(
+        func.least(func.floor(Grade.total_marks / BIN_WIDTH), BINS - 1).label("bin"),
+        grade_point_column().label("point")
+    ).where(*filters).subquery()
+    bins = defaultdict(int)
+    points = defaultdict(int)
+    for bin_index, grade_point, rows in session.exec(
+        select(graded.c.bin, graded.c.point, func.count()).group_by(graded.c.bin, graded.c.point)
+    ).all():
+        if bin_index is not None:
+            bins[max(int(bin_index), 0)] += rows
+        if grade_point is not None:
+            points[float(grade_point)] += rows
+    summary = {
+        "count": count,
+        "mean": float(mean) if mean is not None else None,
+        "median": float(median) if median is not None else None,
+        "std_dev": float(std_dev) if std_dev is not None else None,
+        "min": lowest,
+        "max": highest
+    }
+    return _finish(course_code, semester, summary, bins, points)
+
+def _compute_in_memory(session: Session, course_code: str, semester: str) -> GradeStatisticsResponse:
+    """Statistics over one fetch of the marks and grade-point columns, for databases without percentile_cont"""
+    rows = session.exec(
+        select(Grade.total_marks, grade_point_column())
+        .where(Grade.course_code == course_code, Grade.semester == semester)
+    ).all()
+    marks = [total_marks for total_marks, _ in rows if total_marks is not None]
+    bins = defaultdict(int)
+    for total_marks in marks:
+        bins[_bin(total_marks)] += 1
+    points = defaultdict(int)
+    for _, grade_point in rows:
+        if grade_point is not None:
+            points[float(grade_point)] += 1
+    summary = {
+        "count": len(marks),
+        "mean": statistics.fmean(marks) if marks else None,
+        "median": statistics.median(marks) if marks else None,
+        "std_dev": statistics.pstdev(marks) if marks else None,
+        "min": min(marks) if marks else None,
+        "max": max(marks) if marks else None
+    }
+    return _finish(course_code, semester, summary, bins, points)
+
+def compute_grade_statistics(session: Session, course_code: str, semester: str) -> GradeStatisticsResponse:
+    if session.get_bind().dialect.name == "postgresql":
+        return _compute_postgres(session, course_code, semester)
+    return _compute_in_memory(session, course_code, semester)
+
+class GradeStatisticsCache:
+    """Per-(course, semester) grade statistics, computed on first request.
+
+    Grade writers call `invalidate` with the (course, semester) pairs they
+    touched. The cache lives in the process, so entries also expire after
+    `max_age_seconds` to pick up other workers' writes.
+    """
+
+    def __init__(self, max_age_seconds: int = 300):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[CourseKey, Tuple[float, GradeStatisticsResponse]] = {}
+        self._generation = 0  # bumped by every invalidate
+
+    def invalidate(self, *keys: CourseKey):
+        """Drop the statistics of (course, semester) pairs, or all of them when called without pairs"""
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get(self, session: Session, course_code: str, semester: str) -> GradeStatisticsResponse:
+        key = (course_code, semester)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and clock.monotonic() - entry[0] <= self.max_age_seconds:
+                return entry[1]
+            generation = self._generation
+        # Computed outside the lock; it is not cached if grades were invalidated meanwhile
+        started = clock.monotonic()
+        result = compute_grade_statistics(session, course_code, semester)
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = (started, result)
+        return result
+
+grade_statistics = GradeStatisticsCache()
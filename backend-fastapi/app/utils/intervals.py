@@ -0,0 +1,72 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import time
+from typing import Any, Hashable, Iterable, List, Tuple
+
+def time_to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+class IntervalIndex:
+    """Per-key lists of [start, end) intervals kept sorted by start.
+
+    Overlap probes bisect to the last interval starting before the probe ends
+    and walk back only as far as the longest interval under that key, so they
+    cost O(log n + k) and still work when stored intervals overlap each other.
+    """
+
+    def __init__(self):
+        self._starts = defaultdict(list)
+        self._intervals = defaultdict(list)
+        self._longest = defaultdict(int)
+
+    def add(self, key: Hashable, start: int, end: int, item: Any):
+        i = bisect_right(self._starts[key], start)
+        self._starts[key].insert(i, start)
+        self._intervals[key].insert(i, (start, end, item))
+        self._longest[key] = max(self._longest[key], end - start)
+
+    def remove(self, key: Hashable, start: int, end: int, item: Any):
+        starts, intervals = self._starts[key], self._intervals[key]
+        i = bisect_left(starts, start)
+        while i < len(starts) and starts[i] == start:
+            if intervals[i][2] is item:
+                del starts[i]
+                del intervals[i]
+                return
+            i += 1
+
+    def overlapping(self, key: Hashable, start: int, end: int) -> List[Any]:
+        starts, intervals = self._starts.get(key), self._intervals.get(key)
+        if not starts:
+            return []
+        floor = start - self._longest[key]
+        found = []
+        j = bisect_left(starts, end) - 1
+        while j >= 0 and starts[j] > floor:
+            if intervals[j][1] > start:
+                found.append(intervals[j][2])
+            j -= 1
+        return found
+
+def find_overlaps(entries: Iterable[Tuple[Hashable, Any, Any, Any]]) -> List[Tuple[Hashable, Any, Any]]:
+    """Find every overlapping pair of intervals sharing a key with a sweep line.
+
+    `entries` are (key, start, end, item) tuples with half-open [start, end)
+    intervals. Returns (key, earlier_item, later_item) for each clash.
+    """
+    buckets = defaultdict(list)
+    for key, start, end, item in entries:
+        buckets[key].append((start, end, item))
+
+    overlaps = []
+    for key, intervals in buckets.items():
+        intervals.sort(key=lambda interval: (interval[0], interval[1]))
+        active = []  # min-heap of (end, seq, item) still open at the sweep position
+        for seq, (start, end, item) in enumerate(intervals):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for _, _, open_item in active:
+                overlaps.append((key, open_item, item))
+            heapq.heappush(active, (end, seq, item))
+    return overlaps
@@ -0,0 +1,13 @@
+import asyncio
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+async def run_periodically(job: Callable[[], object], interval_seconds: int):
+    """Run a blocking job in the threadpool every `interval_seconds` until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(job)
+        except Exception as e:
+            print(f"Periodic job {job.__name__} failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,40 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterable, Optional, Type
+
+from sqlalchemy import inspect
+from sqlmodel import Session, SQLModel, select
+
+_process_locks = defaultdict(threading.Lock)
+
+@contextmanager
+def locked_row(session: Session, model: Type[SQLModel], key: Any):
+    """Lock one row exclusively and yield it (or None if it does not exist).
+
+    Uses SELECT ... FOR UPDATE, which holds the lock until the transaction ends.
+    SQLite has no row locks, so there a process-wide lock keyed by table and
+    primary key is held until the block exits; callers should commit inside it.
+    """
+    primary_key = inspect(model).primary_key[0]
+    statement = select(model).where(primary_key == key).with_for_update()
+    if session.get_bind().dialect.name == "sqlite":
+        with _process_locks[(model.__tablename__, key)]:
+            yield session.exec(statement).first()
+    else:
+        yield session.exec(statement).first()
+
+def lock_rows(session: Session, model: Type[SQLModel], column: Any, values: Optional[Iterable[Any]] = None):
+    """Lock every row whose `column` is in `values`, or the whole table without values.
+
+    Rows are locked with one SELECT ... FOR UPDATE in primary key order, so
+    transactions locking overlapping sets queue up instead of deadlocking; the
+    locks are held until the transaction ends. SQLite has no row locks, but
+    there writers are already serialized by the database lock the caller's
+    first write takes.
+    """
+    primary_key = inspect(model).primary_key[0]
+    statement = select(primary_key).order_by(primary_key).with_for_update()
+    if values is not None:
+        statement = statement.where(column.in_(values))
+    session.exec(statement).all()
@@ -0,0 +1,187 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.grades import MeritList, MeritRank, SemesterGPA
+from app.models.user import StudentProfile, student_batch
+
+# batch and program rank by CGPA, semester by that semester's GPA
+RANKING_SCOPES = ("batch", "program", "semester")
+
+Member = Tuple[str, float, float]  # (student id, score, credits)
+
+def student_program(major: Optional[str]) -> str:
+    return major or "unassigned"
+
+def rank_members(members: Iterable[Member]) -> List[dict]:
+    """Competition ranks ("1224") and midpoint percentiles, best score first.
+
+    Scores are compared at two decimals, as GPAs are shown; tied students
+    share a rank and are listed by credits earned, then id.
+    """
+    ordered = sorted(
+        ((student_id, round(score, 2), credits) for student_id, score, credits in members),
+        key=lambda member: (-member[1], -member[2], member[0])
+    )
+    count = len(ordered)
+    ties = defaultdict(int)
+    for _, score, _ in ordered:
+        ties[score] += 1
+
+    ranked = []
+    below = count
+    position = 0
+    while position < count:
+        score = ordered[position][1]
+        equal = ties[score]
+        below -= equal
+        percentile = round(100 * (below + equal / 2) / count, 2)
+        for student_id, _, credits in ordered[position:position + equal]:
+            ranked.append({
+                "student_id": student_id,
+                "rank": position + 1,
+                "score": score,
+                "credits": credits,
+                "percentile": percentile,
+                "tied": equal > 1
+            })
+        position += equal
+    return ranked
+
+def _program_filter(value: str):
+    return StudentProfile.major == value if value != "unassigned" else StudentProfile.major.is_(None)
+
+def scope_version(session: Session, scope: str, value: str) -> str:
+    """Stamp of the SemesterGPA rows a scope is ranked from: any change to them changes the count or the latest update"""
+    if scope == "semester":
+        count, latest = session.exec(
+            select(func.count(SemesterGPA.id), func.max(SemesterGPA.updated_at))
+            .where(SemesterGPA.semester == value)
+        ).one()
+    else:
+        query = (
+            select(
+                StudentProfile.major,
+                StudentProfile.admission_date,
+                func.count(SemesterGPA.id),
+                func.max(SemesterGPA.updated_at)
+            )
+            .join(StudentProfile, StudentProfile.user_id == SemesterGPA.student_id)
+            .group_by(StudentProfile.major, StudentProfile.admission_date)
+        )
+        if scope == "program":
+            query = query.where(_program_filter(value))
+        count, latest = 0, None
+        for major, admission_date, rows, updated_at in session.exec(query).all():
+            if scope == "batch" and student_batch(major, admission_date) != value:
+                continue
+            count += rows
+            latest = max(latest, updated_at) if latest is not None else updated_at
+    latest = latest.isoformat() if isinstance(latest, datetime) else str(latest or "")
+    return f"{count}-{latest}"
+
+def scope_members(session: Session, scope: str, value: str) -> List[Member]:
+    if scope == "semester":
+        return session.exec(
+            select(SemesterGPA.student_id, SemesterGPA.gpa, SemesterGPA.credits)
+            .where(SemesterGPA.semester == value)
+        ).all()
+
+    query = (
+        select(
+            SemesterGPA.student_id,
+            StudentProfile.major,
+            StudentProfile.admission_date,
+            func.sum(SemesterGPA.credits),
+            func.sum(SemesterGPA.quality_points)
+        )
+        .join(StudentProfile, StudentProfile.user_id == SemesterGPA.student_id)
+        .group_by(SemesterGPA.student_id, StudentProfile.major, StudentProfile.admission_date)
+    )
+    if scope == "program":
+        query = query.where(_program_filter(value))
+    members = []
+    for student_id, major, admission_date, credits, quality_points in session.exec(query).all():
+        if scope == "batch" and student_batch(major, admission_date) != value:
+            continue
+        if credits:
+            members.append((student_id, quality_points / credits, credits))
+    return members
+
+def merit_list(session: Session, scope: str, value: str, refresh: bool = False) -> MeritList:
+    """The materialized ranking of a scope, computing and storing it first if it is missing or stale.
+
+    Invalidation misses a grade write that commits while a ranking is being
+    built, so each read also compares the stored scope_version with the
+    current one. The stamp is taken before the members are read, so a build
+    racing a write stores the older stamp and is redone on the next read.
+    """
+    if refresh:
+        drop_merit_lists(session, {(scope, value)})
+        session.commit()
+    for attempt in range(2):
+        version = scope_version(session, scope, value)
+        cached = session.exec(
+            select(MeritList).where(MeritList.scope == scope, MeritList.scope_value == value)
+        ).first()
+        if cached and cached.source_version == version:
+            return cached
+        if cached:
+            drop_merit_lists(session, {(scope, value)})
+            session.commit()
+
+        ranked = rank_members(scope_members(session, scope, value))
+        merit = MeritList(
+            scope=scope,
+            scope_value=value,
+            students=len(ranked),
+            source_version=version,
+            computed_at=datetime.now()
+        )
+        session.add(merit)
+        try:
+            session.flush()
+            if ranked:
+                session.execute(insert(MeritRank), [{"merit_list_id": merit.id, **row} for row in ranked])
+            session.commit()
+            return merit
+        except IntegrityError:
+            # A concurrent request stored the same ranking first; read theirs
+            session.rollback()
+            if attempt:
+                raise
+
+def drop_merit_lists(session: Session, scopes: Optional[Set[Tuple[str, str]]] = None):
+    """Delete the rankings of (scope, value) pairs, or all of them; does not commit"""
+    if scopes is not None and not scopes:
+        return
+    stale = select(MeritList.id)
+    if scopes is not None:
+        stale = stale.where(tuple_(MeritList.scope, MeritList.scope_value).in_(scopes))
+    session.execute(delete(MeritRank).where(MeritRank.merit_list_id.in_(stale)))
+    session.execute(delete(MeritList).where(MeritList.id.in_(stale)))
+
+def invalidate_merit_lists(session: Session, keys: Optional[Iterable[Tuple[str, str]]] = None):
+    """Drop every ranking that (student, semester) `keys` can change, or all rankings without keys.
+
+    That is the semester rankings of those semesters and the batch and
+    program rankings the students belong to. Does not commit.
+    """
+    if keys is None:
+        drop_merit_lists(session)
+        return
+    keys = set(keys)
+    scopes = {("semester", semester) for _, semester in keys}
+    students = {student_id for student_id, _ in keys}
+    if students:
+        for major, admission_date in session.exec(
+            select(StudentProfile.major, StudentProfile.admission_date)
+            .where(StudentProfile.user_id.in_(students))
+        ).all():
+            scopes.add(("batch", student_batch(major, admission_date)))
+            scopes.add(("program", student_program(major)))
+    drop_merit_lists(session, scopes)
@@ -0,0 +1,157 @@
+import threading
+import time as clock
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from app.models.class_schedule import ClassSchedule
+from app.models.room import Room, RoomAvailabilitySlot, RoomBooking, RoomBookingSeries
+from app.utils.intervals import time_to_minutes
+from app.utils.recurrence import series_dates
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+def span_mask(start: time, end: time) -> int:
+    """Bitmap of the 5-minute slots touched by [start, end)"""
+    first = time_to_minutes(start) // SLOT_MINUTES
+    last = -(-time_to_minutes(end) // SLOT_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+class RoomOccupancy:
+    """Per-room, per-day occupancy bitmaps at 5-minute granularity.
+
+    Weekly masks combine closed hours (outside RoomAvailabilitySlot windows, for
+    rooms that define any) with class schedules; approved bookings and approved
+    series occurrences are cached per date. Writers call `invalidate` for the
+    rooms or dates they touched and only those are rebuilt on the next query.
+    The cache lives in the process, so it is also rebuilt every `max_age_seconds`
+    to pick up other workers' writes.
+    """
+
+    def __init__(self, max_age_seconds: int = 300):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._rooms: Dict[str, Tuple[int, List[str]]] = {}  # room -> (capacity, facilities)
+        self._by_capacity: List[Tuple[int, str]] = []
+        self._blocked: Dict[str, Dict[str, int]] = {}  # room -> weekday -> busy mask
+        self._default_blocked: Dict[str, int] = {}  # busy mask for weekdays without an entry
+        self._bookings: Dict[date, Dict[str, int]] = {}
+        self._dirty_rooms: Optional[Set[str]] = None  # None means everything must be rebuilt
+        self._built_at = 0.0
+
+    def invalidate(self, *rooms: Optional[str]):
+        """Mark rooms as changed, or everything when called without rooms"""
+        with self._lock:
+            if not rooms:
+                self._dirty_rooms = None
+            elif self._dirty_rooms is not None:
+                self._dirty_rooms.update(room for room in rooms if room)
+
+    def invalidate_bookings(self, booking_date: Optional[date]):
+        with self._lock:
+            self._bookings.pop(booking_date, None)
+
+    def _refresh(self, session: Session):
+        if self._dirty_rooms is None or clock.monotonic() - self._built_at > self.max_age_seconds:
+            self._rooms.clear()
+            self._blocked.clear()
+            self._default_blocked.clear()
+            self._build(session, None)
+            self._built_at = clock.monotonic()
+        elif self._dirty_rooms:
+            for room in self._dirty_rooms:
+                self._rooms.pop(room, None)
+                self._blocked.pop(room, None)
+                self._default_blocked.pop(room, None)
+            self._build(session, self._dirty_rooms)
+        else:
+            return
+        self._dirty_rooms = set()
+        self._bookings.clear()
+        self._by_capacity = sorted((capacity, room) for room, (capacity, _) in self._rooms.items())
+
+    def _build(self, session: Session, rooms: Optional[Set[str]]):
+        room_query = select(Room)
+        slot_query = select(RoomAvailabilitySlot)
+        class_query = select(ClassSchedule.room, ClassSchedule.day, ClassSchedule.start_time, ClassSchedule.end_time)
+        if rooms is not None:
+            room_query = room_query.where(Room.room.in_(rooms))
+            slot_query = slot_query.where(RoomAvailabilitySlot.room.in_(rooms))
+            class_query = class_query.where(ClassSchedule.room.in_(rooms))
+
+        for room in session.exec(room_query).all():
+            self._rooms[room.room] = (room.capacity or 0, room.facilities or [])
+            self._blocked[room.room] = {}
+            self._default_blocked[room.room] = 0
+
+        # Rooms that declare availability windows are closed outside of them
+        open_masks = defaultdict(lambda: defaultdict(int))
+        for slot in session.exec(slot_query).all():
+            if slot.room in self._rooms and slot.day and slot.start_time and slot.end_time:
+                open_masks[slot.room][slot.day] |= span_mask(slot.start_time, slot.end_time)
+        for room, by_day in open_masks.items():
+            self._default_blocked[room] = FULL_DAY
+            for day, mask in by_day.items():
+                self._blocked[room][day] = FULL_DAY & ~mask
+
+        for room, day, start_time, end_time in session.exec(class_query).all():
+            if room in self._rooms and day and start_time and end_time:
+                busy = self._blocked[room].get(day, self._default_blocked[room])
+                self._blocked[room][day] = busy | span_mask(start_time, end_time)
+
+    def _booking_masks(self, session: Session, on: date) -> Dict[str, int]:
+        masks = self._bookings.get(on)
+        if masks is None:
+            masks = defaultdict(int)
+            bookings = session.exec(
+                select(RoomBooking.room, RoomBooking.start_time, RoomBooking.end_time).where(
+                    RoomBooking.booking_date == on,
+                    RoomBooking.status == "Approved"
+                )
+            ).all()
+            for room, start_time, end_time in bookings:
+                if start_time and end_time:
+                    masks[room] |= span_mask(start_time, end_time)
+            series = session.exec(
+                select(RoomBookingSeries).where(
+                    RoomBookingSeries.start_date <= on,
+                    RoomBookingSeries.until >= on,
+                    RoomBookingSeries.status == "Approved"
+                )
+            ).all()
+            for booking_series in series:
+                if series_dates(booking_series, on, on):
+                    masks[booking_series.room] |= span_mask(booking_series.start_time, booking_series.end_time)
+            self._bookings[on] = masks
+        return masks
+
+    def free_rooms(
+        self,
+        session: Session,
+        on: date,
+        start: time,
+        end: time,
+        min_capacity: int = 0
+    ) -> List[Tuple[str, int, List[str]]]:
+        """Rooms with at least `min_capacity` seats free for all of [start, end) on `on`, smallest first"""
+        wanted = span_mask(start, end)
+        weekday = on.strftime("%A")
+        with self._lock:
+            self._refresh(session)
+            bookings = self._booking_masks(session, on)
+            first = bisect_left(self._by_capacity, (min_capacity, ""))
+            free = []
+            for capacity, room in self._by_capacity[first:]:
+                busy = self._blocked[room].get(weekday, self._default_blocked[room]) | bookings.get(room, 0)
+                if not busy & wanted:
+                    free.append((room, capacity, self._rooms[room][1]))
+            return free
+
+room_occupancy = RoomOccupancy()
@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def validate_weekdays(weekdays: Iterable[str]) -> List[str]:
+    unknown = [day for day in weekdays if day not in WEEKDAYS]
+    if unknown:
+        raise ValueError(f"Unknown weekdays: {', '.join(unknown)}")
+    return sorted(set(weekdays), key=WEEKDAYS.index)
+
+def weekly_occurrences(
+    start_date: date,
+    until: date,
+    weekdays: Iterable[str] = (),
+    interval_weeks: int = 1,
+    exceptions: Iterable[date] = (),
+    window_start: Optional[date] = None,
+    window_end: Optional[date] = None
+) -> List[date]:
+    """Dates of a weekly rule (RRULE FREQ=WEEKLY;INTERVAL;BYDAY;UNTIL plus EXDATEs).
+
+    Only the part of the series inside [window_start, window_end] is expanded,
+    so a query window costs the same however long the series runs. Without
+    weekdays the series repeats on the weekday of `start_date`.
+    """
+    offsets = sorted({WEEKDAYS.index(day) for day in weekdays}) or [start_date.weekday()]
+    first = max(start_date, window_start or start_date)
+    last = min(until, window_end or until)
+    if first > last:
+        return []
+
+    interval_weeks = max(1, interval_weeks)
+    skipped = set(exceptions)
+    first_week = start_date - timedelta(days=start_date.weekday())
+    weeks_in = (first - first_week).days // 7
+    week = first_week + timedelta(weeks=weeks_in - weeks_in % interval_weeks)
+
+    dates = []
+    while week <= last:
+        for offset in offsets:
+            day = week + timedelta(days=offset)
+            if first <= day <= last and day not in skipped:
+                dates.append(day)
+        week += timedelta(weeks=interval_weeks)
+    return dates
+
+def series_dates(series, window_start: Optional[date] = None, window_end: Optional[date] = None) -> List[date]:
+    """Occurrence dates of a stored room or equipment booking series"""
+    return weekly_occurrences(
+        series.start_date,
+        series.until,
+        series.weekdays or [],
+        series.interval_weeks or 1,
+        [date.fromisoformat(skipped) for skipped in series.exceptions or []],
+        window_start,
+        window_end
+    )
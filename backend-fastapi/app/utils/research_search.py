@@ -0,0 +1,198 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, cast, extract, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Session, select
+
+from app.models.project import Project
+from app.models.research import AUTHOR_NAME_VECTOR, ResearchPaper, ResearchPaperAuthor
+from app.utils.text_search import InvertedIndex, count_facets, facet_value, prefix_tsquery, tokenize
+
+# Field weights, mirroring the A/B/C weights of the Postgres search_vector columns
+PROJECT_FIELD_WEIGHTS = {"title": 3.0, "topic": 2.0, "abstract": 1.0}
+PROJECT_FACETS = ("year", "topic", "status", "supervisor")
+PAPER_FIELD_WEIGHTS = {"title": 3.0, "authors": 2.0, "journal": 2.0, "abstract": 1.0}
+PAPER_FACETS = ("year", "status", "journal")
+
+Facets = Dict[str, Dict[str, int]]
+
+class ProjectSearchIndex(InvertedIndex):
+    """In-memory inverted index over past projects; facets are (year, topic, status, supervisor)"""
+
+    @staticmethod
+    def document(project: Project):
+        return (
+            project.id,
+            [(getattr(project, field), weight) for field, weight in PROJECT_FIELD_WEIGHTS.items()],
+            tuple(facet_value(getattr(project, facet)) for facet in PROJECT_FACETS)
+        )
+
+    def load(self, session: Session):
+        for project in session.exec(select(Project)).all():
+            yield self.document(project)
+
+    def update(self, project: Project):
+        """Re-index one project after it was created or changed"""
+        self.put(*self.document(project))
+
+class ResearchPaperSearchIndex(InvertedIndex):
+    """In-memory inverted index over research papers and their authors; facets are (year, status, journal)"""
+
+    @staticmethod
+    def document(paper: ResearchPaper, authors: List[str]):
+        texts = {
+            "title": paper.title,
+            "authors": " ".join(authors),
+            "journal": paper.journal,
+            "abstract": paper.abstract
+        }
+        year = paper.publication_date.year if paper.publication_date else None
+        return (
+            paper.id,
+            [(texts[field], weight) for field, weight in PAPER_FIELD_WEIGHTS.items()],
+            (facet_value(year), facet_value(paper.status), facet_value(paper.journal))
+        )
+
+    def load(self, session: Session):
+        authors = defaultdict(list)
+        for paper_id, author_name in session.exec(
+            select(ResearchPaperAuthor.paper_id, ResearchPaperAuthor.author_name).order_by(ResearchPaperAuthor.id)
+        ).all():
+            if author_name:
+                authors[paper_id].append(author_name)
+        for paper in session.exec(select(ResearchPaper)).all():
+            yield self.document(paper, authors[paper.id])
+
+project_index = ProjectSearchIndex()
+research_paper_index = ResearchPaperSearchIndex()
+
+def _search_index(
+    session: Session,
+    index: InvertedIndex,
+    model,
+    text: str,
+    names: Tuple[str, ...],
+    wanted: Dict[str, Optional[str]],
+    limit: Optional[int],
+    offset: int
+) -> Tuple[list, int, Facets]:
+    """Filter index hits by exact facet values, count facets over all hits and load one page"""
+    hits = index.search(session, text) if tokenize(text) else index.browse(session)
+    ranked = []
+    facet_rows = []
+    for document_id, _, values in hits:
+        facet_rows.append(values)
+        if all(wanted[name] is None or value == wanted[name] for name, value in zip(names, values)):
+            ranked.append(document_id)
+
+    page = ranked[offset:offset + limit if limit is not None else None]
+    rows = {row.id: row for row in session.exec(select(model).where(model.id.in_(page))).all()} if page else {}
+    return [rows[i] for i in page if i in rows], len(ranked), count_facets(names, facet_rows)
+
+def _search_postgres(
+    session: Session,
+    model,
+    matched,
+    rank,  # None orders by id, as when browsing without text
+    columns: List,
+    names: Tuple[str, ...],
+    wanted: Dict[str, Optional[str]],
+    limit: Optional[int],
+    offset: int
+) -> Tuple[list, int, Facets]:
+    """Facets and the filtered total from one grouped query, then one ranked page query"""
+    filters = [matched] if matched is not None else []
+    grouped = session.exec(select(*columns, func.count()).where(*filters).group_by(*columns)).all()
+    total = sum(
+        row[-1] for row in grouped
+        if all(wanted[name] is None or facet_value(value) == wanted[name] for name, value in zip(names, row))
+    )
+    for name, column in zip(names, columns):
+        if wanted[name] is not None:
+            filters.append(func.coalesce(cast(column, Text), "unknown") == wanted[name])
+
+    order = [rank.desc(), model.id] if rank is not None else [model.id]
+    page_query = select(model).where(*filters).order_by(*order).offset(offset)
+    if limit is not None:
+        page_query = page_query.limit(limit)
+    return session.exec(page_query).all(), total, count_facets(names, grouped)
+
+def search_projects(
+    session: Session,
+    text: Optional[str],
+    year: Optional[int] = None,
+    topic: Optional[str] = None,
+    status: Optional[str] = None,
+    supervisor: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> Tuple[List[Project], int, Facets]:
+    """Ranked projects matching `text` as type-ahead prefixes, or all projects without text.
+
+    Returns the requested page, the total after the filters, and year, topic,
+    status and supervisor facet counts over the text matches.
+    """
+    wanted = {
+        "year": str(year) if year is not None else None,
+        "topic": topic,
+        "status": status,
+        "supervisor": supervisor
+    }
+    if session.get_bind().dialect.name != "postgresql":
+        return _search_index(session, project_index, Project, text or "", PROJECT_FACETS, wanted, limit, offset)
+
+    terms = tokenize(text)
+    # Generated, GIN-indexed column added by the migration and the create_all hook
+    vector = literal_column("project.search_vector")
+    query = prefix_tsquery(terms)
+    matched = vector.op("@@")(query) if terms else None
+    rank = func.ts_rank(vector, query) if terms else None
+    columns = [Project.year, Project.topic, Project.status, Project.supervisor]
+    return _search_postgres(session, Project, matched, rank, columns, PROJECT_FACETS, wanted, limit, offset)
+
+def search_research_papers(
+    session: Session,
+    text: Optional[str],
+    year: Optional[int] = None,
+    status: Optional[str] = None,
+    journal: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> Tuple[List[ResearchPaper], int, Facets]:
+    """Ranked research papers matching `text` in the paper or its authors, or all papers without text.
+
+    Returns the requested page, the total after the filters, and year, status
+    and journal facet counts over the text matches.
+    """
+    wanted = {"year": str(year) if year is not None else None, "status": status, "journal": journal}
+    if session.get_bind().dialect.name != "postgresql":
+        return _search_index(
+            session, research_paper_index, ResearchPaper, text or "", PAPER_FACETS, wanted, limit, offset
+        )
+
+    terms = tokenize(text)
+    columns = [extract("year", ResearchPaper.publication_date), ResearchPaper.status, ResearchPaper.journal]
+    if not terms:
+        return _search_postgres(
+            session, ResearchPaper, None, None, columns, PAPER_FACETS, wanted, limit, offset
+        )
+
+    # Candidates come from the indexed paper vector or the author name index; all
+    # terms must then match the paper and its authors together
+    author_vector = literal_column(AUTHOR_NAME_VECTOR)
+    any_term = func.to_tsquery("simple", " | ".join(f"{term}:*" for term in terms))
+    query = prefix_tsquery(terms)
+    paper_vector = literal_column("researchpaper.search_vector")
+    authors_vector = (
+        select(func.to_tsvector("simple", func.string_agg(ResearchPaperAuthor.author_name, " ")))
+        .where(ResearchPaperAuthor.paper_id == ResearchPaper.id)
+        .scalar_subquery()
+    )
+    vector = paper_vector.op("||")(func.setweight(func.coalesce(authors_vector, cast("", TSVECTOR)), "B"))
+    matched = or_(
+        paper_vector.op("@@")(query),
+        ResearchPaper.id.in_(select(ResearchPaperAuthor.paper_id).where(author_vector.op("@@")(any_term)))
+    ) & vector.op("@@")(query)
+    rank = func.ts_rank(vector, query)
+    return _search_postgres(session, ResearchPaper, matched, rank, columns, PAPER_FACETS, wanted, limit, offset)
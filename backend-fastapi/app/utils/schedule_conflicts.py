@@ -0,0 +1,127 @@
+from datetime import time
+from typing import Iterable, List, Optional
+
+from pydantic import BaseModel
+from sqlmodel import Session, select, or_
+
+from app.models.class_schedule import ClassSchedule
+from app.utils.intervals import IntervalIndex, find_overlaps, time_to_minutes
+
+# A class clashes with another on the same day if they share any of these
+CONFLICT_DIMENSIONS = ("room", "instructor", "batch")
+
+class ScheduleConflict(BaseModel):
+    dimension: str  # room, instructor or batch
+    value: str
+    day: str
+    scheduleId: Optional[int] = None
+    courseCode: Optional[str] = None
+    startTime: str
+    endTime: str
+    conflictingScheduleId: Optional[int] = None
+    conflictingCourseCode: Optional[str] = None
+    conflictingStartTime: str
+    conflictingEndTime: str
+
+def _format_time(value: Optional[time]) -> str:
+    return value.strftime("%H:%M") if value else ""
+
+def _conflict(dimension: str, schedule: ClassSchedule, other: ClassSchedule) -> ScheduleConflict:
+    return ScheduleConflict(
+        dimension=dimension,
+        value=getattr(schedule, dimension),
+        day=schedule.day,
+        scheduleId=schedule.id,
+        courseCode=schedule.course_code,
+        startTime=_format_time(schedule.start_time),
+        endTime=_format_time(schedule.end_time),
+        conflictingScheduleId=other.id,
+        conflictingCourseCode=other.course_code,
+        conflictingStartTime=_format_time(other.start_time),
+        conflictingEndTime=_format_time(other.end_time)
+    )
+
+def find_schedule_conflicts(session: Session, schedule: ClassSchedule) -> List[ScheduleConflict]:
+    """Find existing classes that overlap `schedule` in room, instructor or batch.
+
+    This is a single range probe over the (day, <dimension>, start_time)
+    indexes; `schedule` itself is excluded when it already has an id.
+    """
+    dimensions = [d for d in CONFLICT_DIMENSIONS if getattr(schedule, d)]
+    if not dimensions or not schedule.day or not schedule.start_time or not schedule.end_time:
+        return []
+
+    query = select(ClassSchedule).where(
+        ClassSchedule.day == schedule.day,
+        ClassSchedule.start_time < schedule.end_time,
+        ClassSchedule.end_time > schedule.start_time,
+        or_(*[getattr(ClassSchedule, d) == getattr(schedule, d) for d in dimensions])
+    )
+    if schedule.id is not None:
+        query = query.where(ClassSchedule.id != schedule.id)
+
+    conflicts = []
+    for other in session.exec(query).all():
+        for dimension in dimensions:
+            if getattr(other, dimension) == getattr(schedule, dimension):
+                conflicts.append(_conflict(dimension, schedule, other))
+    return conflicts
+
+def find_timetable_clashes(schedules: Iterable[ClassSchedule]) -> List[ScheduleConflict]:
+    """Find every clash in a timetable with one sweep-line pass"""
+    entries = [
+        ((dimension, schedule.day, getattr(schedule, dimension)), schedule.start_time, schedule.end_time, schedule)
+        for schedule in schedules
+        if schedule.day and schedule.start_time and schedule.end_time
+        for dimension in CONFLICT_DIMENSIONS
+        if getattr(schedule, dimension)
+    ]
+    return [
+        _conflict(dimension, later, earlier)
+        for (dimension, _, _), earlier, later in find_overlaps(entries)
+    ]
+
+class ScheduleConflictIndex:
+    """In-memory per-(day, room|instructor|batch) interval index for bulk validation"""
+
+    def __init__(self, schedules: Iterable[ClassSchedule] = ()):
+        self._index = IntervalIndex()
+        for schedule in schedules:
+            self.add(schedule)
+
+    @staticmethod
+    def _entries(schedule: ClassSchedule):
+        if not schedule.day or not schedule.start_time or not schedule.end_time:
+            return
+        start, end = time_to_minutes(schedule.start_time), time_to_minutes(schedule.end_time)
+        for dimension in CONFLICT_DIMENSIONS:
+            value = getattr(schedule, dimension)
+            if value:
+                yield dimension, (dimension, schedule.day, value), start, end
+
+    def add(self, schedule: ClassSchedule):
+        for _, key, start, end in self._entries(schedule):
+            self._index.add(key, start, end, schedule)
+
+    def remove(self, schedule: ClassSchedule):
+        for _, key, start, end in self._entries(schedule):
+            self._index.remove(key, start, end, schedule)
+
+    def find_conflicts(self, schedule: ClassSchedule) -> List[ScheduleConflict]:
+        return [
+            _conflict(dimension, schedule, other)
+            for dimension, key, start, end in self._entries(schedule)
+            for other in self._index.overlapping(key, start, end)
+            if other is not schedule
+        ]
+
+def describe_conflicts(conflicts: List[ScheduleConflict]) -> str:
+    """Human readable summary used as the HTTP error detail"""
+    parts = []
+    for c in conflicts:
+        other = c.conflictingCourseCode or f"schedule {c.conflictingScheduleId}"
+        parts.append(
+            f"{c.dimension} {c.value} is already booked on {c.day} "
+            f"{c.conflictingStartTime}-{c.conflictingEndTime} ({other})"
+        )
+    return "Schedule conflict: " + "; ".join(parts)
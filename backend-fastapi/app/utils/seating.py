@@ -0,0 +1,103 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+class SeatingStudent(BaseModel):
+    student_id: str
+    batch: str
+    roll_number: Optional[str] = None
+
+class SeatingRoom(BaseModel):
+    room: str
+    capacity: int
+
+class SeatAssignment(BaseModel):
+    room: str
+    seat_number: int  # 1-based, row by row from the front
+    row: int
+    column: int
+    student_id: str
+    roll_number: Optional[str] = None
+    batch: str
+
+class SeatingPlan(BaseModel):
+    seats: List[SeatAssignment]
+    unseated: List[SeatingStudent]
+
+def choose_rooms(rooms: List[SeatingRoom], students: int) -> List[SeatingRoom]:
+    """Fill the largest rooms first and finish in the smallest room that takes the rest"""
+    available = sorted((room for room in rooms if room.capacity > 0), key=lambda room: room.capacity)
+    chosen = []
+    remaining = students
+    while remaining > 0 and available:
+        fitting = next((i for i, room in enumerate(available) if room.capacity >= remaining), None)
+        room = available.pop(fitting if fitting is not None else -1)
+        chosen.append(room)
+        remaining -= room.capacity
+    return chosen
+
+def plan_seating(students: List[SeatingStudent], rooms: List[SeatingRoom], columns: int) -> SeatingPlan:
+    """Pack students into rooms row by row, interleaving batches.
+
+    Each seat takes the next student of the batch with the most students left
+    that differs from both the seat to its left and the seat in front; only when
+    no such batch remains does a neighbour share a batch. With two balanced
+    batches this yields a checkerboard. Runs in O(n log b) for b batches.
+    """
+    by_batch: Dict[str, List[SeatingStudent]] = defaultdict(list)
+    for student in students:
+        by_batch[student.batch].append(student)
+    for members in by_batch.values():
+        members.sort(key=lambda s: (s.roll_number or "", s.student_id), reverse=True)  # pop() yields roll order
+    heap: List[Tuple[int, str]] = [(-len(members), batch) for batch, members in by_batch.items()]
+    heapq.heapify(heap)
+
+    seats: List[SeatAssignment] = []
+    for room in choose_rooms(rooms, len(students)):
+        previous_row: List[Optional[str]] = [None] * columns
+        current_row: List[Optional[str]] = [None] * columns
+        for index in range(room.capacity):
+            if not heap:
+                break
+            row, column = divmod(index, columns)
+            if column == 0 and index:
+                previous_row, current_row = current_row, [None] * columns
+            left = current_row[column - 1] if column else None
+            front = previous_row[column]
+
+            skipped = []
+            while heap and heap[0][1] in (left, front):
+                skipped.append(heapq.heappop(heap))
+            if heap:
+                count, batch = heapq.heappop(heap)
+            else:
+                count, batch = skipped.pop(0)
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            if count + 1 < 0:
+                heapq.heappush(heap, (count + 1, batch))
+
+            student = by_batch[batch].pop()
+            current_row[column] = batch
+            seats.append(SeatAssignment(
+                room=room.room,
+                seat_number=index + 1,
+                row=row + 1,
+                column=column + 1,
+                student_id=student.student_id,
+                roll_number=student.roll_number,
+                batch=batch
+            ))
+
+    unseated = [student for members in by_batch.values() for student in members]
+    return SeatingPlan(seats=seats, unseated=unseated)
+
+def same_batch_neighbours(seats: List[SeatAssignment]) -> int:
+    """Adjacent pairs of seats, side by side or front to back, taken by one batch"""
+    batches = {(seat.room, seat.row, seat.column): seat.batch for seat in seats}
+    return sum(
+        (batches.get((room, row, column + 1)) == batch) + (batches.get((room, row + 1, column)) == batch)
+        for (room, row, column), batch in batches.items()
+    )
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import zipfile
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from pydantic import BaseModel
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.utils.file_handler import BaseFilePath, delete_file
+
+# Not under a name the /api/files route can serve; submissions are only downloaded through their assignment
+SUBMISSION_FILE_PATH = BaseFilePath + "submissions/"
+CHUNK_SIZE = 64 * 1024
+MAX_FIELD_SIZE = 64 * 1024  # non-file form fields are read but not stored
+
+class SubmissionUploadError(Exception):
+    status_code = 400
+
+class SubmissionQuotaExceeded(SubmissionUploadError):
+    status_code = 413
+
+class StoredFile(BaseModel):
+    filename: str
+    stored_name: str
+    content_type: Optional[str] = None
+    size: int
+    sha256: str
+
+def submission_file_path(stored_name: str) -> str:
+    return SUBMISSION_FILE_PATH + stored_name
+
+def _clean_filename(filename: str) -> str:
+    # Browsers may send a full client path; keep the last component only
+    name = filename.replace("\\", "/").rsplit("/", 1)[-1].strip()
+    return name.replace(" ", "_") or "file"
+
+class _MultipartFileWriter:
+    """Multipart callbacks writing every file part straight to its own file under SUBMISSION_FILE_PATH.
+
+    Each chunk is hashed and counted as it is written, so the upload is never
+    held in memory and is abandoned as soon as the files together pass `limit`.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self.files: List[StoredFile] = []
+        self.error: Optional[SubmissionUploadError] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._out = None
+        self._hash = None
+        self._current: Optional[StoredFile] = None
+        self._field_size = 0
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._field_size = 0
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        filename = options.get(b"filename")
+        if filename is None:
+            return
+        content_type = self._headers.get(b"content-type")
+        self._current = StoredFile(
+            filename=_clean_filename(filename.decode("utf-8", "replace")),
+            stored_name=uuid4().hex,
+            content_type=content_type.decode("latin-1") if content_type else None,
+            size=0,
+            sha256=""
+        )
+        self._hash = hashlib.sha256()
+        self._out = open(submission_file_path(self._current.stored_name), "wb")
+        self.files.append(self._current)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.error:
+            return
+        size = end - start
+        if self._out is None:
+            self._field_size += size
+            if self._field_size > MAX_FIELD_SIZE:
+                self.error = SubmissionUploadError("Form field too large")
+            return
+        self.total += size
+        if self.total > self.limit:
+            self.error = SubmissionQuotaExceeded(f"Submission exceeds the {self.limit} byte limit for this assignment")
+            return
+        chunk = data[start:end]
+        self._hash.update(chunk)
+        self._out.write(chunk)
+        self._current.size += size
+
+    def on_part_end(self):
+        if self._out is not None:
+            self._out.close()
+            self._current.sha256 = self._hash.hexdigest()
+            self._out = None
+            self._current = None
+
+    @property
+    def in_file(self) -> bool:
+        return self._out is not None
+
+    def discard(self):
+        """Remove everything written so far"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        discard_stored_files(self.files)
+        self.files = []
+
+async def store_multipart_files(content_type: str, body: AsyncIterator[bytes], limit: int) -> List[StoredFile]:
+    """Stream the file parts of a multipart body to submission storage.
+
+    Raises SubmissionQuotaExceeded once the files pass `limit` bytes in total,
+    or SubmissionUploadError for a malformed body; nothing is left on disk then.
+    """
+    media_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise SubmissionUploadError("Expected a multipart/form-data body")
+
+    os.makedirs(SUBMISSION_FILE_PATH, exist_ok=True)
+    writer = _MultipartFileWriter(limit)
+    parser = MultipartParser(boundary, writer.callbacks())
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            if writer.error:
+                raise writer.error
+        parser.finalize()
+    except SubmissionUploadError:
+        writer.discard()
+        raise
+    except Exception as e:
+        writer.discard()
+        raise SubmissionUploadError(f"Malformed multipart body: {e}")
+    if writer.in_file:
+        writer.discard()
+        raise SubmissionUploadError("Malformed multipart body: truncated file part")
+    return writer.files
+
+class _ZipOutput:
+    """Write-only buffer for zipfile; without seek or tell zipfile writes data descriptors, so output can stream"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_zip(entries: Iterable[Tuple[str, Optional[str], Optional[bytes]]]) -> Iterator[bytes]:
+    """Yield a zip archive of (archive name, stored file name or None, inline bytes) entries as it is built.
+
+    Stored files are copied in CHUNK_SIZE pieces, so memory use stays at about
+    one chunk whatever the archive size; missing stored files are skipped.
+    """
+    output = _ZipOutput()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, stored_name, content in entries:
+            if stored_name is None:
+                archive.writestr(name, content or b"")
+            else:
+                path = submission_file_path(stored_name)
+                if not os.path.exists(path):
+                    continue
+                with open(path, "rb") as source, archive.open(name, "w", force_zip64=True) as target:
+                    while chunk := source.read(CHUNK_SIZE):
+                        target.write(chunk)
+                        data = output.drain()
+                        if data:
+                            yield data
+            data = output.drain()
+            if data:
+                yield data
+    yield output.drain()
+
+def discard_stored_files(files: Iterable[StoredFile]):
+    for stored in files:
+        delete_file(submission_file_path(stored.stored_name))
@@ -0,0 +1,144 @@
+import math
+import re
+import threading
+import time as clock
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session
+
+PREFIX_PENALTY = 0.5  # a prefix match counts for less than the whole word
+TOKEN = re.compile(r"\w+")
+
+# (document id, [(text, weight)], facet values)
+Document = Tuple[str, List[Tuple[Optional[str], float]], Tuple]
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN.findall((text or "").lower())
+
+def facet_value(value) -> str:
+    value = getattr(value, "value", value)
+    return str(value) if value not in (None, "") else "unknown"
+
+def prefix_tsquery(terms: List[str]):
+    """Postgres tsquery matching every term as a prefix"""
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+def count_facets(names: Tuple[str, ...], rows: Iterable[Tuple]) -> Dict[str, Dict[str, int]]:
+    """Facet counts from rows of facet values, optionally ending in a row count"""
+    facets = {name: defaultdict(int) for name in names}
+    for row in rows:
+        count = row[len(names)] if len(row) > len(names) else 1
+        for name, value in zip(names, row):
+            facets[name][facet_value(value)] += count
+    return {name: dict(counts) for name, counts in facets.items()}
+
+class InvertedIndex:
+    """In-memory weighted inverted index, used where Postgres full-text search is not available.
+
+    Subclasses implement `load` to yield every document. Every query term is
+    matched as a prefix against a sorted vocabulary, so type-ahead costs a
+    bisect plus the postings of the matching words, and scores are field
+    weight times idf. Writers call `put`, `discard` or `invalidate`; the index
+    is also rebuilt every `max_age_seconds` to pick up other workers' writes.
+    """
+
+    def __init__(self, max_age_seconds: int = 300):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)  # word -> document id -> weight
+        self._vocabulary: List[str] = []
+        self._documents: Dict[Hashable, Dict[str, float]] = {}  # document id -> word -> weight
+        self._facets: Dict[Hashable, Tuple] = {}
+        self._built_at: Optional[float] = None
+
+    def load(self, session: Session) -> Iterable[Document]:
+        raise NotImplementedError
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def put(self, document_id: Hashable, fields: List[Tuple[Optional[str], float]], facets: Tuple):
+        """Re-index one document after it was created or changed"""
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(document_id)
+                self._add(document_id, fields, facets)
+
+    def discard(self, document_id: Hashable):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(document_id)
+
+    def _add(self, document_id: Hashable, fields: List[Tuple[Optional[str], float]], facets: Tuple):
+        words = defaultdict(float)
+        for text, weight in fields:
+            for word in tokenize(text):
+                words[word] += weight
+        for word, weight in words.items():
+            if word not in self._postings:
+                insort(self._vocabulary, word)
+            self._postings[word][document_id] = weight
+        self._documents[document_id] = dict(words)
+        self._facets[document_id] = facets
+
+    def _remove(self, document_id: Hashable):
+        for word in self._documents.pop(document_id, {}):
+            postings = self._postings[word]
+            postings.pop(document_id, None)
+            if not postings:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+        self._facets.pop(document_id, None)
+
+    def _refresh(self, session: Session):
+        if self._built_at is not None and clock.monotonic() - self._built_at <= self.max_age_seconds:
+            return
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._documents.clear()
+        self._facets.clear()
+        for document_id, fields, facets in self.load(session):
+            self._add(document_id, fields, facets)
+        self._built_at = clock.monotonic()
+
+    def _term_scores(self, term: str) -> Dict[Hashable, float]:
+        scores = defaultdict(float)
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            word = self._vocabulary[i]
+            postings = self._postings[word]
+            idf = math.log(1 + len(self._documents) / len(postings))
+            factor = idf if word == term else idf * PREFIX_PENALTY
+            for document_id, weight in postings.items():
+                scores[document_id] = max(scores[document_id], weight * factor)
+            i += 1
+        return scores
+
+    def search(self, session: Session, text: str) -> List[Tuple[Hashable, float, Tuple]]:
+        """(document id, score, facets) for documents matching every term, best first"""
+        terms = tokenize(text)
+        with self._lock:
+            self._refresh(session)
+            if not terms:
+                return []
+            matches = None
+            for term in sorted(set(terms), key=len, reverse=True):  # longest terms are the most selective
+                scores = self._term_scores(term)
+                if matches is None:
+                    matches = scores
+                else:
+                    matches = {i: s + scores[i] for i, s in matches.items() if i in scores}
+                if not matches:
+                    return []
+            ranked = sorted(matches.items(), key=lambda item: (-item[1], item[0]))
+            return [(document_id, score, self._facets[document_id]) for document_id, score in ranked]
+
+    def browse(self, session: Session) -> List[Tuple[Hashable, float, Tuple]]:
+        """Every document with a zero score, for filtering without search text"""
+        with self._lock:
+            self._refresh(session)
+            return [(document_id, 0.0, self._facets[document_id]) for document_id in sorted(self._facets)]
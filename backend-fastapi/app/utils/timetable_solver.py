@@ -0,0 +1,324 @@
+import random
+import time as clock
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# Occupancy marker for pinned slots, which the solver must never move
+FIXED = -1
+
+class CourseOffering(BaseModel):
+    course_code: str
+    batch: str
+    semester: Optional[str] = None
+    instructor: Optional[str] = None
+    sessions: int  # weekly sessions still to place
+    size: int = 0  # students, the room capacity must be at least this
+
+class RoomSpec(BaseModel):
+    room: str
+    capacity: int = 0
+    # day -> [(start_minute, end_minute)]; a room without windows is open all teaching day
+    windows: Dict[str, List[Tuple[int, int]]] = {}
+
+class BusyInterval(BaseModel):
+    """An existing (pinned) class that occupies a room, instructor and batch"""
+    day: str
+    start: int  # minutes since midnight
+    end: int
+    room: Optional[str] = None
+    instructor: Optional[str] = None
+    batch: Optional[str] = None
+
+class Placement(BaseModel):
+    course_code: str
+    batch: str
+    semester: Optional[str] = None
+    instructor: Optional[str] = None
+    room: str
+    day: str
+    start: int
+    end: int
+
+class TimetableSolution(BaseModel):
+    placements: List[Placement]
+    unplaced: List[CourseOffering]  # offerings with the number of sessions that could not be placed
+    elapsed_seconds: float
+
+class TimetableSolver:
+    """Weekly timetable solver on a fixed grid of equal-length sessions.
+
+    Each session of an offering is a variable whose value is a (timeslot, room)
+    pair. Construction assigns the most constrained session first and forward
+    checks instructor and batch conflicts; whatever cannot be placed is then
+    repaired by min-conflicts local search with a tabu list until the time
+    budget runs out.
+    """
+
+    def __init__(
+        self,
+        offerings: List[CourseOffering],
+        rooms: List[RoomSpec],
+        days: List[str],
+        day_start: int,
+        day_end: int,
+        slot_minutes: int,
+        pinned: Optional[List[BusyInterval]] = None,
+        seed: int = 0
+    ):
+        self.offerings = offerings
+        self.rooms = sorted(rooms, key=lambda r: r.capacity)  # best fit first
+        self.days = days
+        self.day_start = day_start
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = max(0, (day_end - day_start) // slot_minutes)
+        self.times = list(range(len(days) * self.slots_per_day))
+        self.random = random.Random(seed)
+
+        self.room_at: Dict[Tuple[int, int], int] = {}
+        self.instructor_at: Dict[Tuple[str, int], int] = {}
+        self.batch_at: Dict[Tuple[str, int], int] = {}
+        self.assignment: Dict[int, Tuple[int, int]] = {}
+
+        # Timeslots inside each room's availability windows
+        room_index = {room.room: i for i, room in enumerate(self.rooms)}
+        self.room_times = [self._times_within(room.windows) for room in self.rooms]
+
+        for busy in pinned or []:
+            for t in self._times_overlapping(busy.day, busy.start, busy.end):
+                if busy.room in room_index:
+                    self.room_at[(t, room_index[busy.room])] = FIXED
+                if busy.instructor:
+                    self.instructor_at[(busy.instructor, t)] = FIXED
+                if busy.batch:
+                    self.batch_at[(busy.batch, t)] = FIXED
+
+        # One variable per session to place
+        self.sessions = [i for i, offering in enumerate(offerings) for _ in range(max(0, offering.sessions))]
+        self.session_rooms = []
+        self.session_times = []
+        for i in self.sessions:
+            offering = offerings[i]
+            eligible = [r for r, room in enumerate(self.rooms) if room.capacity >= offering.size]
+            open_times = set()
+            for r in eligible:
+                open_times |= {t for t in self.room_times[r] if self.room_at.get((t, r)) != FIXED}
+            self.session_times.append(sorted(
+                t for t in open_times
+                if self.instructor_at.get((offering.instructor, t)) != FIXED
+                and self.batch_at.get((offering.batch, t)) != FIXED
+            ))
+            self.session_rooms.append(eligible)
+
+    def _times_within(self, windows: Dict[str, List[Tuple[int, int]]]) -> set:
+        if not windows:
+            return set(self.times)
+        times = set()
+        for d, day in enumerate(self.days):
+            for start, end in windows.get(day, []):
+                for s in range(self.slots_per_day):
+                    slot_start = self.day_start + s * self.slot_minutes
+                    if start <= slot_start and slot_start + self.slot_minutes <= end:
+                        times.add(d * self.slots_per_day + s)
+        return times
+
+    def _times_overlapping(self, day: str, start: int, end: int) -> List[int]:
+        if day not in self.days:
+            return []
+        d = self.days.index(day)
+        return [
+            d * self.slots_per_day + s
+            for s in range(self.slots_per_day)
+            if self.day_start + s * self.slot_minutes < end
+            and start < self.day_start + (s + 1) * self.slot_minutes
+        ]
+
+    def _assign(self, v: int, t: int, r: int):
+        offering = self.offerings[self.sessions[v]]
+        self.assignment[v] = (t, r)
+        self.room_at[(t, r)] = v
+        if offering.instructor:
+            self.instructor_at[(offering.instructor, t)] = v
+        self.batch_at[(offering.batch, t)] = v
+
+    def _unassign(self, v: int) -> int:
+        offering = self.offerings[self.sessions[v]]
+        t, r = self.assignment.pop(v)
+        del self.room_at[(t, r)]
+        if offering.instructor:
+            del self.instructor_at[(offering.instructor, t)]
+        del self.batch_at[(offering.batch, t)]
+        return t
+
+    def _free_rooms(self, v: int, t: int) -> List[int]:
+        return [
+            r for r in self.session_rooms[v]
+            if t in self.room_times[r] and (t, r) not in self.room_at
+        ]
+
+    def _offering_days(self, v: int) -> set:
+        offering_index = self.sessions[v]
+        return {
+            t // self.slots_per_day
+            for u, (t, _) in self.assignment.items()
+            if self.sessions[u] == offering_index
+        }
+
+    def _construct(self) -> List[int]:
+        """Greedy MRV construction with forward checking; returns sessions left unplaced"""
+        by_instructor = defaultdict(list)
+        by_batch = defaultdict(list)
+        for v, i in enumerate(self.sessions):
+            offering = self.offerings[i]
+            if offering.instructor:
+                by_instructor[offering.instructor].append(v)
+            by_batch[offering.batch].append(v)
+
+        domains = {v: set(times) for v, times in enumerate(self.session_times)}
+        unplaced = []
+        while domains:
+            v = min(domains, key=lambda u: (len(domains[u]), -self.offerings[self.sessions[u]].size, u))
+            domain = domains.pop(v)
+            used_days = self._offering_days(v)
+
+            best = None
+            for t in domain:
+                free = self._free_rooms(v, t)
+                if not free:
+                    continue
+                # Spread an offering's sessions over different days, then leave the most rooms open
+                score = (t // self.slots_per_day in used_days, -len(free), t)
+                if best is None or score < best[0]:
+                    best = (score, t, free[0])
+            if best is None:
+                unplaced.append(v)
+                continue
+
+            _, t, r = best
+            self._assign(v, t, r)
+            offering = self.offerings[self.sessions[v]]
+            for u in by_instructor.get(offering.instructor, []) + by_batch[offering.batch]:
+                if u in domains:
+                    domains[u].discard(t)
+        return unplaced
+
+    def _pick_room(self, v: int, t: int, blockers: set) -> Tuple[Optional[int], Optional[int]]:
+        """Pick a room at t: free if possible, else one held by an existing blocker, else any movable one"""
+        same_blocker = other = None
+        for r in self.session_rooms[v]:
+            if t not in self.room_times[r]:
+                continue
+            occupant = self.room_at.get((t, r))
+            if occupant is None:
+                return r, None
+            if occupant in blockers and same_blocker is None:
+                same_blocker = r
+            elif occupant != FIXED and other is None:
+                other = (r, occupant)
+        if same_blocker is not None:
+            return same_blocker, None
+        if other is not None:
+            return other
+        return None, None
+
+    def _repair(self, unplaced: List[int], deadline: float, tabu_tenure: int = 10) -> List[int]:
+        """Min-conflicts local search: place a session where it ejects the fewest others"""
+        tabu: Dict[Tuple[int, int], int] = {}
+        failed = []
+        iteration = 0
+        while unplaced and clock.perf_counter() < deadline:
+            iteration += 1
+            v = unplaced.pop(self.random.randrange(len(unplaced)))
+            offering = self.offerings[self.sessions[v]]
+
+            best_cost, candidates = None, []
+            for t in self.session_times[v]:
+                if tabu.get((v, t), 0) > iteration:
+                    continue
+                blockers = set()
+                for occupant in (
+                    self.instructor_at.get((offering.instructor, t)) if offering.instructor else None,
+                    self.batch_at.get((offering.batch, t))
+                ):
+                    if occupant is not None:
+                        blockers.add(occupant)
+                r, room_blocker = self._pick_room(v, t, blockers)
+                if r is None:
+                    continue
+                if room_blocker is not None:
+                    blockers.add(room_blocker)
+                cost = len(blockers)
+                if best_cost is None or cost < best_cost:
+                    best_cost, candidates = cost, [(t, r, blockers)]
+                elif cost == best_cost:
+                    candidates.append((t, r, blockers))
+
+            if not candidates:
+                failed.append(v)
+                continue
+
+            t, r, blockers = self.random.choice(candidates)
+            for u in blockers:
+                old_t = self._unassign(u)
+                tabu[(u, old_t)] = iteration + tabu_tenure
+                unplaced.append(u)
+            self._assign(v, t, r)
+        return unplaced + failed
+
+    def _spread(self, deadline: float):
+        """Move sessions off days their offering already uses, where a conflict-free move exists"""
+        for v in list(self.assignment):
+            if clock.perf_counter() >= deadline:
+                return
+            t, r = self.assignment[v]
+            offering = self.offerings[self.sessions[v]]
+            day = t // self.slots_per_day
+            self._unassign(v)
+            used_days = self._offering_days(v)
+            if day in used_days:
+                for candidate in self.session_times[v]:
+                    if candidate // self.slots_per_day in used_days:
+                        continue
+                    if offering.instructor and (offering.instructor, candidate) in self.instructor_at:
+                        continue
+                    if (offering.batch, candidate) in self.batch_at:
+                        continue
+                    free = self._free_rooms(v, candidate)
+                    if free:
+                        t, r = candidate, free[0]
+                        break
+            self._assign(v, t, r)
+
+    def solve(self, time_budget_seconds: float) -> TimetableSolution:
+        started = clock.perf_counter()
+        deadline = started + time_budget_seconds
+
+        unplaced = self._construct()
+        if unplaced:
+            unplaced = self._repair(unplaced, deadline)
+        self._spread(deadline)
+
+        placements = []
+        for v, (t, r) in sorted(self.assignment.items(), key=lambda item: item[1]):
+            offering = self.offerings[self.sessions[v]]
+            start = self.day_start + (t % self.slots_per_day) * self.slot_minutes
+            placements.append(Placement(
+                course_code=offering.course_code,
+                batch=offering.batch,
+                semester=offering.semester,
+                instructor=offering.instructor,
+                room=self.rooms[r].room,
+                day=self.days[t // self.slots_per_day],
+                start=start,
+                end=start + self.slot_minutes
+            ))
+
+        missing = defaultdict(int)
+        for v in unplaced:
+            missing[self.sessions[v]] += 1
+        return TimetableSolution(
+            placements=placements,
+            unplaced=[self.offerings[i].model_copy(update={"sessions": n}) for i, n in missing.items()],
+            elapsed_seconds=clock.perf_counter() - started
+        )
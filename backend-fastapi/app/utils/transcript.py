@@ -0,0 +1,190 @@
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from html import escape
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.course import Course
+from app.models.grades import Grade, TranscriptCourse, TranscriptResponse, TranscriptSemester
+from app.models.user import StudentProfile, User
+from app.utils.gpa import grade_point, point_to_letter, semester_sort_key, weighted_gpa
+
+def transcript_version(session: Session, student_id: str) -> str:
+    """Stamp of a student's grade rows: any insert, update or delete changes the count or the latest update"""
+    count, latest = session.exec(
+        select(func.count(Grade.id), func.max(Grade.updated_at)).where(Grade.student_id == student_id)
+    ).one()
+    latest = latest.isoformat() if isinstance(latest, datetime) else str(latest or "")
+    return f"{count}-{latest}"
+
+def build_transcript(session: Session, student_id: str, version: str) -> Optional[TranscriptResponse]:
+    """Assemble a transcript from one query joining the student, their grades and the graded courses.
+
+    GPAs follow the GPA engine: credit-weighted grade points, with ungraded
+    courses listed but not counted. None if there is no such user.
+    """
+    rows = session.exec(
+        select(User.name, StudentProfile, Grade, Course.course_title, Course.course_credits)
+        .join(StudentProfile, StudentProfile.user_id == User.id, isouter=True)
+        .join(Grade, Grade.student_id == User.id, isouter=True)
+        .join(Course, Course.course_code == Grade.course_code, isouter=True)
+        .where(User.id == student_id)
+        .order_by(Grade.course_code)
+    ).all()
+    if not rows:
+        return None
+
+    name, profile = rows[0][0], rows[0][1]
+    by_semester = defaultdict(list)
+    for _, _, grade, course_title, course_credits in rows:
+        if grade is None or not grade.semester:
+            continue
+        point = grade_point(grade)
+        by_semester[grade.semester].append(TranscriptCourse(
+            course_code=grade.course_code,
+            course_title=course_title,
+            credits=course_credits or 0,
+            total_marks=grade.total_marks,
+            grade_point=point,
+            letter_grade=point_to_letter(point)
+        ))
+
+    semesters = []
+    total_credits = 0.0
+    total_points = 0.0
+    for semester in sorted(by_semester, key=semester_sort_key):
+        courses = by_semester[semester]
+        graded = [course for course in courses if course.grade_point is not None]
+        credits = sum(course.credits for course in graded)
+        quality_points = sum(course.grade_point * course.credits for course in graded)
+        total_credits += credits
+        total_points += quality_points
+        semesters.append(TranscriptSemester(
+            semester=semester,
+            courses=courses,
+            credits=credits,
+            gpa=weighted_gpa(quality_points, credits),
+            cgpa=weighted_gpa(total_points, total_credits)
+        ))
+
+    return TranscriptResponse(
+        student_id=student_id,
+        name=name,
+        roll_number=profile.student_id if profile else None,
+        major=profile.major if profile else None,
+        degree=profile.current_degree if profile else None,
+        admission_date=profile.admission_date if profile else None,
+        semesters=semesters,
+        credits=total_credits,
+        cgpa=weighted_gpa(total_points, total_credits),
+        version=version,
+        generated_at=datetime.now()
+    )
+
+def _cell(value) -> str:
+    return escape(str(value)) if value is not None else "&ndash;"
+
+def render_transcript_html(transcript: TranscriptResponse) -> str:
+    """A self-contained, print-ready HTML transcript"""
+    details = [
+        ("Name", transcript.name),
+        ("Student ID", transcript.roll_number),
+        ("Major", transcript.major),
+        ("Degree", transcript.degree),
+        ("Admitted", transcript.admission_date),
+    ]
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset=\"utf-8\">",
+        f"<title>Transcript - {_cell(transcript.name or transcript.student_id)}</title>",
+        "<style>",
+        "body{font-family:Georgia,serif;margin:2em;color:#222}",
+        "table{border-collapse:collapse;width:100%;margin-bottom:1.5em}",
+        "th,td{border:1px solid #999;padding:4px 8px;text-align:left}",
+        "th{background:#eee}td.num{text-align:right}",
+        "@media print{body{margin:0}section{page-break-inside:avoid}}",
+        "</style></head><body>",
+        "<h1>Academic Transcript</h1>",
+        "<dl>",
+    ]
+    for label, value in details:
+        parts.append(f"<dt>{label}</dt><dd>{_cell(value)}</dd>")
+    parts.append("</dl>")
+
+    for semester in transcript.semesters:
+        parts += [
+            "<section>",
+            f"<h2>Semester {_cell(semester.semester)}</h2>",
+            "<table><thead><tr><th>Course</th><th>Title</th><th>Credits</th>"
+            "<th>Marks</th><th>Grade</th><th>Point</th></tr></thead><tbody>",
+        ]
+        for course in semester.courses:
+            parts.append(
+                f"<tr><td>{_cell(course.course_code)}</td><td>{_cell(course.course_title)}</td>"
+                f"<td class=\"num\">{_cell(course.credits)}</td><td class=\"num\">{_cell(course.total_marks)}</td>"
+                f"<td>{_cell(course.letter_grade)}</td><td class=\"num\">{_cell(course.grade_point)}</td></tr>"
+            )
+        parts += [
+            "</tbody></table>",
+            f"<p>Credits: {_cell(semester.credits)} &middot; GPA: {_cell(semester.gpa)}"
+            f" &middot; CGPA: {_cell(semester.cgpa)}</p>",
+            "</section>",
+        ]
+
+    parts += [
+        f"<h2>Total credits: {_cell(transcript.credits)} &middot; CGPA: {_cell(transcript.cgpa)}</h2>",
+        f"<p><small>Generated {transcript.generated_at:%Y-%m-%d %H:%M}</small></p>",
+        "</body></html>",
+    ]
+    return "\n".join(parts)
+
+class TranscriptCache:
+    """Transcripts and their HTML renderings by student, reused while the student's grade version is unchanged.
+
+    Checking the version costs one indexed aggregate query, so a cached
+    transcript never lags the student's grades, even across workers. At most `max_entries`
+    students are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, TranscriptResponse, Dict[str, str]]]" = OrderedDict()
+
+    def _cached(self, student_id: str, version: str):
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(student_id)
+                return entry
+            return None
+
+    def get(self, session: Session, student_id: str) -> Optional[TranscriptResponse]:
+        version = transcript_version(session, student_id)
+        entry = self._cached(student_id, version)
+        if entry:
+            return entry[1]
+        transcript = build_transcript(session, student_id, version)
+        if transcript is None:
+            return None
+        with self._lock:
+            self._entries[student_id] = (version, transcript, {})
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return transcript
+
+    def html(self, session: Session, student_id: str) -> Optional[str]:
+        transcript = self.get(session, student_id)
+        if transcript is None:
+            return None
+        entry = self._cached(student_id, transcript.version)
+        renderings = entry[2] if entry else {}
+        if "html" not in renderings:
+            renderings["html"] = render_transcript_html(transcript)
+        return renderings["html"]
+
+transcripts = TranscriptCache()
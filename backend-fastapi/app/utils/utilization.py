@@ -0,0 +1,247 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.equipment import Booking, BookingSeries, BookingStatus
+from app.models.room import RoomBooking, RoomBookingSeries
+from app.models.utilization import ResourceType, UtilizationRollup
+from app.utils.booking_sweeper import archive_cutoff
+from app.utils.recurrence import series_dates
+
+# Bookings that represent actual use
+COUNTED_BOOKING_STATUSES = [BookingStatus.approved, BookingStatus.completed]
+COUNTED_ROOM_STATUSES = ["Approved", "Completed"]
+
+Interval = Tuple[datetime, datetime]
+
+def days_between(start: datetime, end: datetime) -> List[date]:
+    """Dates touched by [start, end)"""
+    last = max(start, end - timedelta(microseconds=1)).date()
+    return [start.date() + timedelta(days=i) for i in range((last - start.date()).days + 1)]
+
+def day_usage(day: date, intervals: List[Interval]) -> Tuple[int, List[int]]:
+    """Booked minutes on `day`, in total and for each hour, counting overlaps once"""
+    day_start = datetime.combine(day, time.min)
+    day_end = day_start + timedelta(days=1)
+    clipped = sorted((max(s, day_start), min(e, day_end)) for s, e in intervals if s < day_end and e > day_start)
+
+    merged: List[List[datetime]] = []
+    for start, end in clipped:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    hourly = [0.0] * 24
+    for start, end in merged:
+        cursor = start
+        while cursor < end:
+            step_end = min(end, cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+            hourly[cursor.hour] += (step_end - cursor).total_seconds() / 60
+            cursor = step_end
+    rounded = [round(minutes) for minutes in hourly]
+    return sum(rounded), rounded
+
+def booking_days(resource_id: str, start: datetime, end: datetime) -> List[Tuple[str, date]]:
+    return [(resource_id, day) for day in days_between(start, end)]
+
+def series_days(resource_id: str, series) -> List[Tuple[str, date]]:
+    return [(resource_id, day) for day in series_dates(series)]
+
+def refresh_equipment_usage(session: Session, touched: Iterable[Tuple[str, date]]):
+    """Recompute the rollups of the given (equipment id, day) pairs from their bookings"""
+    pairs = set(touched)
+    if not pairs:
+        return
+    ids = {equipment_id for equipment_id, _ in pairs}
+    days = sorted({day for _, day in pairs})
+    window_start = datetime.combine(days[0], time.min)
+    window_end = datetime.combine(days[-1], time.min) + timedelta(days=1)
+
+    intervals: Dict[Tuple[str, date], List[Interval]] = defaultdict(list)
+    bookings = session.exec(
+        select(Booking.equipment_id, Booking.start_time, Booking.end_time).where(
+            Booking.equipment_id.in_(ids),
+            Booking.status.in_(COUNTED_BOOKING_STATUSES),
+            Booking.start_time < window_end,
+            Booking.end_time > window_start
+        )
+    ).all()
+    for equipment_id, start, end in bookings:
+        for pair in booking_days(equipment_id, start, end):
+            if pair in pairs:
+                intervals[pair].append((start, end))
+
+    series_list = session.exec(
+        select(BookingSeries).where(
+            BookingSeries.equipment_id.in_(ids),
+            BookingSeries.status.in_(COUNTED_BOOKING_STATUSES),
+            BookingSeries.start_date <= days[-1],
+            BookingSeries.until >= days[0]
+        )
+    ).all()
+    for series in series_list:
+        for day in series_dates(series, days[0], days[-1]):
+            if (series.equipment_id, day) in pairs:
+                intervals[(series.equipment_id, day)].append(
+                    (datetime.combine(day, series.start_time), datetime.combine(day, series.end_time))
+                )
+
+    write_rollups(session, ResourceType.equipment, pairs, intervals)
+
+def refresh_room_usage(session: Session, touched: Iterable[Tuple[str, date]]):
+    """Recompute the rollups of the given (room, day) pairs from their bookings"""
+    pairs = {(room, day) for room, day in touched if room and day}
+    if not pairs:
+        return
+    rooms = {room for room, _ in pairs}
+    days = sorted({day for _, day in pairs})
+
+    intervals: Dict[Tuple[str, date], List[Interval]] = defaultdict(list)
+    bookings = session.exec(
+        select(RoomBooking.room, RoomBooking.booking_date, RoomBooking.start_time, RoomBooking.end_time).where(
+            RoomBooking.room.in_(rooms),
+            RoomBooking.booking_date.in_(days),
+            RoomBooking.status.in_(COUNTED_ROOM_STATUSES)
+        )
+    ).all()
+    for room, day, start, end in bookings:
+        if (room, day) in pairs and start and end:
+            intervals[(room, day)].append((datetime.combine(day, start), datetime.combine(day, end)))
+
+    series_list = session.exec(
+        select(RoomBookingSeries).where(
+            RoomBookingSeries.room.in_(rooms),
+            RoomBookingSeries.status.in_(COUNTED_ROOM_STATUSES),
+            RoomBookingSeries.start_date <= days[-1],
+            RoomBookingSeries.until >= days[0]
+        )
+    ).all()
+    for series in series_list:
+        for day in series_dates(series, days[0], days[-1]):
+            if (series.room, day) in pairs:
+                intervals[(series.room, day)].append(
+                    (datetime.combine(day, series.start_time), datetime.combine(day, series.end_time))
+                )
+
+    write_rollups(session, ResourceType.room, pairs, intervals)
+
+def write_rollups(
+    session: Session,
+    resource_type: ResourceType,
+    pairs: Set[Tuple[str, date]],
+    intervals: Dict[Tuple[str, date], List[Interval]]
+):
+    """Upsert the rollups of the pairs, dropping days with nothing booked"""
+    ids = {resource_id for resource_id, _ in pairs}
+    days = {day for _, day in pairs}
+    for attempt in range(2):
+        existing = {
+            (r.resource_id, r.day): r
+            for r in session.exec(
+                select(UtilizationRollup).where(
+                    UtilizationRollup.resource_type == resource_type,
+                    UtilizationRollup.resource_id.in_(ids),
+                    UtilizationRollup.day.in_(days)
+                )
+            ).all()
+        }
+        for resource_id, day in pairs:
+            minutes, hourly = day_usage(day, intervals.get((resource_id, day), []))
+            rollup = existing.get((resource_id, day))
+            if not minutes:
+                if rollup:
+                    session.delete(rollup)
+                continue
+            if rollup is None:
+                rollup = UtilizationRollup(resource_type=resource_type, resource_id=resource_id, day=day)
+            rollup.booked_minutes = minutes
+            rollup.hourly_minutes = hourly
+            rollup.updated_at = datetime.now()
+            session.add(rollup)
+        try:
+            session.commit()
+            return
+        except IntegrityError:
+            # A concurrent refresh inserted one of the days first; reload and retry
+            session.rollback()
+            if attempt:
+                raise
+
+def rename_room_usage(session: Session, old_room: str, new_room: str):
+    rollups = session.exec(
+        select(UtilizationRollup).where(
+            UtilizationRollup.resource_type == ResourceType.room,
+            UtilizationRollup.resource_id == old_room
+        )
+    ).all()
+    for rollup in rollups:
+        rollup.resource_id = new_room
+        session.add(rollup)
+    session.commit()
+
+def delete_room_usage(session: Session, room: str):
+    session.execute(
+        delete(UtilizationRollup).where(
+            UtilizationRollup.resource_type == ResourceType.room,
+            UtilizationRollup.resource_id == room
+        )
+    )
+    session.commit()
+
+def rebuild_usage(session: Session, since: Optional[date] = None) -> Dict[str, int]:
+    """Recompute the rollups from `since` on from booking history; returns the number of days per resource type.
+
+    Bookings before the archive cutoff may already have been moved out of the live
+    tables, so by default the rollups of that period are kept as they are.
+    """
+    since = since or archive_cutoff()
+    window_start = datetime.combine(since, time.min)
+    session.execute(delete(UtilizationRollup).where(UtilizationRollup.day >= since))
+    session.commit()
+
+    equipment_pairs = set()
+    for equipment_id, start, end in session.exec(
+        select(Booking.equipment_id, Booking.start_time, Booking.end_time).where(
+            Booking.status.in_(COUNTED_BOOKING_STATUSES),
+            Booking.end_time > window_start
+        )
+    ).all():
+        equipment_pairs.update(pair for pair in booking_days(equipment_id, start, end) if pair[1] >= since)
+    for series in session.exec(
+        select(BookingSeries).where(
+            BookingSeries.status.in_(COUNTED_BOOKING_STATUSES),
+            BookingSeries.until >= since
+        )
+    ).all():
+        equipment_pairs.update((series.equipment_id, day) for day in series_dates(series, window_start=since))
+
+    room_pairs = {
+        (room, day)
+        for room, day in session.exec(
+            select(RoomBooking.room, RoomBooking.booking_date).where(
+                RoomBooking.status.in_(COUNTED_ROOM_STATUSES),
+                RoomBooking.booking_date >= since
+            )
+        ).all()
+    }
+    for series in session.exec(
+        select(RoomBookingSeries).where(
+            RoomBookingSeries.status.in_(COUNTED_ROOM_STATUSES),
+            RoomBookingSeries.until >= since
+        )
+    ).all():
+        room_pairs.update((series.room, day) for day in series_dates(series, window_start=since))
+
+    # A month at a time keeps the IN lists of each refresh short
+    for refresh, pairs in ((refresh_equipment_usage, equipment_pairs), (refresh_room_usage, room_pairs)):
+        by_month = defaultdict(set)
+        for resource_id, day in pairs:
+            by_month[(day.year, day.month)].add((resource_id, day))
+        for month_pairs in by_month.values():
+            refresh(session, month_pairs)
+    return {ResourceType.equipment.value: len(equipment_pairs), ResourceType.room.value: len(room_pairs)}